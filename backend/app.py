@@ -1,21 +1,42 @@
 # backend/app.py
 
 import os
-from flask import Flask, request, jsonify
+import json
+import hmac
+import logging
+from datetime import datetime, timezone
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import dateparser
-import pandas as pd
 
 # --- [UPDATED IMPORTS] ---
-from weather_service import get_future_weather
+from weather_service import get_future_weather, WEATHER_CLIENT
 from prediction_service import (
     make_prediction, 
+    regions,
+    make_scenario_prediction,
     get_latest_prices, 
-    get_historical_data,
     backtest_model,  # <-- [NEW] Import the backtest function
-    HISTORICAL_DATA
+    multistep_backtest_model,
+    batching_stats,
+    REGISTRY,
+    INFERENCE_BACKEND,
+    DEFAULT_SCENARIOS,
+    DEFAULT_PERCENTILES
 )
-from gemini_service import get_ai_response
+from region_registry import match_region
+from gemini_service import get_ai_response, stream_ai_response, get_session_stats
+from history_service import get_history_window, render_body
+from dashboard_service import build_dashboard, DEFAULT_OVERVIEW_DAYS, DEFAULT_BACKTEST_DAYS, DEFAULT_TABLE_DAYS
+from upstream import upstream_stats
+from forecast_scheduler import SCHEDULER, start_forecast_scheduler, get_trajectories
+from hot_reload import RELOADER, start_hot_reload
+from warmup import WARMUP, start_warm_up
+from chat_retrieval import parse_date, get_price_index, answer_range_question
+import metrics
+from metrics import stage, annotate, count_error, begin_trace, end_trace, HTTP_REQUESTS, HTTP_REQUEST_SECONDS
+from structured_logging import get_logger, sample_request_log, LOG_SLOW_MS
+
+log = get_logger(__name__)
 
 # Initialize the Flask app
 app = Flask(__name__)
@@ -27,6 +48,46 @@ CORS(app, resources={r"/*": {"origins": [frontend_url_1, frontend_url_2]}})
 # --- [END OF UPDATE] ---
 
 
+# --- Request tracing ---
+# Every request gets a trace named after its endpoint ("prediction", "chat",
+# ...) that collects the stage timings recorded while it is served. Afterwards
+# the request is counted and timed in /metrics, and logged (sampled, see
+# structured_logging.py) with its stage breakdown.
+
+# Probes from the load balancer and Prometheus are counted but never logged;
+# /ready answers 503 on purpose until the warm-up is done
+_UNLOGGED_ENDPOINTS = {"health_check", "ready", "metrics"}
+
+
+@app.before_request
+def _begin_request_trace():
+    begin_trace((request.endpoint or "unmatched").removeprefix("handle_"))
+
+
+@app.after_request
+def _finish_request_trace(response):
+    trace = end_trace()
+    if trace is None:
+        return response
+    seconds = trace.elapsed()
+    status = response.status_code
+    HTTP_REQUESTS.inc(trace.operation, request.method, str(status))
+    HTTP_REQUEST_SECONDS.observe(seconds, trace.operation)
+
+    if trace.operation in _UNLOGGED_ENDPOINTS:
+        return response
+    duration_ms = seconds * 1000
+    sample_rate = sample_request_log(status, duration_ms)
+    if sample_rate is not None:
+        level = logging.ERROR if status >= 500 else logging.WARNING if duration_ms >= LOG_SLOW_MS else logging.INFO
+        log.log(level, "request", extra={
+            "endpoint": trace.operation, "method": request.method, "path": request.path,
+            "status": status, "duration_ms": round(duration_ms, 3), "stages": trace.stage_ms(),
+            "sample_rate": sample_rate, **trace.fields,
+        })
+    return response
+
+
 # --- 1. Health Check Route ---
 @app.route('/', methods=['GET'])
 def health_check():
@@ -36,79 +97,190 @@ def health_check():
 # --- 2. Prediction Route ---
 @app.route('/predict', methods=['POST'])
 def handle_prediction():
-    # (This function is unchanged)
     data = request.get_json()
     if not data: return jsonify({"error": "No JSON data provided"}), 400
     region = data.get('region')
     target_date = data.get('date')
     if not region or not target_date: return jsonify({"error": "Missing 'region' or 'date' in JSON"}), 400
-    print(f"Received prediction request: Region={region}, Date={target_date}")
-    weather_forecasts = get_future_weather(region, target_date)
+    annotate(region=region, target_date=target_date)
+
+    # Normally answered from the forecasts the scheduler keeps up to date
+    with stage("materialized_lookup"):
+        materialized = SCHEDULER.lookup(region, target_date)
+    if materialized:
+        predicted_price, computed_at = materialized
+        annotate(source="materialized")
+        with stage("json_encode"):
+            return jsonify({"region": region, "target_date": target_date, "predicted_price": predicted_price,
+                            "computed_at": computed_at, "source": "materialized"})
+
+    with stage("weather_fetch"):
+        weather_forecasts = get_future_weather(region, target_date)
     if isinstance(weather_forecasts, dict) and 'error' in weather_forecasts:
-        print(f"Weather Service Error: {weather_forecasts['error']}")
-        return jsonify(weather_forecasts), 400
+        log.warning("Weather service error", extra={"region": region, "error": weather_forecasts['error']})
+        count_error("weather")
+        return jsonify(weather_forecasts), 503 if weather_forecasts.get('retryable') else 400
     if not weather_forecasts:
         err_msg = "No weather forecasts were returned, cannot predict."
-        print(err_msg)
+        log.error(err_msg, extra={"region": region, "target_date": target_date})
+        count_error("weather")
         return jsonify({"error": err_msg}), 500
     predicted_price, error = make_prediction(region, weather_forecasts)
     if error:
-        print(f"Prediction Service Error: {error}")
+        log.error("Prediction service error", extra={"region": region, "error": error})
+        count_error("prediction")
         return jsonify({"error": error}), 500
-    print(f"Prediction successful. Price: {predicted_price}")
-    return jsonify({"region": region, "target_date": target_date, "predicted_price": predicted_price})
+    annotate(source="on_demand", predicted_price=predicted_price)
+    with stage("json_encode"):
+        return jsonify({"region": region, "target_date": target_date, "predicted_price": predicted_price,
+                        "computed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                        "source": "on_demand"})
 
 
-# --- 3. Chatbot Route ---
-@app.route('/chat', methods=['POST'])
-def handle_chat():
-    # (This function is unchanged)
+# --- 2a. Trajectory Route (one or more regions) ---
+@app.route('/predict-trajectory', methods=['POST'])
+def handle_trajectory_prediction():
+    """
+    Day-by-day predicted prices for one or more regions in one call.
+    Body: {"regions": [...]} or {"region": "..."} (default: all regions), and
+    an optional "date" to stop the trajectories at.
+    """
+    data = request.get_json(silent=True) or {}
+    requested = data.get('regions') or ([data['region']] if data.get('region') else regions)
+    if not isinstance(requested, list) or not all(isinstance(r, str) for r in requested):
+        return jsonify({"error": "'regions' must be a list of region names"}), 400
+    target_date = data.get('date')
+    if target_date:
+        try:
+            datetime.strptime(target_date, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+
+    forecasts, errors, retryable = get_trajectories(list(dict.fromkeys(requested)), target_date)
+    if not forecasts:
+        # Like /predict: if AccuWeather being unavailable is all that went wrong, ask clients to retry
+        if errors and set(errors) <= retryable:
+            return jsonify({"error": "No forecasts could be computed.", "errors": errors, "retryable": True}), 503
+        return jsonify({"error": "No forecasts could be computed.", "errors": errors}), 400
+    return jsonify({"forecasts": forecasts, "errors": errors})
+
+
+# --- 2b. Weather Scenario Prediction Route ---
+@app.route('/predict-scenarios', methods=['POST'])
+def handle_scenario_prediction():
+    """
+    Price distribution over many weather scenarios.
+    JSON: {"region", "date", "n_scenarios"?, "percentiles"?, "seed"?}
+    or {"region", "scenarios": [[{Max_Temp, Min_Temp, Rainfall}, ...], ...]}
+    """
     data = request.get_json()
-    if not data or 'message' not in data:
-        return jsonify({"error": "No 'message' provided"}), 400
-        
-    user_message = data['message'].strip()
+    if not data: return jsonify({"error": "No JSON data provided"}), 400
+    region = data.get('region')
+    target_date = data.get('date')
+    scenarios = data.get('scenarios')
+    if not region or not (target_date or scenarios):
+        return jsonify({"error": "Missing 'region' and 'date' (or 'scenarios') in JSON"}), 400
+
+    try:
+        n_scenarios = int(data.get('n_scenarios', DEFAULT_SCENARIOS))
+        percentiles = [float(p) for p in data.get('percentiles', DEFAULT_PERCENTILES)]
+        seed = data.get('seed')
+    except (TypeError, ValueError):
+        return jsonify({"error": "'n_scenarios' and 'percentiles' must be numeric"}), 400
+    if n_scenarios < 1 or any(p < 0 or p > 100 for p in percentiles):
+        return jsonify({"error": "'n_scenarios' must be positive and percentiles in [0, 100]"}), 400
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+        return jsonify({"error": "'seed' must be a non-negative integer"}), 400
+
+    weather_forecasts = None
+    if not scenarios:
+        annotate(region=region, target_date=target_date, n_scenarios=n_scenarios)
+        with stage("weather_fetch"):
+            weather_forecasts = get_future_weather(region, target_date)
+        if isinstance(weather_forecasts, dict) and 'error' in weather_forecasts:
+            log.warning("Weather service error", extra={"region": region, "error": weather_forecasts['error']})
+            count_error("weather")
+            return jsonify(weather_forecasts), 503 if weather_forecasts.get('retryable') else 400
+
+    result, error = make_scenario_prediction(
+        region, weather_forecasts, n_scenarios=n_scenarios,
+        scenarios=scenarios, percentiles=percentiles, seed=seed
+    )
+    if error:
+        log.warning("Scenario prediction error", extra={"region": region, "error": error})
+        return jsonify({"error": error}), 400
+    return jsonify({"region": region, "target_date": target_date, **result})
+
+
+# --- 3. Chatbot Route ---
+def build_chat_prompt(user_message):
+    """
+    RAG augmentation shared by /chat and /chat-stream.
+    Returns (augmented_prompt, direct_answer); direct_answer is set when the
+    question can be answered from our records without calling the model.
+    """
     augmented_prompt = user_message
     
     if "price" in user_message.lower() or "rate" in user_message.lower():
-        region = None
-        if "sirsi" in user_message.lower(): region = "sirsi"
-        elif "madikeri" in user_message.lower(): region = "madikeri"
-        elif "chikkamagaluru" in user_message.lower(): region = "chikkamagaluru"
+        with stage("region_match"):
+            region = match_region(user_message)
         
         if region:
+            annotate(region=region)
+            # Aggregate questions ("average price last month") are answered from our records directly
+            try:
+                with stage("range_answer"):
+                    range_answer = answer_range_question(region, user_message)
+            except Exception as e:
+                log.warning("Error during range RAG", extra={"region": region, "error": str(e)})
+                count_error("rag")
+                range_answer = None
+            if range_answer:
+                annotate(rag="range")
+                return None, range_answer
+
             specific_date_found = False
-            parsed_date = dateparser.parse(user_message, settings={'PREFER_DATES_FROM': 'past'})
+            with stage("date_parse"):
+                parsed_date = parse_date(user_message)
             
             if parsed_date:
                 try:
                     date_str = parsed_date.strftime('%Y-%m-%d')
-                    if date_str in HISTORICAL_DATA[region].index:
-                        specific_data = HISTORICAL_DATA[region].loc[date_str]
-                        if isinstance(specific_data, pd.DataFrame):
-                            specific_price = specific_data.iloc[0]['Price']
-                        else: 
-                            specific_price = specific_data['Price']
-                        augmented_prompt = (
-                            f"A user is asking about the price in {region} for a specific date: {date_str}. "
-                            f"My internal records show the price on that day was ₹{specific_price:,.2f}. "
-                            f"Please answer their question using this exact data. The user's original "
-                            f"question was: '{user_message}'"
-                        )
+                    with stage("price_lookup"):
+                        match = get_price_index(region).lookup(parsed_date)
+                    if match:
+                        match_date, specific_price, exact = match
+                        match_str = match_date.strftime('%Y-%m-%d')
+                        if exact:
+                            augmented_prompt = (
+                                f"A user is asking about the price in {region} for a specific date: {date_str}. "
+                                f"My internal records show the price on that day was ₹{specific_price:,.2f}. "
+                                f"Please answer their question using this exact data. The user's original "
+                                f"question was: '{user_message}'"
+                            )
+                        else:
+                            augmented_prompt = (
+                                f"A user is asking about the price in {region} for a specific date: {date_str}. "
+                                f"My internal records have no price for that exact day; the nearest available "
+                                f"date is {match_str}, when the price was ₹{specific_price:,.2f}. "
+                                f"Please answer their question using this data and mention that it is from {match_str}. "
+                                f"The user's original question was: '{user_message}'"
+                            )
                         specific_date_found = True
-                        print(f"Augmented prompt with SPECIFIC date {date_str} for {region}.")
+                        annotate(rag="specific_date", requested_date=date_str, matched_date=match_str)
                     else:
-                        print(f"Date {date_str} not found in {region} records.")
+                        annotate(requested_date=date_str)
                         specific_date_found = False
                 except Exception as e:
-                    print(f"Error during specific date RAG: {e}")
+                    log.warning("Error during specific date RAG", extra={"region": region, "error": str(e)})
+                    count_error("rag")
                     specific_date_found = False
             
             if not specific_date_found:
                 try:
-                    latest_data = HISTORICAL_DATA[region].iloc[-1]
-                    latest_price = latest_data['Price']
-                    latest_date = latest_data.name.strftime('%Y-%m-%d')
+                    with stage("price_lookup"):
+                        latest_date, latest_price = get_price_index(region).latest()
+                    latest_date = latest_date.strftime('%Y-%m-%d')
                     augmented_prompt = (
                         f"A user is asking about the price in {region}. They might have asked "
                         f"for a specific date that I couldn't find in my records (e.g., '{user_message}'). "
@@ -117,20 +289,77 @@ def handle_chat():
                         f"Please answer their question, and *politely* mention that you are providing the *latest* price "
                         f"because the specific date they asked for was not found."
                     )
-                    print(f"Augmented prompt with LATEST date for {region} (fallback).")
+                    annotate(rag="latest")
                 except Exception as e:
-                    print(f"Error during fallback RAG augmentation: {e}")
+                    log.warning("Error during fallback RAG augmentation", extra={"region": region, "error": str(e)})
+                    count_error("rag")
                     augmented_prompt = user_message
+
+    return augmented_prompt, None
+
+
+def _chat_cache_allowed(data):
+    """Clients can skip the response cache with {"no_cache": true} or Cache-Control: no-cache."""
+    return not data.get('no_cache') and 'no-cache' not in request.headers.get('Cache-Control', '')
+
+
+@app.route('/chat', methods=['POST'])
+def handle_chat():
+    data = request.get_json()
+    if not data or 'message' not in data:
+        return jsonify({"error": "No 'message' provided"}), 400
         
-    ai_response = get_ai_response(augmented_prompt)
-    return jsonify({"response": ai_response})
+    user_message = data['message'].strip()
+    conversation_id = data.get('conversation_id')
+    augmented_prompt, direct_answer = build_chat_prompt(user_message)
+    if direct_answer:
+        return jsonify({"response": direct_answer})
+
+    with stage("gemini"):
+        ai_response = get_ai_response(augmented_prompt, conversation_id=conversation_id,
+                                      use_cache=_chat_cache_allowed(data))
+    with stage("json_encode"):
+        return jsonify({"response": ai_response})
+
+
+# --- 3b. Streaming Chatbot Route ---
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.route('/chat-stream', methods=['POST'])
+def handle_chat_stream():
+    """
+    Same as /chat, but the reply is sent as server-sent events while Gemini
+    generates it: 'chunk' events with {"text": ...}, then a 'done' event.
+    If the client disconnects, the server stops reading from Gemini.
+    """
+    data = request.get_json()
+    if not data or 'message' not in data:
+        return jsonify({"error": "No 'message' provided"}), 400
+
+    user_message = data['message'].strip()
+    conversation_id = data.get('conversation_id')
+    augmented_prompt, direct_answer = build_chat_prompt(user_message)
+    use_cache = _chat_cache_allowed(data)
+
+    def generate():
+        if direct_answer:
+            yield _sse("chunk", {"text": direct_answer})
+        else:
+            # Closing this generator (client gone) closes the Gemini stream too
+            for text in stream_ai_response(augmented_prompt, conversation_id=conversation_id,
+                                           use_cache=use_cache):
+                yield _sse("chunk", {"text": text})
+        yield _sse("done", {})
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 # --- 4. Latest Prices Route ---
 @app.route('/latest-prices', methods=['GET'])
 def handle_latest_prices():
-    # (This function is unchanged)
-    print("Received request for /latest-prices")
     prices = get_latest_prices()
     return jsonify(prices)
 
@@ -138,18 +367,87 @@ def handle_latest_prices():
 # --- 5. Historical Data Route ---
 @app.route('/historical-data', methods=['GET'])
 def handle_historical_data():
-    # (This function is unchanged)
+    """
+    Price history for one region, served from a precomputed snapshot.
+    /historical-data?region=sirsi&days=30
+    /historical-data?region=sirsi&start=2024-01-01&end=2024-12-31&resolution=weekly
+    /historical-data?region=sirsi&days=3000&max_points=500   (LTTB-downsampled)
+    Supports If-None-Match (ETag) and gzip.
+    """
     region = request.args.get('region')
     days_str = request.args.get('days')
-    if not region or not days_str: return jsonify({"error": "Missing 'region' or 'days' parameter"}), 400
+    start = request.args.get('start')
+    end = request.args.get('end')
+    resolution = request.args.get('resolution', 'daily')
+    if not region or not (days_str or start): return jsonify({"error": "Missing 'region' or 'days' parameter"}), 400
     try:
-        days = int(days_str)
+        days = int(days_str) if days_str else None
+        max_points = int(request.args['max_points']) if 'max_points' in request.args else None
     except ValueError:
-        return jsonify({"error": "'days' must be an integer"}), 400
-    print(f"Received request for /historical-data: Region={region}, Days={days}")
-    data, error = get_historical_data(region, days)
-    if error: return jsonify({"error": error}), 500
-    return jsonify(data)
+        return jsonify({"error": "'days' and 'max_points' must be integers"}), 400
+    try:
+        for value in (start, end):
+            if value: datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({"error": "'start' and 'end' must be YYYY-MM-DD"}), 400
+    if max_points is not None and max_points < 3:
+        return jsonify({"error": "'max_points' must be at least 3"}), 400
+
+    result, error = get_history_window(region, days=days, start=start, end=end,
+                                       resolution=resolution, max_points=max_points)
+    if error: return jsonify({"error": error}), 400 if error != "Invalid region" else 500
+    etag, rows = result
+
+    if etag in request.headers.get('If-None-Match', ''):
+        response = Response(status=304)
+    else:
+        gzip_ok = 'gzip' in request.headers.get('Accept-Encoding', '')
+        with stage("render_body"):
+            body, encoding = render_body(etag, rows, gzip_ok=gzip_ok)
+        response = Response(body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.headers['ETag'] = etag
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+# --- 5b. Dashboard Route ---
+@app.route('/dashboard', methods=['GET'])
+def handle_dashboard():
+    """
+    Everything the Dashboard page shows, in one response: KPIs, overview
+    history for every region, backtest rows + error summary and table rows.
+    /dashboard?performance_region=sirsi&table_region=sirsi&overview_days=30&backtest_days=90&table_days=180
+    Supports If-None-Match (ETag) and gzip.
+    """
+    try:
+        overview_days = int(request.args.get('overview_days', DEFAULT_OVERVIEW_DAYS))
+        backtest_days = int(request.args.get('backtest_days', DEFAULT_BACKTEST_DAYS))
+        table_days = int(request.args.get('table_days', DEFAULT_TABLE_DAYS))
+    except ValueError:
+        return jsonify({"error": "'overview_days', 'backtest_days' and 'table_days' must be integers"}), 400
+
+    result, error = build_dashboard(
+        performance_region=request.args.get('performance_region', 'sirsi'),
+        table_region=request.args.get('table_region', 'sirsi'),
+        overview_days=overview_days, backtest_days=backtest_days, table_days=table_days,
+    )
+    if error: return jsonify({"error": error}), 400 if error.startswith("Invalid region") else 500
+    etag, body, compressed = result
+
+    if etag in request.headers.get('If-None-Match', ''):
+        response = Response(status=304)
+    elif compressed is not None and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = Response(compressed, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body, mimetype='application/json')
+    response.headers['ETag'] = etag
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 # --- 6. [NEW] Model Backtest Route ---
@@ -158,6 +456,8 @@ def handle_model_backtest():
     """
     Gets the Actual vs. Predicted data for Dashboard Tab 2.
     Expects query parameters: /model-backtest?region=sirsi&days=90
+    With &horizon=5 it instead runs the rolling-origin 1..5-day-ahead
+    backtest and returns per-horizon MAE/MAPE plus the per-date series.
     """
     region = request.args.get('region')
     days_str = request.args.get('days')
@@ -170,18 +470,166 @@ def handle_model_backtest():
     except ValueError:
         return jsonify({"error": "'days' must be an integer"}), 400
         
-    print(f"Received request for /model-backtest: Region={region}, Days={days}")
-    
-    data, error = backtest_model(region, days)
+    annotate(region=region, days=days)
+
+    if 'horizon' in request.args:
+        try:
+            horizon = int(request.args['horizon'])
+        except ValueError:
+            return jsonify({"error": "'horizon' must be an integer"}), 400
+        data, error = multistep_backtest_model(region, days, horizon)
+        if error and error.startswith("'horizon'"):
+            return jsonify({"error": error}), 400
+    else:
+        data, error = backtest_model(region, days)
     
     if error:
         return jsonify({"error": error}), 500
         
-    return jsonify(data)
+    with stage("json_encode"):
+        return jsonify(data)
+
+
+# --- 7. Region Registry Stats Route ---
+@app.route('/registry-stats', methods=['GET'])
+def handle_registry_stats():
+    """
+    Hit/miss/load-time counters and resident models for the region registry,
+    plus inference micro-batching and hot-reload counters.
+    """
+    stats = REGISTRY.stats()
+    stats["inference_backend"] = INFERENCE_BACKEND
+    if INFERENCE_BACKEND == "tflite":
+        from tflite_lstm import interpreter_name
+        stats["tflite_interpreter"] = interpreter_name()
+    stats["inference_batching"] = batching_stats()
+    stats["hot_reload"] = RELOADER.stats()
+    return jsonify(stats)
+
+
+# --- 8. Chat Session Stats Route ---
+@app.route('/chat-stats', methods=['GET'])
+def handle_chat_stats():
+    """
+    Number of live conversation sessions and how much history they hold.
+    """
+    return jsonify(get_session_stats())
+
+
+# --- 9. Upstream Stats Route ---
+@app.route('/upstream-stats', methods=['GET'])
+def handle_upstream_stats():
+    """
+    Concurrency, timeouts and fast-fail counts for the AccuWeather and Gemini
+    calls, plus the weather cache.
+    """
+    stats = upstream_stats()
+    stats["weather_client"] = WEATHER_CLIENT.stats()
+    return jsonify(stats)
+
+
+# --- 10. Forecast Scheduler Stats Route ---
+@app.route('/forecast-stats', methods=['GET'])
+def handle_forecast_stats():
+    """
+    When each region's materialized forecast was computed, hit/miss counts
+    and the last refresh error per region.
+    """
+    return jsonify(SCHEDULER.stats())
+
+
+# --- 11. Admin: Hot Reload Route ---
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+@app.route('/admin/reload', methods=['GET', 'POST'])
+def handle_admin_reload():
+    """
+    GET: what the hot-reload watcher has done so far.
+    POST: checks the regions' files now and reloads whatever changed, without
+    waiting for the watcher. Body (all optional):
+    {"regions": ["sirsi"], "force": false}   force re-reads everything.
+    Needs the X-Admin-Token header to match ADMIN_TOKEN.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Admin endpoints are disabled (ADMIN_TOKEN is not set)"}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({"error": "Invalid admin token"}), 401
+    if request.method == 'GET':
+        return jsonify(RELOADER.stats())
+
+    data = request.get_json(silent=True) or {}
+    region_list = data.get('regions') or list(regions)
+    unknown = [r for r in region_list if r not in regions]
+    if unknown:
+        return jsonify({"error": f"Invalid region(s): {', '.join(unknown)}"}), 400
+    # Someone asked for it, so don't wait for files to settle
+    results = RELOADER.check(region_list, force=bool(data.get('force')), settle=0)
+    return jsonify({"reloaded": results})
+
+
+# --- 12. Metrics Route ---
+# Counters the services already keep are read at scrape time
+def _registry_lookups():
+    stats = REGISTRY.stats()
+    return {(kind, result): stats[kind][key] for kind in REGISTRY.KINDS
+            for result, key in (("hit", "hits"), ("miss", "misses"), ("failure", "failures"))}
+
+
+def _upstream_outcomes():
+    return {(name, outcome): values[outcome] for name, values in upstream_stats().items()
+            for outcome in ("calls", "rejected", "timeouts", "errors")}
+
+
+metrics.CallbackMetric("pepper_registry_lookups_total", "Region registry lookups by artifact kind and result.",
+                       ("kind", "result"), _registry_lookups, type="counter")
+metrics.CallbackMetric("pepper_registry_resident_model_bytes", "Estimated size of the models held in memory.",
+                       (), lambda: {(): REGISTRY.stats()["model"]["resident_bytes"]})
+metrics.CallbackMetric("pepper_upstream_calls_total", "Calls to AccuWeather/Gemini by outcome.",
+                       ("upstream", "outcome"), _upstream_outcomes, type="counter")
+metrics.CallbackMetric("pepper_upstream_in_flight", "Upstream calls currently running.", ("upstream",),
+                       lambda: {(name,): values["in_flight"] for name, values in upstream_stats().items()})
+metrics.CallbackMetric("pepper_forecast_lookups_total", "Materialized forecast lookups by result.", ("result",),
+                       lambda: {(result,): SCHEDULER.stats()[key] for result, key in (("hit", "hits"), ("miss", "misses"))},
+                       type="counter")
+metrics.CallbackMetric("pepper_ready", "1 once this process has warmed up every region (see /ready).", (),
+                       lambda: {(): int(WARMUP.ready())})
+metrics.CallbackMetric("pepper_hot_reloads_total", "Artifacts swapped in by the hot-reload watcher.", (),
+                       lambda: {(): RELOADER.stats()["reloads"]}, type="counter")
+
+
+@app.route('/metrics', methods=['GET'])
+def handle_metrics():
+    """
+    Request counts, per-endpoint and per-stage latency histograms and the
+    services' own counters, in the Prometheus text format.
+    """
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+# --- 13. Readiness Route ---
+@app.route('/ready', methods=['GET'])
+def handle_ready():
+    """
+    Readiness, as opposed to / (the process is up): 200 once this process
+    has loaded every region's artifacts and run each model once (see
+    warmup.py), 503 until then. Regions that failed to warm up are listed
+    with their errors but don't hold readiness back.
+    """
+    status = WARMUP.status()
+    return jsonify(status), 200 if status["ready"] else 503
 
 
 # --- Run the server ---
 if __name__ == "__main__":
     port = int(os.environ.get('PORT', 5000))
-    print(f"Starting Flask server on http://127.0.0.1:{port}")
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    log.info(f"Starting Flask server on http://127.0.0.1:{port}")
+    debug = os.environ.get('FLASK_DEBUG', '0') == '1'   # opt in with FLASK_DEBUG=1
+    # With the reloader on, only the child process that serves requests runs the background threads
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warm_up()
+        start_forecast_scheduler()
+        start_hot_reload()
+    # Upstream calls wait on their own pools, so one slow AccuWeather or Gemini
+    # call only ties up the thread serving that request
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
\ No newline at end of file
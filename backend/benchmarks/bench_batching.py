@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_batching.py
+#
+# make_prediction throughput against concurrency, with and without the
+# per-region micro-batching queue:
+#   python backend/benchmarks/bench_batching.py [--concurrency 1 4 16 64] [--seconds 5]
+
+import os
+import sys
+import time
+import argparse
+import warnings
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import prediction_service
+from prediction_service import make_prediction, batching_stats, MODELS, SCALERS, HISTORICAL_DATA
+from stubs import fake_daily_forecasts
+from weather_service import _parse_forecasts
+from harness import summarize
+from datetime import date, timedelta
+
+
+def run(region, forecasts, concurrency, seconds):
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies = []
+
+    def worker():
+        own = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            _, error = make_prediction(region, forecasts)
+            if error:
+                raise RuntimeError(error)
+            own.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return len(latencies) / (time.perf_counter() - started), summarize(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched inference.")
+    parser.add_argument("--region", default="sirsi")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--days", type=int, default=5, help="forecast days per request")
+    args = parser.parse_args()
+    # sklearn complains about feature names once per scaler call
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    today = date.today()
+    forecasts = _parse_forecasts(fake_daily_forecasts(args.days + 1), today, today + timedelta(days=args.days))
+    # Load everything and warm up the model before timing
+    MODELS[args.region], SCALERS[args.region], HISTORICAL_DATA[args.region]
+    make_prediction(args.region, forecasts)
+
+    print(f"{args.region}, {len(forecasts)}-day forecasts, max batch {prediction_service.INFERENCE_MAX_BATCH}, "
+          f"max wait {prediction_service.INFERENCE_MAX_WAIT_MS:g} ms\n")
+    print(f"{'concurrency':>11} | {'unbatched req/s':>15} {'p95 ms':>8} | {'batched req/s':>13} {'p95 ms':>8} | speedup")
+    for concurrency in args.concurrency:
+        row = []
+        for enabled in (False, True):
+            prediction_service.INFERENCE_BATCHING = enabled
+            row.append(run(args.region, forecasts, concurrency, args.seconds))
+        (off, off_lat), (on, on_lat) = row
+        print(f"{concurrency:>11} | {off:>15.1f} {off_lat['p95_ms']:>8.1f} | {on:>13.1f} {on_lat['p95_ms']:>8.1f} | {on / off:.2f}x")
+
+    print(f"\nBatcher: {batching_stats()['regions'].get(args.region)}")
+
+
+if __name__ == "__main__":
+    main()
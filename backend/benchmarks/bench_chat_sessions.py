@@ -0,0 +1,58 @@
+# backend/benchmarks/bench_chat_sessions.py
+#
+# Offline load test of the per-conversation Gemini sessions, using the fake
+# model backend:
+#   python backend/benchmarks/bench_chat_sessions.py [--conversations 50] [--messages 30]
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ["GEMINI_BACKEND"] = "fake"
+os.environ.setdefault("GEMINI_FAKE_LATENCY_MS", "20")
+
+import numpy as np
+import gemini_service
+from gemini_service import get_ai_response, get_session_stats
+
+
+def run_conversation(conversation_id, n_messages):
+    timings = []
+    for i in range(n_messages):
+        start = time.perf_counter()
+        get_ai_response(f"Question {i}: how is the pepper market looking? " * 10, conversation_id=conversation_id)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test chat sessions with the fake Gemini backend.")
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=30)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.conversations) as pool:
+        results = list(pool.map(lambda c: run_conversation(f"conv-{c}", args.messages), range(args.conversations)))
+    elapsed = time.perf_counter() - start
+
+    ms = np.array([t for r in results for t in r]) * 1000
+    total = len(ms)
+    print(f"{total} messages over {args.conversations} conversations in {elapsed:.2f} s "
+          f"({total / elapsed:.0f} msg/s)")
+    print(f"latency p50 {np.percentile(ms, 50):.1f} ms | p95 {np.percentile(ms, 95):.1f} ms | "
+          f"p99 {np.percentile(ms, 99):.1f} ms")
+
+    stats = get_session_stats()
+    print(f"session stats: {stats}")
+    per_session_cap = 2 * gemini_service.MAX_HISTORY_TURNS
+    bounded = stats["history_messages"] <= per_session_cap * stats["sessions"]
+    print("history bounded: OK" if bounded else "history bounded: FAIL")
+    sys.exit(0 if bounded else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# backend/benchmarks/bench_dashboard.py
+#
+# Dashboard page load: the old fan-out (/latest-prices, 3x /historical-data,
+# /model-backtest, /historical-data for the table) against one /dashboard call.
+# The app runs in its own process so server CPU per page load can be measured.
+#   python backend/benchmarks/bench_dashboard.py [--pages 200] [--concurrency 1 8]
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import requests
+from harness import ServerProcess, summarize
+
+REGIONS = ["madikeri", "sirsi", "chikkamagaluru"]
+
+
+def fan_out_page(session, pool, url):
+    # Same order as DashboardPage: KPIs, then the three charts in parallel,
+    # then the performance and table tabs
+    session.get(f"{url}/latest-prices").raise_for_status()
+    for response in pool.map(lambda r: session.get(f"{url}/historical-data?region={r}&days=30"), REGIONS):
+        response.raise_for_status()
+    session.get(f"{url}/model-backtest?region=sirsi&days=90").raise_for_status()
+    session.get(f"{url}/historical-data?region=sirsi&days=180").raise_for_status()
+
+
+def dashboard_page(session, pool, url):
+    session.get(f"{url}/dashboard").raise_for_status()
+
+
+def measure(server, page, pages, concurrency):
+    def client(n):
+        session = requests.Session()
+        timings = []
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            for _ in range(n):
+                start = time.perf_counter()
+                page(session, pool, server.url)
+                timings.append(time.perf_counter() - start)
+        return timings
+
+    # Warm-up builds snapshots, backtests and caches
+    client(3)
+    cpu_before = server.cpu_seconds()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        results = list(clients.map(client, [pages // concurrency] * concurrency))
+    elapsed = time.perf_counter() - started
+    latencies = [t for r in results for t in r]
+    cpu = server.cpu_seconds() - cpu_before
+    return summarize(latencies), len(latencies) / elapsed, cpu / len(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard fan-out vs /dashboard.")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    env = {"FORECAST_SCHEDULER": "0", "GEMINI_BACKEND": "fake"}
+    with ServerProcess(port=args.port, env=env) as server:
+        print(f"{'page':<10} {'clients':>7} {'p50 ms':>8} {'p95 ms':>8} {'pages/s':>8} {'server CPU ms/page':>19}")
+        for concurrency in args.concurrency:
+            for name, page in (("fan-out", fan_out_page), ("dashboard", dashboard_page)):
+                stats, throughput, cpu_ms = measure(server, page, args.pages, concurrency)
+                print(f"{name:<10} {concurrency:>7} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+                      f"{throughput:>8.1f} {cpu_ms:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# backend/benchmarks/bench_data_loading.py
+#
+# Startup time and memory of loading HISTORICAL_DATA from CSV vs. the
+# memory-mapped columnar files. Build the columnar files first:
+#   python backend/columnar_store.py
+#   python backend/benchmarks/bench_data_loading.py [--repeat 20]
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import columnar_store
+from region_registry import REGION_CONFIG
+
+FEATURES = ['Max_Temp', 'Min_Temp', 'Rainfall', 'Price']
+
+
+def load_csv(config):
+    return pd.read_csv(config["data_path"], parse_dates=['Date'], index_col='Date')[FEATURES]
+
+
+def load_mmap(config):
+    return columnar_store.load_columnar(config["columnar_prefix"], columns=FEATURES)
+
+
+def measure(loader, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = [loader(config) for config in REGION_CONFIG.values()]
+        timings.append(time.perf_counter() - start)
+
+    # Heap allocated by one full load. Memory-mapped pages are not counted:
+    # they are file-backed and shared between every process that maps them.
+    tracemalloc.start()
+    frames = [loader(config) for config in REGION_CONFIG.values()]
+    heap_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rows = sum(len(f) for f in frames)
+    return min(timings) * 1000, sorted(timings)[len(timings) // 2] * 1000, heap_bytes, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs columnar loading.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    missing = [r for r, c in REGION_CONFIG.items() if not columnar_store.is_fresh(c["columnar_prefix"], c["data_path"])]
+    if missing:
+        print(f"Columnar files missing or stale for {missing}; run columnar_store.py first.")
+        sys.exit(1)
+
+    print(f"{'format':>8} | {'best ms':>8} | {'median ms':>9} | {'private heap':>12} | rows")
+    for name, loader in (("csv", load_csv), ("columnar", load_mmap)):
+        best, median, heap, rows = measure(loader, args.repeat)
+        print(f"{name:>8} | {best:8.2f} | {median:9.2f} | {heap / 1024:9.0f} KB | {rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# backend/benchmarks/bench_inference.py
+#
+# Per-step latency of one autoregressive forecast step, Keras vs NumPy.
+# Run from the repo root:
+#   python backend/benchmarks/bench_inference.py [--steps 200]
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from prediction_service import load_region_model, MODELS_DIR, WINDOW_SIZE
+
+
+def time_calls(model, x, n_steps):
+    model.predict(x, verbose=0)  # warm-up (graph tracing for Keras)
+    timings = []
+    for _ in range(n_steps):
+        start = time.perf_counter()
+        model.predict(x, verbose=0)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LSTM inference backends.")
+    parser.add_argument("--steps", type=int, default=200, help="predict() calls per backend")
+    parser.add_argument("--region", default="sirsi")
+    args = parser.parse_args()
+
+    model_path = os.path.join(MODELS_DIR, f"{args.region}_lstm.h5")
+    x = np.random.default_rng(0).random((1, WINDOW_SIZE, 4), dtype=np.float32)
+
+    results = {}
+    for backend in ("keras", "numpy"):
+        model = load_region_model(model_path, backend=backend)
+        ms = time_calls(model, x, args.steps)
+        results[backend] = ms
+        print(f"{backend:>6}: mean {ms.mean():7.3f} ms | p50 {np.percentile(ms, 50):7.3f} ms "
+              f"| p95 {np.percentile(ms, 95):7.3f} ms  ({args.steps} steps, batch=1)")
+
+    speedup = results["keras"].mean() / results["numpy"].mean()
+    print(f"NumPy backend is {speedup:.1f}x faster per forecast step.")
+
+
+if __name__ == "__main__":
+    main()
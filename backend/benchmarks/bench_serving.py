@@ -0,0 +1,156 @@
+# backend/benchmarks/bench_serving.py
+#
+# Start-up and memory of the ways to serve the backend, measured from the
+# moment the server process is spawned:
+#   dev        - python app.py (one process, warm-up on a background thread)
+#   gunicorn   - gunicorn -c gunicorn.conf.py app:app (preloaded, warmed master)
+#   no-preload - the same with GUNICORN_PRELOAD=0 (every worker imports and warms itself)
+# For each it reports the time to /ready returning 200, the time to the first
+# successful /predict (polled every --poll-ms) and how long that request took,
+# and the RSS and PSS of every process once traffic has reached the workers.
+# PSS splits shared pages between the processes sharing them, so the PSS
+# total is the real footprint.
+# AccuWeather is stubbed and Gemini faked; Linux-only (/proc).
+#
+#   python backend/benchmarks/bench_serving.py [--modes gunicorn no-preload] [--workers 4]
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import requests
+from stubs import StubAccuWeatherServer
+from harness import BACKEND_DIR
+
+MODES = ("dev", "gunicorn", "no-preload")
+REGIONS = ("sirsi", "madikeri", "chikkamagaluru")
+
+
+def _command(mode):
+    if mode == "dev":
+        return [sys.executable, "app.py"]
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"]
+
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def memory_mb(pid):
+    """{"rss_mb", "pss_mb"} of one process, from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[f"{key.lower()}_mb"] = round(int(rest.split()[0]) / 1024, 1)
+    return values
+
+
+def _predict(url, region, target):
+    try:
+        return requests.post(f"{url}/predict", json={"region": region, "date": target}, timeout=30).status_code
+    except requests.RequestException:
+        return None
+
+
+def run_mode(mode, env, port, workers, poll, timeout, warm_requests):
+    url = f"http://127.0.0.1:{port}"
+    target = (date.today() + timedelta(days=2)).isoformat()
+    env = dict(env, PORT=str(port), GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_WORKERS=str(workers),
+               GUNICORN_PRELOAD="0" if mode == "no-preload" else "1", FLASK_DEBUG="0")
+
+    started = time.perf_counter()
+    process = subprocess.Popen(_command(mode), cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    result = {"mode": mode}
+    try:
+        while time.perf_counter() - started < timeout and ("first_predict_s" not in result or "ready_s" not in result):
+            if process.poll() is not None:
+                raise RuntimeError(f"{mode}: server exited with code {process.returncode}")
+            if "ready_s" not in result:
+                try:
+                    if requests.get(f"{url}/ready", timeout=5).status_code == 200:
+                        result["ready_s"] = round(time.perf_counter() - started, 3)
+                except requests.RequestException:
+                    pass
+            if "first_predict_s" not in result:
+                sent = time.perf_counter()
+                if _predict(url, REGIONS[0], target) == 200:
+                    result["first_predict_s"] = round(time.perf_counter() - started, 3)
+                    result["first_predict_latency_ms"] = round((time.perf_counter() - sent) * 1000, 1)
+            time.sleep(poll)
+        if "first_predict_s" not in result:
+            raise RuntimeError(f"{mode}: no successful /predict within {timeout}s")
+
+        # Spread some traffic over the workers and regions before measuring memory
+        statuses = [_predict(url, REGIONS[i % len(REGIONS)], target) for i in range(warm_requests)]
+        result["warm_requests_ok"] = statuses.count(200)
+        time.sleep(0.5)
+
+        processes = [("master" if mode != "dev" else "server", process.pid)]
+        processes += [(f"worker {i + 1}", pid) for i, pid in enumerate(_children(process.pid)) if mode != "dev"]
+        result["processes"] = {name: memory_mb(pid) for name, pid in processes}
+        result["pss_total_mb"] = round(sum(p["pss_mb"] for p in result["processes"].values()), 1)
+        result["rss_total_mb"] = round(sum(p["rss_mb"] for p in result["processes"].values()), 1)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first /predict and per-process memory, per serving mode.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=5098)
+    parser.add_argument("--poll-ms", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=180)
+    parser.add_argument("--warm-requests", type=int, default=60)
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    stub = StubAccuWeatherServer().start()
+    env = dict(
+        os.environ,
+        ACCUWEATHER_BASE_URL=stub.base_url, ACCUWEATHER_API_KEY="bench",
+        GEMINI_BACKEND="fake", LOG_SAMPLE_RATE="0",
+        # Every /predict is computed on demand rather than served from the scheduler's forecasts
+        FORECAST_SCHEDULER="0", HOT_RELOAD="0",
+    )
+    try:
+        results = [run_mode(mode, env, args.port, args.workers, args.poll_ms / 1000, args.timeout, args.warm_requests)
+                   for mode in args.modes]
+    finally:
+        stub.stop()
+
+    print(f"Inference backend: {os.getenv('INFERENCE_BACKEND', 'keras')}, {args.workers} gunicorn workers\n")
+    print(f"{'mode':<12} {'ready':>8} {'1st predict':>12} {'(latency)':>10} {'RSS total':>10} {'PSS total':>10}   "
+          f"per process RSS/PSS (MB)")
+    for r in results:
+        per_process = ", ".join(f"{name} {m['rss_mb']:.0f}/{m['pss_mb']:.0f}" for name, m in r["processes"].items())
+        ready = f"{r['ready_s']:.2f}s" if "ready_s" in r else "-"
+        print(f"{r['mode']:<12} {ready:>8} {r['first_predict_s']:>11.2f}s {r['first_predict_latency_ms']:>8.0f}ms "
+              f"{r['rss_total_mb']:>9.0f}M {r['pss_total_mb']:>9.0f}M   {per_process}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_slow_upstreams.py
+#
+# Load test: /latest-prices and /historical-data latency while AccuWeather and
+# Gemini are artificially slow and /predict + /chat traffic keeps hitting them.
+# Runs the real Flask app on a threaded werkzeug server, with the stub
+# AccuWeather server and the fake Gemini backend:
+#   python backend/benchmarks/bench_slow_upstreams.py [--delay 5] [--load-threads 32]
+
+import os
+import sys
+import time
+import json
+import argparse
+import threading
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import requests
+from stubs import StubAccuWeatherServer
+from harness import AppServer, summarize
+
+PROBES = [
+    ("GET", "/latest-prices", None),
+    ("GET", "/historical-data?region=sirsi&days=365", None),
+    ("GET", "/historical-data?region=madikeri&days=3650&max_points=500", None),
+]
+
+
+def probe(base_url, rounds):
+    """Sequential requests to the cheap endpoints; returns {path: latencies}."""
+    session = requests.Session()
+    timings = {path: [] for _, path, _ in PROBES}
+    for _ in range(rounds):
+        for method, path, body in PROBES:
+            start = time.perf_counter()
+            response = session.request(method, base_url + path, json=body)
+            timings[path].append(time.perf_counter() - start)
+            response.raise_for_status()
+    return timings
+
+
+def background_load(base_url, stop, counts, lock):
+    session = requests.Session()
+    target = (date.today() + timedelta(days=2)).isoformat()
+    i = 0
+    while not stop.is_set():
+        if i % 2:
+            request = ("/predict", {"region": ["madikeri", "sirsi", "chikkamagaluru"][i % 3], "date": target})
+        else:
+            request = ("/chat", {"message": f"Tell me about pepper vine disease number {i}", "no_cache": True})
+        start = time.perf_counter()
+        try:
+            response = session.post(base_url + request[0], json=request[1], timeout=60)
+            key = f"{request[0]} {response.status_code}"
+        except requests.RequestException:
+            key = f"{request[0]} failed"
+        with lock:
+            counts.setdefault(key, []).append(time.perf_counter() - start)
+        i += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cheap-endpoint latency while upstreams are slow.")
+    parser.add_argument("--delay", type=float, default=5.0, help="AccuWeather and Gemini latency, seconds")
+    parser.add_argument("--deadline", type=float, default=2.0, help="per-call upstream deadline, seconds")
+    parser.add_argument("--load-threads", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    stub = StubAccuWeatherServer(delay=args.delay).start()
+    os.environ.update({
+        "ACCUWEATHER_BASE_URL": stub.base_url,
+        "ACCUWEATHER_API_KEY": "bench",
+        # Every /predict goes upstream; only the stale fallback can help
+        "WEATHER_CACHE_TTL_SECONDS": "0",
+        "ACCUWEATHER_DEADLINE_SECONDS": str(args.deadline),
+        "ACCUWEATHER_READ_TIMEOUT": str(args.delay * 2),
+        "GEMINI_BACKEND": "fake",
+        "GEMINI_FAKE_LATENCY_MS": str(int(args.delay * 1000)),
+        "GEMINI_DEADLINE_SECONDS": str(args.deadline),
+    })
+    from app import app
+    from upstream import upstream_stats
+
+    with AppServer(app) as server:
+        probe(server.url, 3)  # build snapshots and load data
+        idle = probe(server.url, args.rounds)
+
+        stop, lock, counts = threading.Event(), threading.Lock(), {}
+        workers = [threading.Thread(target=background_load, args=(server.url, stop, counts, lock), daemon=True)
+                   for _ in range(args.load_threads)]
+        for w in workers:
+            w.start()
+        time.sleep(args.delay)  # let the upstream pools fill up
+        loaded = probe(server.url, args.rounds)
+        stop.set()
+        for w in workers:
+            w.join(timeout=args.delay * 3)
+
+    stub.stop()
+    print(f"Upstream delay {args.delay}s, deadline {args.deadline}s, {args.load_threads} /predict+/chat threads\n")
+    print(f"{'endpoint':<62} {'idle p50/p95':>16} {'loaded p50/p95':>18}")
+    for path in idle:
+        a, b = summarize(idle[path]), summarize(loaded[path])
+        print(f"{path:<62} {a['p50_ms']:>7.1f}/{a['p95_ms']:<7.1f}ms {b['p50_ms']:>7.1f}/{b['p95_ms']:<7.1f}ms")
+    print("\nBackground requests (count, p50 / max):")
+    for key, latencies in sorted(counts.items()):
+        s = summarize(latencies)
+        print(f"  {key:<20} {s['count']:>5}  {s['p50_ms']:>8.1f} / {s['max_ms']:.1f} ms")
+    print("\nUpstreams:")
+    print(json.dumps(upstream_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
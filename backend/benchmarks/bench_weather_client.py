@@ -0,0 +1,59 @@
+# backend/benchmarks/bench_weather_client.py
+#
+# Checks and times the AccuWeather client's cache and request coalescing
+# against a local stub server (no network or API key needed):
+#   python backend/benchmarks/bench_weather_client.py [--concurrency 50] [--delay 0.2]
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from stubs import StubAccuWeatherServer
+from weather_service import AccuWeatherClient, LOCATION_KEYS, get_future_weather
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AccuWeather client offline.")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.2, help="stub upstream latency in seconds")
+    args = parser.parse_args()
+
+    region = "sirsi"
+    today = datetime.now().date()
+    target_dates = [(today + timedelta(days=1 + i % 4)).isoformat() for i in range(args.concurrency)]
+
+    with StubAccuWeatherServer(delay=args.delay) as stub:
+        client = AccuWeatherClient("stub-key", forecast_url=stub.forecast_url, cache_ttl=60)
+
+        # 1. Cold: concurrent requests for one location, different target dates
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda d: get_future_weather(region, d, client=client), target_dates))
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        errors = [r for r in results if isinstance(r, dict)]
+        upstream = stub.hits[LOCATION_KEYS[region]]
+        print(f"cold: {args.concurrency} concurrent requests in {cold_ms:.1f} ms, "
+              f"{upstream} upstream call(s), {len(errors)} error(s)")
+
+        # 2. Warm: same requests served from the TTL cache
+        start = time.perf_counter()
+        for d in target_dates:
+            get_future_weather(region, d, client=client)
+        warm_ms = (time.perf_counter() - start) * 1000 / len(target_dates)
+        print(f"warm: {warm_ms:.3f} ms per request, "
+              f"{stub.hits[LOCATION_KEYS[region]]} upstream call(s) total")
+        print(f"client stats: {client.stats()}")
+
+    ok = not errors and stub.hits[LOCATION_KEYS[region]] == 1
+    print("OK" if ok else "FAIL: expected exactly one upstream call and no errors")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# backend/benchmarks/harness.py
+#
+# Helpers shared by the endpoint load tests: run the Flask app on a real
+# threaded werkzeug server and summarize latencies.
+
+import os
+import sys
+import time
+import logging
+import threading
+import subprocess
+
+import numpy as np
+import requests
+from werkzeug.serving import make_server
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class AppServer:
+    """
+    Serves a WSGI app on 127.0.0.1 from a background thread.
+
+        with AppServer(app) as server:
+            requests.get(f"{server.url}/latest-prices")
+    """
+
+    def __init__(self, app, host="127.0.0.1", port=0):
+        # One access-log line per request would dominate the measurements
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        self.httpd = make_server(host, port, app, threaded=True)
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.httpd.host}:{self.httpd.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class ServerProcess:
+    """
+    Serves backend/app.py from a separate Python process (threaded werkzeug),
+    so its CPU time and memory can be measured apart from the load generator's.
+    cpu_seconds() and rss_mb() read /proc and are Linux-only.
+
+        with ServerProcess(port=5099, env={"INFERENCE_BACKEND": "numpy"}) as server:
+            before = server.cpu_seconds()
+    """
+
+    def __init__(self, port=5099, env=None, startup_timeout=120):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.env = dict(os.environ, **(env or {}))
+        self.startup_timeout = startup_timeout
+        self.process = None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "serve", str(self.port)],
+            cwd=BACKEND_DIR, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"server exited with code {self.process.returncode}")
+            try:
+                requests.get(self.url + "/", timeout=1)
+                return self
+            except requests.RequestException:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError("server did not start in time")
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.process.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime and stime are fields 14 and 15 of /proc/<pid>/stat
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def rss_mb(self):
+        with open(f"/proc/{self.process.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+        return None
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def summarize(latencies):
+    """p50/p95/p99/max in milliseconds for a list of durations in seconds."""
+    if not latencies:
+        return {"count": 0}
+    ms = np.asarray(latencies) * 1000
+    return {
+        "count": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["serve"]:
+    sys.path.insert(0, BACKEND_DIR)
+    from app import app
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    make_server("127.0.0.1", int(sys.argv[2]), app, threaded=True).serve_forever()
@@ -0,0 +1,330 @@
+# backend/benchmarks/run_suite.py
+#
+# Offline regression benchmark for the backend. Stubs AccuWeather
+# (StubAccuWeatherServer) and Gemini (GEMINI_BACKEND=fake), then measures:
+#   startup - importing app.py, the first /predict, and memory after each
+#   micro   - make_prediction, backtest_model, get_historical_data and
+#             get_history_window at several history lengths
+#   load    - /predict, /chat, /historical-data, /model-backtest and
+#             /latest-prices at several concurrency levels (p50/p95/p99, req/s)
+# Every number goes into one flat {"metric name": value} dict in a JSON file,
+# which a later run can be compared against:
+#
+#   python backend/benchmarks/run_suite.py --save-baseline          # store benchmarks/baseline.json
+#   python backend/benchmarks/run_suite.py                          # compare against it; exit 1 on regressions
+#   python backend/benchmarks/run_suite.py --quick --sections micro --output /tmp/run.json
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import threading
+from datetime import date, datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import requests
+from stubs import StubAccuWeatherServer, fake_daily_forecasts
+from harness import BACKEND_DIR, ServerProcess, summarize
+
+SECTIONS = ("startup", "micro", "load")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Ignore differences smaller than this, whatever the ratio: sub-millisecond
+# timings jitter by more than any sensible tolerance
+NOISE_FLOOR = {"_ms": 0.5, "_seconds": 0.05, "_mb": 5.0, "_rps": 1.0}
+
+
+def _offline_env(stub, gemini_latency_ms):
+    return {
+        "ACCUWEATHER_BASE_URL": stub.base_url,
+        "ACCUWEATHER_API_KEY": "bench",
+        "GEMINI_BACKEND": "fake",
+        "GEMINI_FAKE_LATENCY_MS": str(gemini_latency_ms),
+        "FORECAST_SCHEDULER": "0",
+        "HOT_RELOAD": "0",
+    }
+
+
+# --- Startup ---
+_STARTUP_SCRIPT = """
+import json, os, time
+def rss_mb():
+    with open("/proc/self/status") as f:
+        return next(int(l.split()[1]) / 1024 for l in f if l.startswith("VmRSS:"))
+started = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+rss_imported = rss_mb()
+response = app.test_client().post("/predict", json={"region": os.environ["BENCH_REGION"], "date": os.environ["BENCH_DATE"]})
+assert response.status_code == 200, response.get_data(as_text=True)
+print(json.dumps({"import_seconds": imported - started, "first_predict_seconds": time.perf_counter() - imported,
+                  "rss_after_import_mb": rss_imported, "rss_after_first_predict_mb": rss_mb()}))
+"""
+
+
+def run_startup(env, region, runs):
+    """Each run is a fresh interpreter; the fastest run is reported (least disturbed by the OS)."""
+    target = (date.today() + timedelta(days=2)).isoformat()
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT], cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+            env=dict(os.environ, **env, BENCH_REGION=region, BENCH_DATE=target),
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    metrics = {}
+    for key in samples[0]:
+        metrics[f"startup.{key}"] = round(min(s[key] for s in samples), 3)
+    return metrics
+
+
+# --- Micro-benchmarks ---
+def _timings(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _record(metrics, name, timings):
+    stats = summarize(timings)
+    metrics[f"{name}.p50_ms"] = stats["p50_ms"]
+    metrics[f"{name}.p95_ms"] = stats["p95_ms"]
+
+
+def run_micro(region, sizes, repeat):
+    """
+    Runs the service functions in-process. History length is varied by
+    swapping a truncated copy of the region's data into the registry.
+    """
+    import history_service
+    from prediction_service import (REGISTRY, make_prediction, backtest_model, get_historical_data,
+                                    drop_derived)
+    from weather_service import _parse_forecasts
+
+    today = date.today()
+    forecasts = _parse_forecasts(fake_daily_forecasts(), today, today + timedelta(days=5))
+    full = REGISTRY.get_data(region)
+    metrics = {}
+    try:
+        for size in sizes:
+            rows = min(size or len(full), len(full))
+            REGISTRY.reload(region, ["data"], {"data": full.tail(rows)})
+            prefix = f"micro.rows_{'full' if size is None else rows}"
+
+            make_prediction(region, forecasts)
+            _record(metrics, f"{prefix}.make_prediction", _timings(lambda: make_prediction(region, forecasts), repeat))
+
+            def cold_backtest():
+                drop_derived(region)
+                backtest_model(region, 365)
+            _record(metrics, f"{prefix}.backtest_model_cold", _timings(cold_backtest, max(3, repeat // 10)))
+            _record(metrics, f"{prefix}.backtest_model_365d", _timings(lambda: backtest_model(region, 365), repeat))
+
+            for days in (30, 365):
+                _record(metrics, f"{prefix}.get_historical_data_{days}d",
+                        _timings(lambda: get_historical_data(region, days), repeat))
+
+            def cold_history():
+                history_service._SNAPSHOTS.pop(region, None)
+                history_service.get_history_window(region, days=365)
+            _record(metrics, f"{prefix}.get_history_window_cold", _timings(cold_history, max(3, repeat // 10)))
+            _record(metrics, f"{prefix}.get_history_window_365d",
+                    _timings(lambda: history_service.get_history_window(region, days=365), repeat))
+    finally:
+        REGISTRY.reload(region, ["data"], {"data": full})
+    return metrics
+
+
+# --- Endpoint load tests ---
+def _load_requests(region):
+    target = (date.today() + timedelta(days=2)).isoformat()
+    counter = iter(range(10 ** 9))
+    return {
+        "predict": lambda: ("POST", "/predict", {"region": region, "date": target}),
+        # A new message every time: the response cache would otherwise answer
+        "chat": lambda: ("POST", "/chat", {"message": f"How do I store pepper, batch {next(counter)}?",
+                                          "no_cache": True}),
+        "historical_data": lambda: ("GET", f"/historical-data?region={region}&days=365", None),
+        "model_backtest": lambda: ("GET", f"/model-backtest?region={region}&days=90", None),
+        "latest_prices": lambda: ("GET", "/latest-prices", None),
+    }
+
+
+def _load_level(url, make_request, total, concurrency):
+    errors = []
+    lock = threading.Lock()
+
+    def client(n):
+        session = requests.Session()
+        timings = []
+        for _ in range(n):
+            method, path, body = make_request()
+            start = time.perf_counter()
+            response = session.request(method, url + path, json=body, timeout=120)
+            timings.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                with lock:
+                    errors.append(response.status_code)
+        return timings
+
+    per_client = max(1, total // concurrency)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client, [per_client] * concurrency))
+    elapsed = time.perf_counter() - started
+    latencies = [t for r in results for t in r]
+    return summarize(latencies), len(latencies) / elapsed, errors
+
+
+def run_load(env, region, concurrency_levels, total, port):
+    metrics = {}
+    with ServerProcess(port=port, env=env) as server:
+        metrics["load.server_rss_idle_mb"] = round(server.rss_mb(), 1)
+        for name, make_request in _load_requests(region).items():
+            _load_level(server.url, make_request, 5, 1)  # warm-up: loads artifacts, builds caches
+            for concurrency in concurrency_levels:
+                stats, throughput, errors = _load_level(server.url, make_request, total, concurrency)
+                prefix = f"load.{name}.c{concurrency}"
+                for key in ("p50_ms", "p95_ms", "p99_ms"):
+                    metrics[f"{prefix}.{key}"] = stats[key]
+                metrics[f"{prefix}.throughput_rps"] = round(throughput, 1)
+                metrics[f"{prefix}.errors"] = len(errors)
+                print(f"  {name:<16} c={concurrency:<3} p50 {stats['p50_ms']:>8.2f} ms  p99 {stats['p99_ms']:>8.2f} ms  "
+                      f"{throughput:>8.1f} req/s  errors {len(errors)}")
+        metrics["load.server_rss_after_mb"] = round(server.rss_mb(), 1)
+    return metrics
+
+
+# --- Baseline comparison ---
+def _direction(name):
+    """+1 if bigger is better, -1 if smaller is better, 0 if not compared."""
+    if name.endswith("_rps"):
+        return 1
+    if name.endswith(("_ms", "_seconds", "_mb", ".errors")):
+        return -1
+    return 0
+
+
+def compare(current, baseline, tolerance):
+    """Returns (regressions, improvements) as lists of (name, old, new, relative change)."""
+    regressions, improvements = [], []
+    for name, new in current.items():
+        old = baseline.get(name)
+        direction = _direction(name)
+        if old is None or not direction:
+            continue
+        floor = next((v for suffix, v in NOISE_FLOOR.items() if name.endswith(suffix)), 0.0)
+        if abs(new - old) <= floor:
+            continue
+        change = (new - old) / old if old else float("inf")
+        if change * direction < -tolerance:
+            regressions.append((name, old, new, change))
+        elif change * direction > tolerance:
+            improvements.append((name, old, new, change))
+    return regressions, improvements
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with baseline comparison.")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--region", default="sirsi")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[500, 2000, 0],
+                        help="history lengths for the micro-benchmarks, 0 = full history")
+    parser.add_argument("--repeat", type=int, default=50, help="calls per micro-benchmark")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and concurrency level")
+    parser.add_argument("--startup-runs", type=int, default=3)
+    parser.add_argument("--gemini-latency-ms", type=int, default=50)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and requests, for a smoke run")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="also write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative change that counts as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args()
+    if args.quick:
+        args.repeat, args.requests, args.startup_runs = 10, 40, 1
+
+    stub = StubAccuWeatherServer().start()
+    env = _offline_env(stub, args.gemini_latency_ms)
+    # The micro-benchmarks import the services into this process
+    os.environ.update(env)
+    sys.path.insert(0, BACKEND_DIR)
+
+    metrics = {}
+    started = time.perf_counter()
+    try:
+        if "startup" in args.sections:
+            print("Startup...")
+            metrics.update(run_startup(env, args.region, args.startup_runs))
+        if "micro" in args.sections:
+            print("Micro-benchmarks...")
+            metrics.update(run_micro(args.region, [s or None for s in args.sizes], args.repeat))
+        if "load" in args.sections:
+            print("Load tests...")
+            metrics.update(run_load(env, args.region, args.concurrency, args.requests, args.port))
+    finally:
+        stub.stop()
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "inference_backend": os.getenv("INFERENCE_BACKEND", "keras"),
+            "regions_config": os.getenv("REGIONS_CONFIG"),
+        },
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "save_baseline")},
+        "total_seconds": round(time.perf_counter() - started, 1),
+        "metrics": metrics,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n{len(metrics)} metrics written to {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved as baseline: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline to store one).")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions, improvements = compare(metrics, baseline["metrics"], args.tolerance)
+    print(f"\nCompared with baseline from {baseline.get('created_at')} (commit {baseline.get('commit')}), "
+          f"tolerance {args.tolerance:.0%}:")
+    for label, rows in (("Regressions", regressions), ("Improvements", improvements)):
+        print(f"  {label}: {len(rows)}")
+        for name, old, new, change in sorted(rows, key=lambda r: -abs(r[3])):
+            print(f"    {name:<60} {old:>10.2f} -> {new:>10.2f}  ({change:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# backend/benchmarks/stubs.py
+#
+# Offline stand-ins for the upstream APIs, so the services can be exercised
+# and benchmarked without network access or API keys.
+
+import json
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_daily_forecasts(days=5, start=None):
+    """A DailyForecasts payload shaped like AccuWeather's, starting today."""
+    start = start or datetime.now().date()
+    forecasts = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        forecasts.append({
+            "Date": f"{day.isoformat()}T07:00:00+05:30",
+            "Temperature": {
+                "Minimum": {"Value": 19.0 + 0.3 * i, "Unit": "C"},
+                "Maximum": {"Value": 28.0 + 0.5 * i, "Unit": "C"},
+            },
+            "Day": {"Rain": {"Value": 2.5 * (i % 3), "Unit": "mm"}},
+        })
+    return forecasts
+
+
+class StubAccuWeatherServer:
+    """
+    Local HTTP server answering /forecasts/v1/daily/5day/<location_key>.
+    Counts requests per location key and can add an artificial delay.
+
+        with StubAccuWeatherServer(delay=0.2) as stub:
+            client = AccuWeatherClient("test-key", forecast_url=stub.forecast_url)
+    """
+
+    def __init__(self, delay=0.0, host="127.0.0.1", port=0):
+        self.delay = delay
+        self.hits = Counter()
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                prefix = "/forecasts/v1/daily/5day/"
+                if not path.startswith(prefix):
+                    self.send_error(404)
+                    return
+                with stub._lock:
+                    stub.hits[path[len(prefix):]] += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                body = json.dumps({"DailyForecasts": fake_daily_forecasts()}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def forecast_url(self):
+        return f"{self.base_url}/forecasts/v1/daily/5day/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
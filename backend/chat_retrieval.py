@@ -0,0 +1,253 @@
+# backend/chat_retrieval.py
+
+import re
+import calendar
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from prediction_service import HISTORICAL_DATA, REGISTRY
+
+# --- Retrieval layer for /chat ---
+# Turns "what was the sirsi price on 3 March 2024?" into a price from our own
+# records without calling dateparser for the common cases, and answers simple
+# range questions ("average price last month") directly.
+
+# A requested date with no record gets the nearest one within this many days
+MAX_NEAREST_GAP_DAYS = 7
+PARSE_CACHE_SIZE = 4096
+
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+_MONTH_RE = r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+
+_ISO_RE = re.compile(r"\b(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})\b")
+_DMY_RE = re.compile(r"\b(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})\b")
+_D_MON_Y_RE = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?(?:\s+of)?\s+" + _MONTH_RE + r"\.?,?\s+(\d{4})\b")
+_MON_D_Y_RE = re.compile(r"\b" + _MONTH_RE + r"\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b")
+_D_MON_RE = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?(?:\s+of)?\s+" + _MONTH_RE + r"\b")
+_MON_D_RE = re.compile(r"\b" + _MONTH_RE.replace("|may|", "|") + r"\.?\s+(\d{1,2})(?:st|nd|rd|th)?\b")
+# "may" is also a verb ("what may 3 days of rain do"), so without a year
+# "may 3" only counts with an ordinal or at the end of a phrase
+_MAY_D_RE = re.compile(r"\b(may)\s+(\d{1,2})(?:(?:st|nd|rd|th)\b|(?=\s*(?:[?.,!;]|$)))")
+_AGO_RE = re.compile(r"\b(\d+|a|one)\s+(day|week)s?\s+ago\b")
+
+_AGGREGATE_RE = re.compile(r"\b(average|avg|mean|highest|max(?:imum)?|lowest|min(?:imum)?)\b")
+_LAST_N_DAYS_RE = re.compile(r"\b(?:last|past|previous)\s+(\d+)\s+days\b")
+_MONTH_YEAR_RE = re.compile(r"\b" + _MONTH_RE + r"\.?,?\s+(\d{4})\b")
+_YEAR_RE = re.compile(r"\b(?:in|for|during)\s+(\d{4})\b")
+
+
+def _normalize(message):
+    return " ".join(message.lower().split())
+
+
+def _safe_date(year, month, day):
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _fast_parse(text, today):
+    """Common date formats and relative phrases; None if nothing matched."""
+    m = _ISO_RE.search(text)
+    if m:
+        return _safe_date(m.group(1), m.group(2), m.group(3))
+    m = _DMY_RE.search(text)
+    if m:
+        # Day-first, as written in India
+        return _safe_date(m.group(3), m.group(2), m.group(1))
+    m = _D_MON_Y_RE.search(text)
+    if m:
+        return _safe_date(m.group(3), MONTHS[m.group(2)], m.group(1))
+    m = _MON_D_Y_RE.search(text)
+    if m:
+        return _safe_date(m.group(3), MONTHS[m.group(1)], m.group(2))
+
+    # Day and month without a year: the most recent such date
+    m = _D_MON_RE.search(text)
+    day_month = (m.group(1), MONTHS[m.group(2)]) if m else None
+    if day_month is None:
+        m = _MON_D_RE.search(text) or _MAY_D_RE.search(text)
+        day_month = (m.group(2), MONTHS[m.group(1)]) if m else None
+    if day_month:
+        parsed = _safe_date(today.year, day_month[1], day_month[0])
+        if parsed and parsed > today:
+            parsed = _safe_date(today.year - 1, day_month[1], day_month[0])
+        return parsed
+
+    if "day before yesterday" in text:
+        return today - timedelta(days=2)
+    if "yesterday" in text:
+        return today - timedelta(days=1)
+    if "today" in text:
+        return today
+    m = _AGO_RE.search(text)
+    if m:
+        n = 1 if m.group(1) in ("a", "one") else int(m.group(1))
+        return today - timedelta(days=n * (7 if m.group(2) == "week" else 1))
+    return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _dateparser_parse(text, today):
+    # 'today' is part of the cache key so relative phrases don't go stale
+    import dateparser
+    parsed = dateparser.parse(text, settings={'PREFER_DATES_FROM': 'past'})
+    return parsed.date() if parsed else None
+
+
+def warm_up_dateparser():
+    """dateparser loads its language data on first use, which takes over a second."""
+    import dateparser
+    dateparser.parse("last tuesday", settings={'PREFER_DATES_FROM': 'past'})
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_date_cached(text, today):
+    parsed = _fast_parse(text, today)
+    if parsed is None:
+        parsed = _dateparser_parse(text, today)
+    return parsed
+
+
+def parse_date(message, today=None):
+    """
+    Finds a single date in a chat message. Tries the precompiled patterns
+    first and only falls back to dateparser when none of them match.
+    """
+    return _parse_date_cached(_normalize(message), today or date.today())
+
+
+def parse_range(message, today=None):
+    """
+    Recognises aggregate questions over a period ("average price last month",
+    "highest rate in March 2024"). Returns (start, end, label, aggregate) or None.
+    """
+    text = _normalize(message)
+    today = today or date.today()
+    m = _AGGREGATE_RE.search(text)
+    if not m:
+        return None
+    aggregate = m.group(1)
+    aggregate = "mean" if aggregate in ("average", "avg", "mean") else ("max" if aggregate.startswith(("highest", "max")) else "min")
+
+    m = _LAST_N_DAYS_RE.search(text)
+    if m:
+        n = int(m.group(1))
+        return today - timedelta(days=n), today, f"the last {n} days", aggregate
+    if "last week" in text or "past week" in text:
+        return today - timedelta(days=7), today, "the last week", aggregate
+    if "this month" in text:
+        return today.replace(day=1), today, today.strftime("%B %Y"), aggregate
+    if "last month" in text or "previous month" in text:
+        end = today.replace(day=1) - timedelta(days=1)
+        return end.replace(day=1), end, end.strftime("%B %Y"), aggregate
+    if "this year" in text:
+        return date(today.year, 1, 1), today, str(today.year), aggregate
+    if "last year" in text or "previous year" in text:
+        return date(today.year - 1, 1, 1), date(today.year - 1, 12, 31), str(today.year - 1), aggregate
+    m = _MONTH_YEAR_RE.search(text)
+    if m:
+        month = MONTHS[m.group(1)]
+        year = int(m.group(2))
+        last_day = calendar.monthrange(year, month)[1]
+        return date(year, month, 1), date(year, month, last_day), f"{calendar.month_name[month]} {year}", aggregate
+    m = _YEAR_RE.search(text)
+    if m:
+        year = int(m.group(1))
+        return date(year, 1, 1), date(year, 12, 31), str(year), aggregate
+    return None
+
+
+class PriceIndex:
+    """Sorted day numbers + prices for one region; O(log n) lookups."""
+
+    def __init__(self, version, df):
+        self.version = version
+        days = df.index.values.astype('datetime64[D]')
+        prices = df['Price'].to_numpy(dtype=np.float64)
+        # Keep the first record for duplicate dates, as handle_chat always did
+        order = np.argsort(days, kind='stable')
+        days, prices = days[order], prices[order]
+        keep = np.concatenate([[True], days[1:] != days[:-1]]) if len(days) else np.array([], dtype=bool)
+        self.days = days[keep]
+        self.prices = prices[keep]
+
+    def lookup(self, day, max_gap_days=MAX_NEAREST_GAP_DAYS):
+        """
+        Returns (date, price, exact) for day, or the nearest record within
+        max_gap_days, or None.
+        """
+        if not len(self.days):
+            return None
+        target = np.datetime64(day, 'D')
+        i = int(np.searchsorted(self.days, target))
+        candidates = [j for j in (i - 1, i) if 0 <= j < len(self.days)]
+        j = min(candidates, key=lambda k: (abs(int((self.days[k] - target).astype(int))), -k))
+        gap = abs(int((self.days[j] - target).astype(int)))
+        if gap > max_gap_days:
+            return None
+        return self.days[j].astype(date), float(self.prices[j]), gap == 0
+
+    def range_stats(self, start, end):
+        lo = int(np.searchsorted(self.days, np.datetime64(start, 'D'), side='left'))
+        hi = int(np.searchsorted(self.days, np.datetime64(end, 'D'), side='right'))
+        if lo >= hi:
+            return None
+        window = self.prices[lo:hi]
+        return {
+            "count": hi - lo,
+            "first_date": self.days[lo].astype(date),
+            "last_date": self.days[hi - 1].astype(date),
+            "mean": float(window.mean()),
+            "min": float(window.min()),
+            "max": float(window.max()),
+        }
+
+    def latest(self):
+        return self.days[-1].astype(date), float(self.prices[-1])
+
+
+_INDEXES = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_price_index(region):
+    """Current price index for a region, rebuilt if the data changed. Raises KeyError."""
+    df = HISTORICAL_DATA[region]
+    version = REGISTRY.version("data", region)
+    index = _INDEXES.get(region)
+    if index is None or index.version != version:
+        with _INDEX_LOCK:
+            index = _INDEXES.get(region)
+            if index is None or index.version != version:
+                index = PriceIndex(version, df)
+                _INDEXES[region] = index
+    return index
+
+
+def answer_range_question(region, message, today=None):
+    """
+    Direct answer for aggregate price questions, or None if the message
+    isn't one (or we have no data for the period).
+    """
+    parsed = parse_range(message, today)
+    if parsed is None:
+        return None
+    start, end, label, aggregate = parsed
+    stats = get_price_index(region).range_stats(start, end)
+    if stats is None:
+        return None
+
+    name = region.capitalize()
+    span = f"{stats['first_date']:%d %b %Y} to {stats['last_date']:%d %b %Y}, {stats['count']} days of records"
+    if aggregate == "mean":
+        return (f"The average black pepper price in {name} for {label} was ₹{stats['mean']:,.2f} "
+                f"({span}). Prices ranged from ₹{stats['min']:,.2f} to ₹{stats['max']:,.2f}.")
+    word = "highest" if aggregate == "max" else "lowest"
+    return f"The {word} black pepper price in {name} for {label} was ₹{stats[aggregate]:,.2f} ({span})."
@@ -0,0 +1,93 @@
+# backend/columnar_store.py
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# --- Columnar binary copies of data/*_merged.csv ---
+# For each region we write, under data/columnar/:
+#   <region>.features.npy  float32, shape (n_features, n_rows): one contiguous row per column
+#   <region>.dates.npy     int32 days since 1970-01-01
+#   <region>.json          column names + stat of the source CSV it was built from
+# Loading memory-maps the .npy files, so forked workers share the same pages
+# instead of each holding its own float64 DataFrame parsed from CSV.
+
+FEATURES_SUFFIX = ".features.npy"
+DATES_SUFFIX = ".dates.npy"
+META_SUFFIX = ".json"
+
+
+def _source_stat(path):
+    stat = os.stat(path)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+def write_columnar(df, prefix, source_path=None):
+    """
+    Writes a Date-indexed DataFrame to <prefix>.features.npy / .dates.npy / .json.
+    """
+    os.makedirs(os.path.dirname(prefix), exist_ok=True)
+
+    features = np.ascontiguousarray(df.to_numpy(dtype=np.float32).T)
+    dates = (df.index.values.astype('datetime64[D]').astype(np.int64)).astype(np.int32)
+
+    np.save(prefix + FEATURES_SUFFIX, features)
+    np.save(prefix + DATES_SUFFIX, dates)
+
+    meta = {"columns": list(df.columns), "rows": int(len(df))}
+    if source_path:
+        meta.update(_source_stat(source_path))
+    with open(prefix + META_SUFFIX, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def is_fresh(prefix, source_path=None):
+    """
+    True if the columnar files exist and were built from the current source CSV.
+    """
+    paths = [prefix + FEATURES_SUFFIX, prefix + DATES_SUFFIX, prefix + META_SUFFIX]
+    if not all(os.path.exists(p) for p in paths):
+        return False
+    if source_path is None or not os.path.exists(source_path):
+        return True
+    with open(prefix + META_SUFFIX) as f:
+        meta = json.load(f)
+    return all(meta.get(k) == v for k, v in _source_stat(source_path).items())
+
+
+def load_columnar(prefix, columns=None):
+    """
+    Memory-maps a columnar file set and returns a Date-indexed DataFrame
+    whose values are a read-only view of the mapped features array.
+    """
+    with open(prefix + META_SUFFIX) as f:
+        meta = json.load(f)
+
+    features = np.load(prefix + FEATURES_SUFFIX, mmap_mode='r')
+    dates = np.load(prefix + DATES_SUFFIX)
+
+    index = pd.DatetimeIndex(dates.astype('datetime64[D]').astype('datetime64[ns]'), name='Date')
+    # features.T is an (n_rows, n_features) view; pandas keeps it as a single
+    # block without copying, so the DataFrame stays backed by the mmap.
+    df = pd.DataFrame(features.T, index=index, columns=meta["columns"], copy=False)
+    return df[columns] if columns is not None and list(columns) != meta["columns"] else df
+
+
+if __name__ == "__main__":
+    # --- Build step ---
+    # Converts every region's merged CSV into the columnar format:
+    # python backend/columnar_store.py
+    from region_registry import REGION_CONFIG
+
+    FEATURES = ['Max_Temp', 'Min_Temp', 'Rainfall', 'Price']
+
+    for region, config in REGION_CONFIG.items():
+        csv_path = config["data_path"]
+        try:
+            df = pd.read_csv(csv_path, parse_dates=['Date'], index_col='Date')[FEATURES]
+        except Exception as e:
+            print(f"Skipping {region}: could not read {csv_path}: {e}")
+            continue
+        write_columnar(df, config["columnar_prefix"], source_path=csv_path)
+        print(f"Wrote {len(df)} rows for {region} to {config['columnar_prefix']}.*")
@@ -0,0 +1,158 @@
+# backend/convert_tflite.py
+#
+# Exports models/<region>_lstm.h5 to models/<region>_lstm.tflite for
+# INFERENCE_BACKEND=tflite, and writes models/tflite_manifest.json.
+#
+#   python backend/convert_tflite.py                              # float16, every region
+#   python backend/convert_tflite.py --quantization int8 --regions sirsi --max-mae-increase 0.02
+#
+# Accuracy gate: before a .tflite file replaces the deployed one, both the
+# Keras model and the converted one are backtested over the region's history
+# (the same one-step backtest /model-backtest serves). If the converted
+# model's MAE is more than --max-mae-increase worse (relative), the file is
+# not written and the region is reported as rejected.
+#
+# Deploying: set INFERENCE_BACKEND=tflite and install a lightweight
+# interpreter on the servers (pip install -r backend/requirements-tflite.txt).
+# Without one the backend falls back to tf.lite.Interpreter and every worker
+# still imports all of TensorFlow. /registry-stats shows which one is in use.
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+from prediction_service import REGISTRY, MODELS_DIR, load_region_model, _full_backtest
+from region_registry import REGION_CONFIG
+from tflite_lstm import QUANTIZATIONS, TFLiteModel, convert_model
+from train_models import _replace
+
+DEFAULT_QUANTIZATION = "float16"
+DEFAULT_MAX_MAE_INCREASE = 0.01   # 1% worse than the Keras model
+
+
+def _errors(results):
+    actual = np.array([r["actual"] for r in results], dtype=np.float64)
+    predicted = np.array([r["predicted"] for r in results], dtype=np.float64)
+    error = np.abs(predicted - actual)
+    return {
+        "mae": float(error.mean()),
+        "mape": float((error / np.abs(actual)).mean() * 100),
+    }, predicted
+
+
+def accuracy_gate(reference, candidate, scaler, data_df, max_mae_increase=DEFAULT_MAX_MAE_INCREASE, days=None):
+    """
+    Backtests both models on the same history (the last `days` targets, or
+    all of it) and compares their errors. Returns a report whose "passed" is
+    False if the candidate's MAE is more than max_mae_increase worse.
+    """
+    reference_results = _full_backtest(reference, scaler, data_df)
+    candidate_results = _full_backtest(candidate, scaler, data_df)
+    if days:
+        reference_results, candidate_results = reference_results[-days:], candidate_results[-days:]
+
+    reference_errors, reference_predicted = _errors(reference_results)
+    candidate_errors, candidate_predicted = _errors(candidate_results)
+    mae_increase = candidate_errors["mae"] / reference_errors["mae"] - 1 if reference_errors["mae"] else 0.0
+    return {
+        "passed": mae_increase <= max_mae_increase,
+        "days": len(reference_results),
+        "reference": reference_errors,
+        "candidate": candidate_errors,
+        "mae_increase": mae_increase,
+        "max_mae_increase": max_mae_increase,
+        "max_prediction_diff": float(np.abs(candidate_predicted - reference_predicted).max()),
+    }
+
+
+def convert_region(region, config, quantization=DEFAULT_QUANTIZATION, max_mae_increase=DEFAULT_MAX_MAE_INCREASE,
+                   days=None, output_dir=None):
+    """
+    Converts one region's model, gates it, and writes the .tflite file if it
+    passes. Returns the region's manifest entry.
+    """
+    started = time.perf_counter()
+    model_content = convert_model(config["model_path"], quantization)
+    converted = time.perf_counter()
+
+    report = accuracy_gate(
+        load_region_model(config["model_path"], backend="keras"), TFLiteModel(model_content),
+        REGISTRY.get_scaler(region), REGISTRY.get_data(region), max_mae_increase, days,
+    )
+    tflite_path = os.path.join(output_dir, f"{region}_lstm.tflite") if output_dir else config["tflite_path"]
+    if report["passed"]:
+        os.makedirs(os.path.dirname(os.path.abspath(tflite_path)), exist_ok=True)
+
+        def write(path):
+            with open(path, 'wb') as f:
+                f.write(model_content)
+        _replace(tflite_path, write)
+
+    return dict(
+        report,
+        status="ok" if report["passed"] else "rejected",
+        tflite_path=os.path.abspath(tflite_path),
+        quantization=quantization,
+        source_bytes=os.path.getsize(config["model_path"]),
+        tflite_bytes=len(model_content),
+        convert_seconds=round(converted - started, 3),
+        total_seconds=round(time.perf_counter() - started, 3),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the LSTM models to TFLite behind an accuracy gate.")
+    parser.add_argument("--regions", nargs="+", default=list(REGION_CONFIG), help="default: all regions")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default=DEFAULT_QUANTIZATION)
+    parser.add_argument("--max-mae-increase", type=float, default=DEFAULT_MAX_MAE_INCREASE,
+                        help="largest allowed relative backtest MAE increase (default: 0.01 = 1%%)")
+    parser.add_argument("--days", type=int, default=None, help="backtest the last N days only (default: all)")
+    parser.add_argument("--output-dir", default=None, help="default: the paths in regions.json")
+    args = parser.parse_args()
+
+    unknown = [r for r in args.regions if r not in REGION_CONFIG]
+    if unknown:
+        parser.error(f"unknown region(s): {', '.join(unknown)}")
+
+    entries = {}
+    for region in args.regions:
+        try:
+            entries[region] = convert_region(region, REGION_CONFIG[region], args.quantization,
+                                             args.max_mae_increase, args.days, args.output_dir)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            entries[region] = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quantization": args.quantization,
+        "max_mae_increase": args.max_mae_increase,
+        "regions": entries,
+    }
+    manifest_dir = args.output_dir or MODELS_DIR
+    os.makedirs(manifest_dir, exist_ok=True)
+
+    def dump_manifest(path):
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    _replace(os.path.join(manifest_dir, "tflite_manifest.json"), dump_manifest)
+
+    print(f"\nTFLite export ({args.quantization}, max MAE increase {args.max_mae_increase:.1%})")
+    for region, entry in entries.items():
+        if entry["status"] == "failed":
+            print(f"  {region:<16} FAILED: {entry['error']}")
+            continue
+        print(f"  {region:<16} {entry['status'].upper():<8} MAE ₹{entry['reference']['mae']:,.0f} -> "
+              f"₹{entry['candidate']['mae']:,.0f} ({entry['mae_increase']:+.2%})  "
+              f"{entry['source_bytes'] / 1024:.0f} KB -> {entry['tflite_bytes'] / 1024:.0f} KB")
+    return 0 if all(e["status"] == "ok" for e in entries.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
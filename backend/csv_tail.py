@@ -0,0 +1,71 @@
+# backend/csv_tail.py
+
+import io
+import os
+import pandas as pd
+
+# --- Incremental reads of the merged CSVs ---
+# The data/*_merged.csv files only ever grow at the end (one row per new
+# day). A CsvTail remembers how far into a file we have read, plus the bytes
+# just before that point, so the next read can parse only the new rows and
+# can tell an append apart from a file that was rewritten.
+
+ANCHOR_BYTES = 64
+
+
+class CsvRewritten(Exception):
+    """The file changed before our offset; it has to be read from the start."""
+
+
+class CsvTail:
+    def __init__(self, path, offset, mtime_ns, anchor):
+        self.path = path
+        self.offset = offset
+        self.mtime_ns = mtime_ns
+        self.anchor = anchor
+
+    @classmethod
+    def mark(cls, path):
+        """A tail at the end of the last complete line of the file."""
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            f.seek(max(0, stat.st_size - ANCHOR_BYTES))
+            anchor = f.read(ANCHOR_BYTES)
+        # A half-written last row is read again (and de-duplicated) next time
+        if not anchor.endswith(b"\n") and b"\n" in anchor:
+            anchor = anchor[:anchor.rfind(b"\n") + 1]
+        offset = stat.st_size - ANCHOR_BYTES + len(anchor) if stat.st_size > ANCHOR_BYTES else len(anchor)
+        return cls(path, offset, stat.st_mtime_ns, anchor)
+
+    def status(self):
+        """'unchanged', 'appended' or 'rewritten', judged from a stat() call."""
+        stat = os.stat(self.path)
+        if stat.st_size == self.offset and stat.st_mtime_ns == self.mtime_ns:
+            return "unchanged"
+        # Same size but touched means edited in place
+        if stat.st_size <= self.offset:
+            return "rewritten"
+        return "appended"
+
+    def read_appended(self):
+        """
+        Parses the complete lines written after our offset. Returns
+        (DataFrame, new CsvTail); a partly written last line is left for the
+        next read. Raises CsvRewritten if the bytes before the offset changed.
+        """
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            header = f.readline()
+            f.seek(max(0, self.offset - len(self.anchor)))
+            if f.read(len(self.anchor)) != self.anchor or stat.st_size < self.offset:
+                raise CsvRewritten(self.path)
+            chunk = f.read(stat.st_size - self.offset)
+
+        end = chunk.rfind(b"\n") + 1
+        chunk = chunk[:end]
+        if not chunk.strip():
+            return None, CsvTail(self.path, self.offset, stat.st_mtime_ns, self.anchor)
+
+        df = pd.read_csv(io.BytesIO(header + chunk), parse_dates=['Date'], index_col='Date')
+        anchor = (self.anchor + chunk)[-ANCHOR_BYTES:]
+        return df, CsvTail(self.path, self.offset + end, stat.st_mtime_ns, anchor)
@@ -0,0 +1,165 @@
+# backend/dashboard_service.py
+
+import json
+import gzip
+import hashlib
+import threading
+import numpy as np
+
+from caching import TTLCache
+from prediction_service import regions, get_full_backtest
+from history_service import get_snapshot, GZIP_MIN_BYTES
+from hot_reload import add_reload_listener
+from structured_logging import get_logger
+
+log = get_logger(__name__)
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+# --- /dashboard: the whole Dashboard page in one response ---
+# KPIs, the overview history for every region, the backtest rows and summary
+# for the performance tab and the raw-data table rows. History rows come
+# pre-serialized from the history_service snapshots and backtest rows are
+# serialized once per model/data fingerprint, so building a body is mostly
+# byte joins. Finished bodies are cached by ETag until any input changes.
+
+DEFAULT_OVERVIEW_DAYS = 30
+DEFAULT_BACKTEST_DAYS = 90
+DEFAULT_TABLE_DAYS = 180
+
+
+class BacktestSnapshot:
+    """Full-history backtest for one region: arrays for summaries, pre-serialized rows."""
+
+    def __init__(self, fingerprint, results):
+        self.fingerprint = fingerprint
+        self.actual = np.array([r["actual"] for r in results], dtype=np.float64)
+        self.predicted = np.array([r["predicted"] for r in results], dtype=np.float64)
+        self.rows = [_dumps(r) for r in results]
+
+    def summary(self, days):
+        actual, predicted = (self.actual[-days:], self.predicted[-days:]) if days > 0 else ([], [])
+        if not len(actual):
+            return {"days": 0, "mae": None, "mape": None, "rmse": None}
+        error = predicted - actual
+        return {
+            "days": int(len(actual)),
+            "mae": float(np.abs(error).mean()),
+            "mape": float(np.abs(error / actual).mean() * 100),
+            "rmse": float(np.sqrt((error ** 2).mean())),
+        }
+
+
+_BACKTESTS = {}
+_BACKTEST_LOCK = threading.Lock()
+# ETag -> (body, gzipped body or None)
+_BODY_CACHE = TTLCache(ttl=3600, maxsize=64)
+
+
+def _drop_bodies(region, kinds):
+    # Old bodies can't be served again (their ETags include the old versions),
+    # this just frees them
+    with _BACKTEST_LOCK:
+        _BACKTESTS.pop(region, None)
+    _BODY_CACHE.clear()
+
+
+add_reload_listener(_drop_bodies)
+
+
+def get_backtest_snapshot(region):
+    """Returns (BacktestSnapshot, None) or (None, error)."""
+    cached, error = get_full_backtest(region)
+    if error:
+        return None, error
+    fingerprint, results = cached
+    snapshot = _BACKTESTS.get(region)
+    if snapshot is None or snapshot.fingerprint != fingerprint:
+        with _BACKTEST_LOCK:
+            snapshot = _BACKTESTS.get(region)
+            if snapshot is None or snapshot.fingerprint != fingerprint:
+                snapshot = BacktestSnapshot(fingerprint, results)
+                _BACKTESTS[region] = snapshot
+    return snapshot, None
+
+
+def _array(rows):
+    return b"[" + b",".join(rows) + b"]"
+
+
+def _object(fields):
+    """{key: already-encoded JSON bytes} -> JSON object bytes."""
+    return b"{" + b",".join(_dumps(k) + b":" + v for k, v in fields.items()) + b"}"
+
+
+def _last_rows(snapshot, days):
+    lo, hi = snapshot.window(days=days)
+    return snapshot.daily.rows[lo:hi]
+
+
+def build_dashboard(performance_region="sirsi", table_region="sirsi", overview_days=DEFAULT_OVERVIEW_DAYS,
+                    backtest_days=DEFAULT_BACKTEST_DAYS, table_days=DEFAULT_TABLE_DAYS):
+    """
+    Returns ((etag, body, gzipped_body_or_None), None) or (None, error).
+    The ETag covers the parameters and the versions of everything in the body.
+    """
+    for region in (performance_region, table_region):
+        if region not in regions:
+            return None, f"Invalid region: {region}"
+
+    snapshots = {}
+    for region in regions:
+        try:
+            snapshots[region] = get_snapshot(region)
+        except KeyError:
+            log.warning("Dashboard: no data for region", extra={"region": region})
+    if table_region not in snapshots:
+        return None, f"No data for region: {table_region}"
+
+    backtest, error = get_backtest_snapshot(performance_region)
+    if error:
+        return None, error
+
+    key = (performance_region, table_region, overview_days, backtest_days, table_days, backtest.fingerprint,
+           tuple((region, s.version) for region, s in snapshots.items()))
+    etag = 'W/"%s"' % hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+    cached = _BODY_CACHE.get(etag)
+    if cached is not None:
+        return (etag, *cached), None
+
+    kpis = {}
+    for region in regions:
+        snapshot = snapshots.get(region)
+        if snapshot is None or not len(snapshot.daily.dates):
+            kpis[region] = None
+            continue
+        kpis[region] = {
+            "price": float(snapshot.daily.prices[-1]),
+            "date": str(snapshot.daily.dates[-1]),
+        }
+
+    body = _object({
+        "kpis": _dumps(kpis),
+        "history": _object({
+            region: _array(_last_rows(snapshot, overview_days)) for region, snapshot in snapshots.items()
+        }),
+        "backtest": _object({
+            "region": _dumps(performance_region),
+            "summary": _dumps(backtest.summary(backtest_days)),
+            "rows": _array(backtest.rows[-backtest_days:] if backtest_days > 0 else []),
+        }),
+        "table": _object({
+            "region": _dumps(table_region),
+            "rows": _array(_last_rows(snapshots[table_region], table_days)),
+        }),
+    })
+    compressed = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MIN_BYTES else None
+    _BODY_CACHE.set(etag, (body, compressed))
+    return (etag, body, compressed), None
@@ -0,0 +1,286 @@
+# backend/forecast_scheduler.py
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from prediction_service import REGISTRY, regions, make_trajectories
+from hot_reload import add_reload_listener
+from weather_service import WEATHER_CLIENT, LOCATION_KEYS, WeatherServiceError, WeatherUnavailableError, _parse_forecasts
+from structured_logging import get_logger
+
+log = get_logger(__name__)
+
+# --- Materialized forecasts ---
+# A /predict answer for (region, date) only changes when the AccuWeather
+# forecast or the region's model/scaler/data change. A background thread
+# recomputes the whole 1-5 day trajectory for every region on a schedule, so
+# /predict is normally a dict lookup. Entries are only served on the day they
+# were computed, while younger than MAX_AGE_SECONDS, and while the region's
+# artifact fingerprint is unchanged; otherwise /predict computes on demand.
+
+SCHEDULER_ENABLED = os.getenv("FORECAST_SCHEDULER", "1") == "1"
+REFRESH_SECONDS = float(os.getenv("FORECAST_REFRESH_SECONDS", "900"))
+MAX_AGE_SECONDS = float(os.getenv("FORECAST_MAX_AGE_SECONDS", str(2 * REFRESH_SECONDS)))
+HORIZON_DAYS = 5
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def fetch_region_forecasts(region_list, weather_client=WEATHER_CLIENT, today=None):
+    """
+    Parsed forecasts for the next HORIZON_DAYS days for each region, fetching
+    every AccuWeather location once (concurrently) however many regions share it.
+    Returns ({region: forecasts}, {region: error}, {regions whose error is worth retrying}).
+    """
+    today = today or date.today()
+    if not weather_client.api_key:
+        return {}, {region: "AccuWeather API key not found. Check .env file." for region in region_list}, set()
+    by_location, errors = {}, {}
+    for region in region_list:
+        if region not in LOCATION_KEYS:
+            errors[region] = "No AccuWeather location key configured for this region."
+            continue
+        by_location.setdefault(LOCATION_KEYS[region], []).append(region)
+
+    retryable = set()
+
+    def fetch(location_key):
+        try:
+            return weather_client.get_daily_forecasts(location_key), None
+        except WeatherUnavailableError as e:
+            retryable.update(by_location[location_key])
+            return None, str(e)
+        except WeatherServiceError as e:
+            return None, str(e)
+
+    with ThreadPoolExecutor(max_workers=len(by_location) or 1) as pool:
+        fetched = dict(zip(by_location, pool.map(fetch, by_location)))
+
+    forecasts = {}
+    for location_key, (daily_forecasts, error) in fetched.items():
+        for region in by_location[location_key]:
+            if error:
+                errors[region] = error
+                continue
+            parsed = _parse_forecasts(daily_forecasts, today, today + timedelta(days=HORIZON_DAYS))
+            if parsed:
+                forecasts[region] = parsed
+            else:
+                errors[region] = "Could not retrieve any valid future forecasts."
+    return forecasts, errors, retryable
+
+
+class MaterializedForecast:
+    def __init__(self, region, fingerprint, day, trajectory):
+        self.region = region
+        self.fingerprint = fingerprint
+        self.day = day
+        self.created = time.monotonic()
+        self.computed_at = _now_iso()
+        self.trajectory = trajectory
+        self.prices = {row["date"]: row["predicted_price"] for row in trajectory}
+
+    def age(self):
+        return time.monotonic() - self.created
+
+
+class ForecastScheduler:
+    def __init__(self, region_list, interval=REFRESH_SECONDS, max_age=MAX_AGE_SECONDS,
+                 weather_client=WEATHER_CLIENT):
+        self.regions = list(region_list)
+        self.interval = interval
+        self.max_age = max_age
+        self.weather_client = weather_client
+        self._forecasts = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._errors = {}
+        self._stats = {"refreshes": 0, "failures": 0, "hits": 0, "misses": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def refresh(self, region_list=None):
+        """
+        Recomputes and stores the trajectories of the given regions (default:
+        all) in one batch. Regions that fail keep their previous entry.
+        Returns {region: error} for the failures.
+        """
+        region_list = self.regions if region_list is None else region_list
+        today = date.today()
+        fingerprints, errors = {}, {}
+        for region in region_list:
+            if region not in LOCATION_KEYS:
+                errors[region] = "No AccuWeather location key configured for this region."
+                continue
+            try:
+                fingerprints[region] = REGISTRY.fingerprint(region)
+            except KeyError:
+                errors[region] = f"No model loaded for region: {region}"
+
+        forecasts, fetch_errors, _ = fetch_region_forecasts(list(fingerprints), self.weather_client, today)
+        errors.update(fetch_errors)
+        trajectories, predict_errors = make_trajectories(forecasts)
+        errors.update(predict_errors)
+
+        with self._lock:
+            for region, trajectory in trajectories.items():
+                self._forecasts[region] = MaterializedForecast(region, fingerprints[region], today, trajectory)
+                self._errors.pop(region, None)
+            self._errors.update(errors)
+            self._stats["refreshes"] += len(trajectories)
+            self._stats["failures"] += len(errors)
+        for region, error in errors.items():
+            log.warning("Forecast refresh failed", extra={"region": region, "error": str(error)})
+        return errors
+
+    def current(self, region):
+        """
+        The region's materialized forecast if it can still be served (computed
+        today, not too old, same model/scaler/data), else None.
+        """
+        forecast = self._forecasts.get(region)
+        if forecast is None or forecast.day != date.today() or forecast.age() > self.max_age:
+            self._count("misses")
+            return None
+        try:
+            if forecast.fingerprint != REGISTRY.fingerprint(region):
+                self._count("misses")
+                return None
+        except KeyError:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return forecast
+
+    def lookup(self, region, target_date):
+        """
+        Returns (predicted_price, computed_at) from the current materialized
+        forecast, or None if there is no usable one for this date.
+        """
+        forecast = self.current(region)
+        if forecast is None or target_date not in forecast.prices:
+            return None
+        return forecast.prices[target_date], forecast.computed_at
+
+    def invalidate(self, region, kinds=None):
+        """
+        Drops a region's materialized forecast after its artifacts changed and,
+        if the scheduler is running, recomputes it in the background.
+        """
+        with self._lock:
+            self._forecasts.pop(region, None)
+        if self._thread is not None and self._thread.is_alive():
+            threading.Thread(target=self.refresh, args=([region],), name=f"forecast-refresh-{region}",
+                             daemon=True).start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.refresh()
+                log.info("Refreshed forecasts", extra={"regions": len(self.regions),
+                                                       "seconds": round(time.monotonic() - started, 2)})
+            except Exception:
+                # Keep the thread alive; the next tick tries again
+                log.exception("Forecast refresh failed")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if not self.weather_client.api_key:
+            log.warning("Forecast scheduler not started (no AccuWeather API key).")
+            return
+        self._thread = threading.Thread(target=self._run, name="forecast-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._stats,
+                running=self._thread is not None and self._thread.is_alive(),
+                interval_seconds=self.interval,
+                max_age_seconds=self.max_age,
+                regions={
+                    region: {
+                        "computed_at": f.computed_at,
+                        "age_seconds": round(f.age(), 1),
+                        "days": [row["date"] for row in f.trajectory],
+                    }
+                    for region, f in self._forecasts.items()
+                },
+                errors=dict(self._errors),
+            )
+
+
+SCHEDULER = ForecastScheduler(regions)
+add_reload_listener(SCHEDULER.invalidate)
+
+
+def _truncate(trajectory, target_date):
+    """Rows up to and including target_date, or an error if it isn't covered."""
+    if target_date is None:
+        return trajectory, None
+    for i, row in enumerate(trajectory):
+        if row["date"] == target_date:
+            return trajectory[:i + 1], None
+    last = trajectory[-1]["date"] if trajectory else None
+    if last and target_date > last:
+        return None, f"Forecasts only available up to {last}. Target date {target_date} is too far."
+    return None, f"No forecast for {target_date}; forecasts cover {trajectory[0]['date']} to {last}."
+
+
+def get_trajectories(region_list, target_date=None, scheduler=SCHEDULER):
+    """
+    Day-by-day forecast trajectories for several regions in one go. Regions
+    with a usable materialized forecast are served from it; the rest share one
+    weather fetch per location and are computed together (make_trajectories).
+    Returns ({region: {"trajectory", "computed_at", "source"}}, {region: error},
+    {regions that failed only because AccuWeather is unavailable right now}).
+    """
+    results, errors, retryable = {}, {}, set()
+    missing = []
+    for region in region_list:
+        if region not in LOCATION_KEYS:
+            errors[region] = "Invalid region"
+            continue
+        forecast = scheduler.current(region)
+        if forecast is None:
+            missing.append(region)
+        else:
+            results[region] = {"trajectory": forecast.trajectory, "computed_at": forecast.computed_at,
+                               "source": "materialized"}
+
+    if missing:
+        forecasts, fetch_errors, retryable = fetch_region_forecasts(missing, scheduler.weather_client)
+        errors.update(fetch_errors)
+        trajectories, predict_errors = make_trajectories(forecasts)
+        errors.update(predict_errors)
+        computed_at = _now_iso()
+        for region, trajectory in trajectories.items():
+            results[region] = {"trajectory": trajectory, "computed_at": computed_at, "source": "on_demand"}
+
+    for region in list(results):
+        trajectory, error = _truncate(results[region]["trajectory"], target_date)
+        if error:
+            errors[region] = error
+            del results[region]
+        else:
+            results[region] = dict(results[region], trajectory=trajectory)
+    return results, errors, retryable
+
+
+def start_forecast_scheduler():
+    if SCHEDULER_ENABLED:
+        SCHEDULER.start()
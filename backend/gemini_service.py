@@ -1,17 +1,53 @@
 # backend/gemini_service.py
 
 import os
+import re
+import time
+import threading
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+from caching import TTLCache
+from upstream import GEMINI_UPSTREAM, UpstreamUnavailable
+from metrics import stage, annotate, count_error
+from structured_logging import get_logger
+
+log = get_logger(__name__)
+
 # Load API key from .env file
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-if not GEMINI_API_KEY:
-    print("WARNING: GEMINI_API_KEY not found in .env file.")
-else:
-    genai.configure(api_key=GEMINI_API_KEY)
+# "gemini" talks to the real API; "fake" uses FakeGenerativeModel below so the
+# chat path can be load-tested offline.
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini").lower()
+FAKE_LATENCY_SECONDS = float(os.getenv("GEMINI_FAKE_LATENCY_MS", "300")) / 1000
+
+# --- Conversation session limits ---
+MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "1000"))
+SESSION_TTL_SECONDS = float(os.getenv("CHAT_SESSION_TTL_SECONDS", "1800"))
+MAX_HISTORY_TURNS = int(os.getenv("CHAT_MAX_HISTORY_TURNS", "10"))
+MAX_HISTORY_TOKENS = int(os.getenv("CHAT_MAX_HISTORY_TOKENS", "4000"))
+
+# --- Response cache ---
+# Keyed on the normalized *augmented* prompt, so answers that quote our price
+# records change key (and miss) as soon as the records change.
+RESPONSE_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "512"))
+
+# Sent instead of an answer when Gemini is saturated or too slow and we have
+# nothing cached for the prompt
+DEGRADED_REPLY = (
+    "PepperBot is getting a lot of questions right now and couldn't answer in time. "
+    "Please try again in a moment."
+)
+
+if GEMINI_BACKEND == "gemini":
+    if not GEMINI_API_KEY:
+        log.warning("GEMINI_API_KEY not found in .env file.")
+    else:
+        genai.configure(api_key=GEMINI_API_KEY)
 
 # --- System Instruction ---
 # This tells the model its persona and rules.
@@ -25,65 +61,317 @@ SYSTEM_INSTRUCTION = (
     "Keep your answers concise and informative."
 )
 
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Offline stand-in for genai.GenerativeModel. Sleeps for `latency` seconds
+    and answers with a canned reply that echoes how much context it was sent.
+    """
+
+    def __init__(self, latency=FAKE_LATENCY_SECONDS):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        self.calls += 1
+        prompt = contents[-1]["parts"][0] if isinstance(contents, list) else str(contents)
+        text = (f"PepperBot (offline) received {len(contents) if isinstance(contents, list) else 1} "
+                f"message(s). You asked: {prompt[:200]}")
+        if not stream:
+            time.sleep(self.latency)
+            return _FakeResponse(text)
+        return self._stream(text)
+
+    def _stream(self, text, chunk_words=5):
+        words = text.split(" ")
+        delay = self.latency / max(len(words) / chunk_words, 1)
+        for i in range(0, len(words), chunk_words):
+            time.sleep(delay)
+            yield _FakeResponse(" ".join(words[i:i + chunk_words]) + " ")
+
+
 try:
-    # --- Model Configuration ---
-    generation_config = {
-      "temperature": 0.7,
-      "top_p": 1,
-      "top_k": 1,
-      "max_output_tokens": 2048,
-    }
-
-    safety_settings = [
-      {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-      {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-      {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-      {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-    ]
-
-    # Initialize the model
-    model = genai.GenerativeModel(
-        model_name="models/gemini-pro-latest",
-        generation_config=generation_config,
-        system_instruction=SYSTEM_INSTRUCTION,
-        safety_settings=safety_settings
-    )
-    
-    # We will use the same "chat" session for all requests
-    chat_session = model.start_chat()
-    print("Gemini chat session initialized successfully.")
+    if GEMINI_BACKEND == "fake":
+        model = FakeGenerativeModel()
+    else:
+        # --- Model Configuration ---
+        generation_config = {
+          "temperature": 0.7,
+          "top_p": 1,
+          "top_k": 1,
+          "max_output_tokens": 2048,
+        }
+
+        safety_settings = [
+          {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+          {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+          {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+          {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+        ]
+
+        # Initialize the model
+        model = genai.GenerativeModel(
+            model_name="models/gemini-pro-latest",
+            generation_config=generation_config,
+            system_instruction=SYSTEM_INSTRUCTION,
+            safety_settings=safety_settings
+        )
+    log.info("Gemini model initialized", extra={"backend": GEMINI_BACKEND})
 
 except Exception as e:
-    print(f"CRITICAL ERROR: Failed to initialize Gemini Model: {e}")
-    print("Please ensure your GEMINI_API_KEY is correct and you have internet access.")
+    log.critical("Failed to initialize Gemini model. Check GEMINI_API_KEY and internet access.",
+                 extra={"error": str(e)})
     model = None
-    chat_session = None
 
-def get_ai_response(user_prompt):
+
+def _estimate_tokens(text):
+    # Roughly 4 characters per token for English text
+    return len(text) // 4 + 1
+
+
+class ConversationSession:
+    """History of one conversation, trimmed to the configured turn/token caps."""
+
+    def __init__(self, conversation_id):
+        self.conversation_id = conversation_id
+        self.history = []   # [{"role": "user"|"model", "parts": [text]}, ...]
+        self.tokens = 0
+        self.lock = threading.Lock()
+
+    def contents_for(self, prompt):
+        return self.history + [{"role": "user", "parts": [prompt]}]
+
+    def record(self, prompt, reply, max_turns=MAX_HISTORY_TURNS, max_tokens=MAX_HISTORY_TOKENS):
+        self.history += [{"role": "user", "parts": [prompt]}, {"role": "model", "parts": [reply]}]
+        self.tokens += _estimate_tokens(prompt) + _estimate_tokens(reply)
+        # Drop the oldest user/model pairs until we're back under both caps
+        while self.history and (len(self.history) > 2 * max_turns or self.tokens > max_tokens):
+            dropped = self.history[:2]
+            del self.history[:2]
+            self.tokens -= sum(_estimate_tokens(m["parts"][0]) for m in dropped)
+
+
+class SessionStore:
+    """
+    Conversation sessions keyed by the client's conversation id.
+    Bounded by max_sessions (LRU) and evicted after ttl seconds idle.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL_SECONDS):
+        self._sessions = TTLCache(ttl=ttl, maxsize=max_sessions)
+        self._lock = threading.Lock()
+
+    def get(self, conversation_id):
+        with self._lock:
+            session = self._sessions.get(conversation_id)
+            if session is None:
+                session = ConversationSession(conversation_id)
+            # Re-setting refreshes both the idle TTL and the LRU position
+            self._sessions.set(conversation_id, session)
+            return session
+
+    def drop(self, conversation_id):
+        self._sessions.pop(conversation_id)
+
+    def stats(self):
+        self._sessions.purge_expired()
+        sessions = self._sessions.values()
+        cache = self._sessions.stats()
+        return {
+            "sessions": len(sessions),
+            "max_sessions": cache["maxsize"],
+            "ttl_seconds": cache["ttl_seconds"],
+            "evictions": cache["evictions"],
+            "history_messages": sum(len(s.history) for s in sessions),
+            "history_tokens": sum(s.tokens for s in sessions),
+            "max_history_tokens": max((s.tokens for s in sessions), default=0),
+        }
+
+
+SESSIONS = SessionStore()
+
+
+class ResponseCache:
+    """
+    Replies to context-free prompts, bounded by size and TTL.
+
+    Only the first message of a conversation (or a request without one) is
+    looked up or stored: later turns depend on the conversation's history,
+    so the same words can need a different answer.
+    """
+
+    def __init__(self, ttl=RESPONSE_CACHE_TTL_SECONDS, maxsize=RESPONSE_CACHE_MAX_ENTRIES,
+                 enabled=RESPONSE_CACHE_ENABLED):
+        self.enabled = enabled
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+        self.bypassed = 0
+
+    @staticmethod
+    def normalize(prompt):
+        text = " ".join(prompt.lower().split())
+        return re.sub(r"[\s?!.]+$", "", text)
+
+    def usable(self, session, use_cache):
+        if not self.enabled or session.history:
+            return False
+        if not use_cache:
+            self.bypassed += 1
+            return False
+        return True
+
+    def get(self, prompt):
+        return self._cache.get(self.normalize(prompt))
+
+    def set(self, prompt, reply):
+        self._cache.set(self.normalize(prompt), reply)
+
+    def fallback(self, prompt):
+        """
+        Cached reply to use when Gemini is unavailable, history or not:
+        a slightly off answer beats no answer. None if there isn't one.
+        """
+        return self._cache.get(self.normalize(prompt)) if self.enabled else None
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats.update(enabled=self.enabled, bypassed=self.bypassed)
+        return stats
+
+
+RESPONSE_CACHE = ResponseCache()
+
+
+def get_ai_response(user_prompt, conversation_id=None, use_cache=True):
     """
-    Sends a prompt to the Gemini chat session and gets a response.
+    Sends a prompt to Gemini along with the conversation's recent history
+    and gets a response. Without a conversation_id the prompt is sent on its own.
+    use_cache=False skips the response cache for this call.
     """
-    if not chat_session:
+    if not model:
         return "Error: The AI chat session is not initialized. Check the server logs and API key."
 
-    try:
-        response = chat_session.send_message(user_prompt)
-        return response.text
-    except Exception as e:
-        print(f"Gemini API Error: {e}")
-        # This could be an API key issue, content safety block, etc.
-        return f"Error communicating with the AI model: {e}"
+    session = SESSIONS.get(conversation_id) if conversation_id else ConversationSession(None)
+
+    # Requests in the same conversation are answered in order; different
+    # conversations don't wait on each other.
+    with session.lock:
+        cacheable = RESPONSE_CACHE.usable(session, use_cache)
+        cached = RESPONSE_CACHE.get(user_prompt) if cacheable else None
+        if cached is not None:
+            annotate(chat_cache="hit")
+            session.record(user_prompt, cached)
+            return cached
+        try:
+            with stage("gemini_call"):
+                reply = GEMINI_UPSTREAM.call(_generate_text, session.contents_for(user_prompt))
+        except UpstreamUnavailable as e:
+            log.warning("Gemini unavailable", extra={"error": str(e)})
+            count_error("gemini_unavailable")
+            return RESPONSE_CACHE.fallback(user_prompt) or DEGRADED_REPLY
+        except Exception as e:
+            log.error("Gemini API error", extra={"error": str(e)})
+            count_error("gemini")
+            # This could be an API key issue, content safety block, etc.
+            return f"Error communicating with the AI model: {e}"
+        session.record(user_prompt, reply)
+        if cacheable:
+            RESPONSE_CACHE.set(user_prompt, reply)
+        return reply
+
+
+def stream_ai_response(user_prompt, conversation_id=None, use_cache=True):
+    """
+    Streaming version of get_ai_response: yields the reply text chunk by
+    chunk as Gemini produces it. The turn is added to the conversation history
+    only if the stream completes. If the caller closes the generator early
+    (client disconnected), we stop reading from Gemini and drop the stream.
+    """
+    if not model:
+        yield "Error: The AI chat session is not initialized. Check the server logs and API key."
+        return
+
+    session = SESSIONS.get(conversation_id) if conversation_id else ConversationSession(None)
+
+    with session.lock:
+        cacheable = RESPONSE_CACHE.usable(session, use_cache)
+        cached = RESPONSE_CACHE.get(user_prompt) if cacheable else None
+        if cached is not None:
+            session.record(user_prompt, cached)
+            yield cached
+            return
+
+        chunks = []
+        stream = GEMINI_UPSTREAM.stream(
+            model.generate_content, session.contents_for(user_prompt), stream=True, on_cancel=_close_stream
+        )
+        try:
+            for chunk in stream:
+                text = chunk.text
+                chunks.append(text)
+                yield text
+        except GeneratorExit:
+            log.info("Chat stream cancelled by client", extra={"chunks": len(chunks)})
+            stream.close()
+            raise
+        except UpstreamUnavailable as e:
+            log.warning("Gemini unavailable mid-stream", extra={"chunks": len(chunks), "error": str(e)})
+            count_error("gemini_unavailable")
+            if not chunks:
+                yield RESPONSE_CACHE.fallback(user_prompt) or DEGRADED_REPLY
+            return
+        except Exception as e:
+            log.error("Gemini API error", extra={"error": str(e)})
+            count_error("gemini")
+            yield f"Error communicating with the AI model: {e}"
+            return
+        reply = "".join(chunks)
+        session.record(user_prompt, reply)
+        if cacheable:
+            RESPONSE_CACHE.set(user_prompt, reply)
+
+
+def _generate_text(contents):
+    # Runs on the Gemini upstream pool; .text is read there too since it can raise
+    return model.generate_content(contents).text
+
+
+def _close_stream(response):
+    # Best effort: stop the underlying HTTP/gRPC stream instead of letting it run to the end
+    iterator = getattr(response, '_iterator', None) or response
+    close = getattr(iterator, 'close', None) or getattr(iterator, 'cancel', None)
+    if close:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+def get_session_stats():
+    stats = SESSIONS.stats()
+    stats["response_cache"] = RESPONSE_CACHE.stats()
+    stats["upstream"] = GEMINI_UPSTREAM.stats()
+    return stats
+
 
 if __name__ == "__main__":
     # --- This is just for testing ---
     # To test this file directly, run:
     # python backend/gemini_service.py
-    
+    # (set GEMINI_BACKEND=fake to run it offline)
+
     print("Testing Gemini Service...")
-    
+
     test_prompt_1 = "How do you grow black pepper?"
     print(f"User: {test_prompt_1}")
-    response_1 = get_ai_response(test_prompt_1)
+    response_1 = get_ai_response(test_prompt_1, conversation_id="test")
     print(f"PepperBot: {response_1}")
 
     print("-" * 20)
@@ -94,5 +382,6 @@ if __name__ == "__main__":
         "Please formulate a helpful response."
     )
     print(f"User (Augmented): {test_prompt_2}")
-    response_2 = get_ai_response(test_prompt_2)
-    print(f"PepperBot: {response_2}")
\ No newline at end of file
+    response_2 = get_ai_response(test_prompt_2, conversation_id="test")
+    print(f"PepperBot: {response_2}")
+    print(f"Session stats: {get_session_stats()}")
@@ -0,0 +1,52 @@
+# backend/gunicorn.conf.py
+#
+# Production serving:
+#   cd backend && gunicorn -c gunicorn.conf.py app:app
+#
+# The master imports app.py once (preload_app) and warms every region before
+# forking the workers (warmup.py), so the Python modules, price histories,
+# scalers, snapshots and (numpy/tflite) models are shared copy-on-write and a
+# new worker is ready as soon as it is forked. Keras models are loaded in each
+# worker instead; see warmup.py. Point the load balancer's readiness check at
+# GET /ready and its liveness check at GET /.
+#
+# With INFERENCE_BACKEND=tflite also install requirements-tflite.txt, or every
+# worker falls back to TensorFlow's interpreter (GET /registry-stats shows which).
+
+import os
+import gc
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+# Requests mostly wait on upstream pools or hold the GIL briefly in numpy, so
+# a few threads per worker go further than more workers
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+# A worker that warms its own Keras models must finish within this
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+# One structured log line per request comes from app.py (sampled)
+accesslog = None
+
+
+def when_ready(server):
+    # Runs in the master after app.py was imported and before any worker is forked
+    if not preload_app:
+        return
+    from warmup import WARMUP
+    WARMUP.preload()
+    # Keep the garbage collector from writing to the objects loaded so far,
+    # which would copy their pages into every worker
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    # Threads don't survive a fork, so every worker starts its own scheduler
+    # and hot-reload watcher. Each worker keeps its own materialized forecasts.
+    from warmup import WARMUP
+    from forecast_scheduler import start_forecast_scheduler
+    from hot_reload import start_hot_reload
+    WARMUP.run()   # whatever the master couldn't warm (Keras models, or everything without preload)
+    start_forecast_scheduler()
+    start_hot_reload()
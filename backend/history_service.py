@@ -0,0 +1,201 @@
+# backend/history_service.py
+
+import gzip
+import json
+import hashlib
+import threading
+import numpy as np
+
+from caching import TTLCache
+from prediction_service import HISTORICAL_DATA, REGISTRY
+from metrics import stage, annotate
+from structured_logging import get_logger
+
+log = get_logger(__name__)
+
+# --- Precomputed /historical-data responses ---
+# For each region we keep a snapshot of the price series with every row already
+# serialized to JSON, weekly/monthly aggregates, and an LTTB downsampling
+# pyramid. A request is then a binary search for its window plus a byte join.
+# Snapshots are rebuilt when the region's data fingerprint changes.
+
+RESOLUTIONS = ("daily", "weekly", "monthly")
+MIN_PYRAMID_POINTS = 64
+GZIP_MIN_BYTES = 1024
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling. Returns the indices of the
+    n_out points of (x, y) that best preserve the visual shape of the series.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+def _serialize_rows(dates, prices):
+    """One pre-encoded JSON object per row, in the original {Date, Price} shape."""
+    return [
+        b'{"Date":"%s","Price":%s}' % (d.encode(), json.dumps(p).encode())
+        for d, p in zip(np.datetime_as_string(dates, unit='D'), prices.tolist())
+    ]
+
+
+class _Series:
+    """Sorted dates + pre-serialized rows for one resolution."""
+
+    def __init__(self, dates, prices):
+        self.dates = dates
+        self.prices = prices
+        self.rows = _serialize_rows(dates, prices)
+
+    def bucket_range(self, first_date, last_date):
+        # Buckets are labelled by their start date, so include the one containing first_date
+        lo = max(int(np.searchsorted(self.dates, first_date, side='right')) - 1, 0)
+        hi = int(np.searchsorted(self.dates, last_date, side='right'))
+        return lo, hi
+
+
+class HistorySnapshot:
+    def __init__(self, version, df):
+        self.version = version
+        prices = df['Price'].astype(np.float64)
+        self.daily = _Series(df.index.values.astype('datetime64[D]'), prices.to_numpy())
+
+        weekly = prices.resample('W-MON', label='left', closed='left').mean().dropna()
+        monthly = prices.resample('MS').mean().dropna()
+        self.aggregates = {
+            "weekly": _Series(weekly.index.values.astype('datetime64[D]'), weekly.to_numpy()),
+            "monthly": _Series(monthly.index.values.astype('datetime64[D]'), monthly.to_numpy()),
+        }
+
+        # LTTB pyramid over the full daily series: n/2, n/4, ... points.
+        # Each level is a sorted array of indices into the daily rows.
+        x = self.daily.dates.astype(np.int64).astype(np.float64)
+        self.pyramid = []
+        n_out = len(x) // 2
+        while n_out >= MIN_PYRAMID_POINTS:
+            self.pyramid.append(lttb_indices(x, self.daily.prices, n_out))
+            n_out //= 2
+
+    def window(self, days=None, start=None, end=None):
+        """[lo, hi) row range of the daily series for a request."""
+        dates = self.daily.dates
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, 'D'), side='right'))
+        if start is not None:
+            lo = int(np.searchsorted(dates, np.datetime64(start, 'D'), side='left'))
+        else:
+            lo = max(hi - days, 0) if days > 0 else hi
+        return lo, min(max(hi, lo), len(dates))
+
+    def select(self, lo, hi, resolution="daily", max_points=None):
+        """
+        Returns (key, rows) for the window. key identifies exactly which rows
+        are returned and is used for the ETag.
+        """
+        if lo >= hi:
+            return ("empty",), []
+
+        if resolution != "daily":
+            series = self.aggregates[resolution]
+            a, b = series.bucket_range(self.daily.dates[lo], self.daily.dates[hi - 1])
+            return (resolution, a, b), series.rows[a:b]
+
+        if max_points is None or hi - lo <= max_points:
+            return ("daily", lo, hi), self.daily.rows[lo:hi]
+
+        rows = self.daily.rows
+        # Finest pyramid level that fits in max_points inside this window
+        for level_id, level in enumerate(self.pyramid):
+            a, b = np.searchsorted(level, lo), np.searchsorted(level, hi)
+            if b - a <= max_points:
+                return ("lttb", level_id, lo, hi), [rows[i] for i in level[a:b]]
+
+        # Even the coarsest level is too dense here: downsample just this window
+        x = self.daily.dates[lo:hi].astype(np.int64).astype(np.float64)
+        chosen = lttb_indices(x, self.daily.prices[lo:hi], max_points)
+        return ("lttb", "adhoc", lo, hi, max_points), [rows[lo + i] for i in chosen]
+
+
+_SNAPSHOTS = {}
+_SNAPSHOT_LOCK = threading.Lock()
+# Compressed bodies, keyed by ETag
+_GZIP_CACHE = TTLCache(ttl=3600, maxsize=256)
+
+
+def get_snapshot(region):
+    """Current snapshot for a region, rebuilt if the data changed. Raises KeyError."""
+    df = HISTORICAL_DATA[region]
+    version = REGISTRY.version("data", region)
+    snapshot = _SNAPSHOTS.get(region)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _SNAPSHOT_LOCK:
+        snapshot = _SNAPSHOTS.get(region)
+        if snapshot is None or snapshot.version != version:
+            log.info("Building historical-data snapshot", extra={"region": region})
+            annotate(snapshot="rebuilt")
+            with stage("build_snapshot"):
+                snapshot = HistorySnapshot(version, df)
+            _SNAPSHOTS[region] = snapshot
+    return snapshot
+
+
+def get_history_window(region, days=None, start=None, end=None, resolution="daily", max_points=None):
+    """
+    Resolves a /historical-data request without serializing anything.
+    Returns ((etag, rows), None) or (None, error).
+    """
+    if resolution not in RESOLUTIONS:
+        return None, f"'resolution' must be one of {', '.join(RESOLUTIONS)}"
+    try:
+        snapshot = get_snapshot(region)
+    except KeyError:
+        return None, "Invalid region"
+
+    with stage("select"):
+        lo, hi = snapshot.window(days=days, start=start, end=end)
+        key, rows = snapshot.select(lo, hi, resolution=resolution, max_points=max_points)
+    digest = hashlib.blake2b(repr((region, snapshot.version, key)).encode(), digest_size=12).hexdigest()
+    # Weak ETag: the same rows are equivalent whether sent gzipped or not
+    return (f'W/"{digest}"', rows), None
+
+
+def render_body(etag, rows, gzip_ok=False):
+    """
+    Joins pre-serialized rows into a JSON array. Returns (body, encoding);
+    large bodies are gzipped (and cached by ETag) when the client accepts it.
+    """
+    if gzip_ok:
+        cached = _GZIP_CACHE.get(etag)
+        if cached is not None:
+            return cached, "gzip"
+
+    body = b"[" + b",".join(rows) + b"]"
+    if not gzip_ok or len(body) < GZIP_MIN_BYTES:
+        return body, None
+
+    compressed = gzip.compress(body, compresslevel=5)
+    _GZIP_CACHE.set(etag, compressed)
+    return compressed, "gzip"
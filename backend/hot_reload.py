@@ -0,0 +1,179 @@
+# backend/hot_reload.py
+
+import os
+import time
+import threading
+from datetime import datetime, timezone
+
+from prediction_service import REGISTRY, regions, refresh_region_data, drop_derived, _DATA_TAILS
+from structured_logging import get_logger
+
+log = get_logger(__name__)
+
+# --- Hot reload of models, scalers and price history ---
+# A watcher thread polls the artifact files of every region every
+# HOT_RELOAD_INTERVAL_SECONDS (a few stat() calls per region), and
+# POST /admin/reload does the same on demand. New rows in a merged CSV are
+# appended to the loaded data; a replaced model or scaler file is loaded and
+# swapped in (REGISTRY.reload) while requests keep running on the old one.
+# Caches keyed by the registry fingerprint (backtests, history snapshots, chat
+# retrieval, materialized forecasts) miss on their own after a swap; listeners
+# registered with add_reload_listener() drop or rebuild the rest.
+
+HOT_RELOAD_ENABLED = os.getenv("HOT_RELOAD", "1") == "1"
+INTERVAL_SECONDS = float(os.getenv("HOT_RELOAD_INTERVAL_SECONDS", "30"))
+# The watcher ignores files modified less than this long ago, so a model and
+# its scaler written one after the other (train_models.py) are swapped together.
+SETTLE_SECONDS = float(os.getenv("HOT_RELOAD_SETTLE_SECONDS", "2"))
+
+_LISTENERS = []
+
+
+def add_reload_listener(listener):
+    """listener(region, kinds) is called after any of a region's artifacts changed."""
+    _LISTENERS.append(listener)
+
+
+add_reload_listener(lambda region, kinds: drop_derived(region))
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _settled(path, settle):
+    try:
+        return time.time() - os.stat(path).st_mtime >= settle
+    except OSError:
+        return False
+
+
+def pending_changes(region, settle=0.0):
+    """Kinds of artifacts whose files changed since they were loaded."""
+    kinds = [kind for kind in ("model", "scaler") if REGISTRY.changed_on_disk(kind, region)]
+    # Wait until both have settled rather than swap in a new model with the old scaler
+    if not all(_settled(REGISTRY.path(kind, region), settle) for kind in kinds):
+        kinds = []
+    tail = _DATA_TAILS.get(region)
+    try:
+        if tail is not None and tail.status() != "unchanged" and _settled(REGISTRY.path("data", region), settle):
+            kinds.append("data")
+    except OSError:
+        pass
+    return kinds
+
+
+def reload_region(region, kinds=None, force=False):
+    """
+    Reloads the given kinds of artifacts (default: those changed on disk)
+    for one region. force=True reloads model and scaler even if their files
+    look unchanged and re-reads the whole CSV. Returns {kind: result}, where
+    result has "status" ("unchanged", "reloaded", "appended" or "failed")
+    and "rows" (new data rows) or "error".
+    """
+    if region not in REGISTRY.config:
+        raise KeyError(region)
+    if kinds is None:
+        kinds = list(REGISTRY.KINDS) if force else pending_changes(region)
+
+    results = {}
+    if "data" in kinds and not force:
+        try:
+            status, rows = refresh_region_data(region)
+            results["data"] = {"status": status, "rows": rows}
+        except Exception as e:
+            log.error("Hot reload of data failed, keeping the old data", extra={"region": region, "error": str(e)})
+            results["data"] = {"status": "failed", "error": str(e)}
+        kinds = [kind for kind in kinds if kind != "data"]
+
+    if kinds:
+        # Model and scaler are swapped together (see RegionRegistry.reload)
+        try:
+            swapped = REGISTRY.reload(region, kinds)
+            results.update({kind: {"status": "reloaded" if kind in swapped else "unchanged"} for kind in kinds})
+        except Exception as e:
+            log.error("Hot reload failed, keeping the old artifacts",
+                      extra={"region": region, "kinds": kinds, "error": str(e)})
+            results.update({kind: {"status": "failed", "error": str(e)} for kind in kinds})
+
+    changed = [kind for kind, result in results.items() if result["status"] in ("reloaded", "appended")]
+    if changed:
+        for listener in _LISTENERS:
+            try:
+                listener(region, changed)
+            except Exception as e:
+                log.exception("Reload listener failed", extra={"region": region})
+    return results
+
+
+class HotReloader:
+    """Polls the artifact files and reloads whatever changed."""
+
+    def __init__(self, region_list, interval=INTERVAL_SECONDS, settle=SETTLE_SECONDS):
+        self.regions = list(region_list)
+        self.interval = interval
+        self.settle = settle
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"checks": 0, "reloads": 0, "failures": 0, "last_check": None, "last_reload": None}
+        self._last_results = {}
+
+    def check(self, region_list=None, force=False, settle=None):
+        """
+        One pass over the given regions (default: all). Returns {region: results}
+        for those that changed. settle defaults to the watcher's.
+        """
+        settle = self.settle if settle is None else settle
+        reloaded = {}
+        for region in region_list or self.regions:
+            kinds = None if force else pending_changes(region, settle)
+            if kinds == []:
+                continue
+            results = reload_region(region, kinds, force=force)
+            reloaded[region] = results
+        with self._lock:
+            self._stats["checks"] += 1
+            self._stats["last_check"] = _now_iso()
+            for region, results in reloaded.items():
+                self._last_results[region] = dict(results, at=_now_iso())
+                for result in results.values():
+                    if result["status"] == "failed":
+                        self._stats["failures"] += 1
+                    elif result["status"] != "unchanged":
+                        self._stats["reloads"] += 1
+                        self._stats["last_reload"] = _now_iso()
+        return reloaded
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                log.exception("Hot reload check failed")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="hot-reload", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._stats,
+                running=self._thread is not None and self._thread.is_alive(),
+                interval_seconds=self.interval,
+                settle_seconds=self.settle,
+                regions=dict(self._last_results),
+            )
+
+
+RELOADER = HotReloader(regions)
+
+
+def start_hot_reload():
+    if HOT_RELOAD_ENABLED:
+        RELOADER.start()
@@ -0,0 +1,130 @@
+# backend/inference_batching.py
+
+import time
+import queue
+import threading
+import numpy as np
+
+# --- Micro-batching for model.predict ---
+# Concurrent /predict requests for a region each run a few tiny predict()
+# calls (one per forecast day). A MicroBatcher collects the pending calls
+# for up to max_wait seconds (or until max_batch_size windows are waiting),
+# runs them through the model as one batch and hands each caller its rows.
+
+
+class _Pending:
+    __slots__ = ("model", "inputs", "event", "result", "error")
+
+    def __init__(self, model, inputs):
+        self.model = model
+        self.inputs = inputs
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    One worker thread per batcher (we keep one per region). Callers block in
+    predict() until their batch has run. Inputs of max_batch_size windows or
+    more skip the queue, there is nothing to gain by batching them.
+
+    The batcher never holds on to a model between batches, so models evicted
+    from the registry can still be freed.
+    """
+
+    def __init__(self, name, max_batch_size=64, max_wait=0.002):
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {"requests": 0, "batches": 0, "windows": 0, "bypassed": 0, "largest_batch": 0}
+
+    def predict(self, model, inputs):
+        """Same result as model.predict(inputs, verbose=0)."""
+        inputs = np.asarray(inputs)
+        if len(inputs) >= self.max_batch_size:
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return model.predict(inputs, verbose=0, batch_size=len(inputs))
+
+        self._ensure_worker()
+        pending = _Pending(model, inputs)
+        self._queue.put(pending)
+        pending.event.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0].inputs)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(pending)
+            size += len(pending.inputs)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Normally a single model; a reload mid-batch can give us two
+            groups = {}
+            for pending in batch:
+                groups.setdefault(id(pending.model), []).append(pending)
+            for group in groups.values():
+                self._execute(group)
+
+    def _execute(self, group):
+        windows = sum(len(p.inputs) for p in group)
+        try:
+            inputs = np.concatenate([p.inputs for p in group])
+            outputs = group[0].model.predict(inputs, verbose=0, batch_size=len(inputs))
+            offset = 0
+            for pending in group:
+                pending.result = outputs[offset:offset + len(pending.inputs)]
+                offset += len(pending.inputs)
+        except Exception as e:
+            for pending in group:
+                pending.error = e
+        finally:
+            with self._lock:
+                self._stats["requests"] += len(group)
+                self._stats["batches"] += 1
+                self._stats["windows"] += windows
+                self._stats["largest_batch"] = max(self._stats["largest_batch"], windows)
+            for pending in group:
+                pending.model = None
+                pending.event.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, max_batch_size=self.max_batch_size, max_wait_ms=self.max_wait * 1000)
+        stats["mean_batch"] = stats["windows"] / stats["batches"] if stats["batches"] else None
+        return stats
+
+
+class BatchedModel:
+    """predict()-compatible view of a model that routes calls through a MicroBatcher."""
+
+    def __init__(self, model, batcher):
+        self.model = model
+        self.batcher = batcher
+
+    def predict(self, x, verbose=0, batch_size=None):
+        return self.batcher.predict(self.model, x)
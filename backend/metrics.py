@@ -0,0 +1,248 @@
+# backend/metrics.py
+
+import time
+import threading
+from bisect import bisect_left
+
+# --- Metrics and per-stage timing ---
+# Counters and histograms kept in process and rendered in the Prometheus text
+# format on GET /metrics. Recording is a perf_counter() pair, a bisect over
+# the bucket bounds and a few additions under a lock (~1-2 us), cheap enough to
+# leave on for every request.
+#
+# with stage("model_predict"): ... times one step of the current operation.
+# Stages land in pepper_stage_duration_seconds{operation, stage}; while a
+# request is being served (app.py opens a trace per request) they are also
+# added to that request's trace, which the request log line reports.
+
+# Seconds; from sub-millisecond cache hits up to slow upstream calls and cold backtests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_METRICS = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _METRICS.append(self)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values = {}   # label values -> count
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # label values -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def summary(self, *labelvalues):
+        """(count, sum) for one series."""
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return (sum(series[:-1]), series[-1]) if series else (0, 0.0)
+
+    def render(self):
+        with self._lock:
+            series_list = sorted((labels, list(series)) for labels, series in self._series.items())
+        lines = self._header()
+        for labels, series in series_list:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """
+    Values read from elsewhere at scrape time, e.g. the counters the registry
+    and upstreams already keep. callback() returns {label values tuple: value}.
+    """
+
+    def __init__(self, name, help, labelnames, callback, type="gauge"):
+        super().__init__(name, help, labelnames)
+        self.type = type
+        self.callback = callback
+
+    def render(self):
+        try:
+            values = sorted(self.callback().items())
+        except Exception:
+            return []
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in values if value is not None
+        ]
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = Histogram(
+    "pepper_stage_duration_seconds", "Time spent in one stage of an operation.", ("operation", "stage")
+)
+HTTP_REQUESTS = Counter(
+    "pepper_http_requests_total", "HTTP requests served.", ("endpoint", "method", "status")
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "pepper_http_request_duration_seconds", "Time to produce the response, per endpoint.", ("endpoint",)
+)
+ERRORS = Counter(
+    "pepper_errors_total", "Errors returned or swallowed, by operation and kind.", ("operation", "kind")
+)
+
+
+# --- Request traces ---
+_local = threading.local()
+
+
+class Trace:
+    """Stage timings and annotations for the operation the current thread is serving."""
+
+    __slots__ = ("operation", "started", "stages", "fields")
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.stages = {}   # stage -> [seconds, calls]
+        self.fields = {}
+
+    def add(self, name, seconds):
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def stage_ms(self):
+        """{stage: milliseconds}, with a call count for stages that ran more than once."""
+        return {
+            name: round(seconds * 1000, 3) if calls == 1 else {"ms": round(seconds * 1000, 3), "calls": calls}
+            for name, (seconds, calls) in self.stages.items()
+        }
+
+
+def begin_trace(operation):
+    trace = _local.trace = Trace(operation)
+    return trace
+
+
+def end_trace():
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    return trace
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+def annotate(**fields):
+    """Adds fields to the current request's log line (no-op outside a trace)."""
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.fields.update(fields)
+
+
+def count_error(kind, operation=None):
+    trace = getattr(_local, "trace", None)
+    ERRORS.inc(operation or (trace.operation if trace is not None else "background"), kind)
+
+
+class stage:
+    """
+    Context manager timing one stage. The operation label is the current
+    trace's (set per request from the endpoint) unless given; work outside a
+    request, e.g. the forecast scheduler's, is labelled "background".
+    """
+
+    __slots__ = ("name", "operation", "_trace", "_started")
+
+    def __init__(self, name, operation=None):
+        self.name = name
+        self.operation = operation
+
+    def __enter__(self):
+        self._trace = getattr(_local, "trace", None)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._started
+        trace = self._trace
+        operation = self.operation or (trace.operation if trace is not None else "background")
+        STAGE_SECONDS.observe(seconds, operation, self.name)
+        if trace is not None:
+            trace.add(self.name, seconds)
+        return False
@@ -0,0 +1,202 @@
+# backend/numpy_lstm.py
+
+import json
+import numpy as np
+
+# --- Pure-NumPy inference for our Keras LSTM models ---
+# The models saved by train_models.py are a plain Sequential stack:
+#   LSTM(50, return_sequences=True) -> Dropout -> LSTM(50) -> Dropout -> Dense(25) -> Dense(1)
+# Running one (1, 60, 4) window through model.predict() costs far more in
+# Keras overhead than in actual math, so we read the weights out of the .h5
+# file once and run the forward pass ourselves.
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x):
+    # Keras 2 definition
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+ACTIVATIONS = {
+    "sigmoid": _sigmoid,
+    "hard_sigmoid": _hard_sigmoid,
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "linear": lambda x: x,
+    None: lambda x: x,
+}
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return ACTIVATIONS[name]
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class LSTMLayer:
+    """One Keras LSTM layer (gate order i, f, c, o)."""
+
+    def __init__(self, kernel, recurrent_kernel, bias, config):
+        if config.get('go_backwards') or config.get('stateful'):
+            raise ValueError("go_backwards / stateful LSTM layers are not supported")
+        self.kernel = kernel
+        self.recurrent_kernel = recurrent_kernel
+        self.bias = bias if bias is not None else np.zeros(kernel.shape[1], dtype=kernel.dtype)
+        self.units = recurrent_kernel.shape[0]
+        self.return_sequences = config.get('return_sequences', False)
+        self.activation = _activation(config.get('activation', 'tanh'))
+        self.recurrent_activation = _activation(config.get('recurrent_activation', 'sigmoid'))
+
+    def __call__(self, x):
+        batch, steps, _ = x.shape
+        u = self.units
+        # Input projection for every timestep at once: (batch, steps, 4u)
+        x_proj = x @ self.kernel + self.bias
+        h = np.zeros((batch, u), dtype=x.dtype)
+        c = np.zeros((batch, u), dtype=x.dtype)
+        outputs = np.empty((batch, steps, u), dtype=x.dtype) if self.return_sequences else None
+
+        for t in range(steps):
+            z = x_proj[:, t, :] + h @ self.recurrent_kernel
+            i = self.recurrent_activation(z[:, :u])
+            f = self.recurrent_activation(z[:, u:2 * u])
+            g = self.activation(z[:, 2 * u:3 * u])
+            o = self.recurrent_activation(z[:, 3 * u:])
+            c = f * c + i * g
+            h = o * self.activation(c)
+            if outputs is not None:
+                outputs[:, t, :] = h
+
+        return outputs if outputs is not None else h
+
+
+class DenseLayer:
+    def __init__(self, kernel, bias, config):
+        self.kernel = kernel
+        self.bias = bias
+        self.activation = _activation(config.get('activation', 'linear'))
+
+    def __call__(self, x):
+        y = x @ self.kernel
+        if self.bias is not None:
+            y = y + self.bias
+        return self.activation(y)
+
+
+class NumpyLSTMModel:
+    """
+    Drop-in replacement for a loaded Keras model at inference time.
+    Only predict() is implemented, with the same (batch, 1) output shape.
+    """
+
+    def __init__(self, layers, dtype=np.float32):
+        self.layers = layers
+        self.dtype = dtype
+
+    @property
+    def nbytes(self):
+        total = 0
+        for layer in self.layers:
+            for arr in vars(layer).values():
+                if isinstance(arr, np.ndarray):
+                    total += arr.nbytes
+        return total
+
+    def predict(self, x, verbose=0, batch_size=None):
+        out = np.asarray(x, dtype=self.dtype)
+        for layer in self.layers:
+            out = layer(out)
+        return out
+
+    __call__ = predict
+
+
+def _layer_configs(model_config):
+    config = model_config.get('config', {})
+    # Keras 2.x Sequential stores {'name': ..., 'layers': [...]};
+    # very old files store the layer list directly.
+    if isinstance(config, dict):
+        return config.get('layers', [])
+    return config
+
+
+def load_numpy_model(model_path, dtype=np.float32):
+    """
+    Reads a Keras Sequential .h5 file and returns a NumpyLSTMModel.
+    """
+    import h5py
+
+    layers = []
+    with h5py.File(model_path, 'r') as f:
+        model_config = json.loads(_decode(f.attrs['model_config']))
+        if model_config.get('class_name') != 'Sequential':
+            raise ValueError(f"Only Sequential models are supported, got {model_config.get('class_name')}")
+
+        weights_group = f['model_weights'] if 'model_weights' in f else f
+
+        for layer in _layer_configs(model_config):
+            class_name = layer['class_name']
+            config = layer.get('config', {})
+
+            if class_name in ('InputLayer', 'Dropout'):
+                # Dropout is the identity at inference time
+                continue
+
+            group = weights_group[config['name']]
+            weight_names = [_decode(n) for n in group.attrs['weight_names']]
+            weights = [np.asarray(group[n], dtype=dtype) for n in weight_names]
+
+            if class_name == 'LSTM':
+                bias = weights[2] if len(weights) > 2 else None
+                layers.append(LSTMLayer(weights[0], weights[1], bias, config))
+            elif class_name == 'Dense':
+                bias = weights[1] if len(weights) > 1 else None
+                layers.append(DenseLayer(weights[0], bias, config))
+            else:
+                raise ValueError(f"Unsupported layer type in {model_path}: {class_name}")
+
+    return NumpyLSTMModel(layers, dtype=dtype)
+
+
+def check_parity(model_path, n_windows=32, window_size=60, n_features=4, seed=0):
+    """
+    Runs the same random windows through Keras and NumPy and returns the
+    maximum absolute difference between the two outputs.
+    """
+    from tensorflow.keras.models import load_model
+
+    rng = np.random.default_rng(seed)
+    x = rng.random((n_windows, window_size, n_features), dtype=np.float32)
+
+    keras_out = load_model(model_path).predict(x, verbose=0)
+    numpy_out = load_numpy_model(model_path).predict(x)
+    return float(np.max(np.abs(keras_out - numpy_out)))
+
+
+if __name__ == "__main__":
+    # --- This is just for testing ---
+    # Checks the NumPy forward pass against Keras on the shipped models:
+    # python backend/numpy_lstm.py
+    import os
+    import sys
+
+    MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+    TOLERANCE = 1e-4
+
+    print("Testing NumPy LSTM parity against Keras...")
+    failed = False
+    for region in ["madikeri", "sirsi", "chikkamagaluru"]:
+        path = os.path.join(MODELS_DIR, f"{region}_lstm.h5")
+        max_diff = check_parity(path)
+        status = "OK" if max_diff < TOLERANCE else "FAIL"
+        failed = failed or status == "FAIL"
+        print(f"{region}: max |keras - numpy| = {max_diff:.2e} [{status}]")
+
+    sys.exit(1 if failed else 0)
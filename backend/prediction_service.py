@@ -2,10 +2,21 @@
 
 import os
 import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-from tensorflow.keras.models import load_model
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import MinMaxScaler # We need this for the new function
+from dotenv import load_dotenv
+import columnar_store
+from csv_tail import CsvTail, CsvRewritten
+from inference_batching import MicroBatcher, BatchedModel
+from metrics import stage, annotate, count_error
+from structured_logging import get_logger
+from region_registry import REGION_CONFIG, RegionRegistry, LazyArtifactMap, region_names
+
+log = get_logger(__name__)
 
 # --- Configuration ---
 MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
@@ -13,165 +24,617 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 
 WINDOW_SIZE = 60
 
-# --- Load all models and scalers into memory ---
-print("Loading all models and scalers...")
-MODELS = {}
-SCALERS = {}
-HISTORICAL_DATA = {}
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
+
+# Which engine runs the LSTM forward pass:
+#   "keras" - tensorflow.keras load_model / model.predict (default)
+#   "numpy" - weights read from the .h5 once, forward pass in NumPy (numpy_lstm.py)
+#   "tflite" - models/<region>_lstm.tflite from convert_tflite.py (tflite_lstm.py)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras").lower()
+
+# How HISTORICAL_DATA is loaded:
+#   "auto" - memory-map data/columnar/<region>.* if fresh, else parse the CSV (default)
+#   "csv"  - always parse data/<region>_merged.csv
+DATA_FORMAT = os.getenv("DATA_FORMAT", "auto").lower()
+
+# Micro-batching of concurrent forecast steps per region (inference_batching.py)
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "0") == "1"
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "2"))
+
 
-regions = ["madikeri", "sirsi", "chikkamagaluru"]
+def load_region_model(model_path, backend=None):
+    """
+    Loads a model file with the configured inference backend.
+    All backends expose the same predict(x, verbose=0) interface.
+    """
+    backend = backend or INFERENCE_BACKEND
+    if backend == "numpy":
+        from numpy_lstm import load_numpy_model
+        return load_numpy_model(model_path)
+    if backend == "tflite":
+        from tflite_lstm import load_tflite_model
+        return load_tflite_model(model_path)
+    if backend == "keras":
+        # Imported here so the numpy backend never pays for TensorFlow
+        from tensorflow.keras.models import load_model
+        return load_model(model_path)
+    raise ValueError(f"Unknown INFERENCE_BACKEND: {backend}")
+
+# --- Region registry: artifacts are loaded on first use ---
+# MODELS / SCALERS / HISTORICAL_DATA keep their old dict-style interface, but
+# are now lazy views over REGISTRY (see region_registry.py). Regions come from
+# regions.json instead of a hardcoded list.
+regions = region_names()
 features = ['Max_Temp', 'Min_Temp', 'Rainfall', 'Price']
 
-for region in regions:
-    try:
-        model_path = os.path.join(MODELS_DIR, f"{region}_lstm.h5")
-        MODELS[region] = load_model(model_path)
-        
-        scaler_path = os.path.join(MODELS_DIR, f"{region}_scaler.pkl")
-        with open(scaler_path, 'rb') as f:
-            SCALERS[region] = pickle.load(f)
-            
-        data_path = os.path.join(DATA_DIR, f"{region}_merged.csv")
-        df = pd.read_csv(data_path, parse_dates=['Date'], index_col='Date')
-        HISTORICAL_DATA[region] = df[features]
-        
-        print(f"Successfully loaded artifacts for {region}")
-        
-    except Exception as e:
-        print(f"CRITICAL ERROR: Failed to load artifacts for {region}: {e}")
 
-print("All artifacts loaded.")
+# The tflite backend reads its own files; see convert_tflite.py
+MODEL_PATH_KEY = "tflite_path" if INFERENCE_BACKEND == "tflite" else "model_path"
+
+
+def _load_model_artifact(region, config):
+    return load_region_model(config[MODEL_PATH_KEY])
+
+
+def _load_scaler_artifact(region, config):
+    with open(config["scaler_path"], 'rb') as f:
+        return pickle.load(f)
+
+
+# region -> CsvTail marking how far into the CSV the loaded data goes (see refresh_region_data)
+_DATA_TAILS = {}
+
+
+def _load_data_artifact(region, config):
+    # Marked before reading: rows appended while we read are read again
+    # by the next refresh and dropped as duplicates.
+    tail = CsvTail.mark(config["data_path"])
+    # Prefer the memory-mapped columnar copy; fall back to parsing the CSV
+    # if it hasn't been built or is older than the CSV.
+    prefix = config["columnar_prefix"]
+    if DATA_FORMAT == "auto" and columnar_store.is_fresh(prefix, config["data_path"]):
+        df = columnar_store.load_columnar(prefix, columns=features)
+    else:
+        if DATA_FORMAT == "auto" and os.path.exists(prefix + columnar_store.META_SUFFIX):
+            log.warning("Columnar data is stale, reading CSV instead. Re-run columnar_store.py.",
+                        extra={"region": region})
+        df = pd.read_csv(config["data_path"], parse_dates=['Date'], index_col='Date')[features]
+    _DATA_TAILS[region] = tail
+    return df
+
+
+REGISTRY = RegionRegistry(
+    REGION_CONFIG,
+    model_loader=_load_model_artifact,
+    scaler_loader=_load_scaler_artifact,
+    data_loader=_load_data_artifact,
+    model_path_key=MODEL_PATH_KEY,
+)
+MODELS = LazyArtifactMap(REGISTRY, "model")
+SCALERS = LazyArtifactMap(REGISTRY, "scaler")
+HISTORICAL_DATA = LazyArtifactMap(REGISTRY, "data")
+
+log.info("Region registry ready", extra={"regions": len(regions), "inference_backend": INFERENCE_BACKEND})
+
+
+# --- Hot reload of data (see hot_reload.py) ---
+_DATA_REFRESH_LOCK = threading.Lock()
+
+
+def refresh_region_data(region):
+    """
+    Brings a region's loaded data up to date with its CSV without re-parsing
+    it: rows appended to the file are parsed and added to the end. If the
+    file was rewritten instead, the whole thing is reloaded. Data that isn't
+    loaded yet is left alone. Returns ("unchanged" | "appended" | "reloaded",
+    number of new rows). Raises if the file can't be read; the old data stays.
+    """
+    with _DATA_REFRESH_LOCK:
+        tail = _DATA_TAILS.get(region)
+        if tail is None or not REGISTRY.is_resident("data", region):
+            return "unchanged", 0
+
+        status = tail.status()
+        if status == "unchanged":
+            return status, 0
+
+        current = REGISTRY.get_data(region)
+        if status == "appended":
+            try:
+                new_rows, new_tail = tail.read_appended()
+            except CsvRewritten:
+                status = "rewritten"
+
+        if status == "appended":
+            if new_rows is not None:
+                new_rows = new_rows.loc[new_rows.index > current.index[-1], features]
+            if new_rows is None or new_rows.empty:
+                _DATA_TAILS[region] = new_tail
+                return "unchanged", 0
+            if new_rows.index.is_monotonic_increasing and new_rows.index.is_unique:
+                data = pd.concat([current, new_rows.astype(current.dtypes.to_dict())])
+                REGISTRY.reload(region, ["data"], {"data": data})
+                _DATA_TAILS[region] = new_tail
+                return "appended", len(new_rows)
+            # Out-of-order rows: let a full read sort it out
+
+        REGISTRY.reload(region, ["data"])
+        return "reloaded", len(REGISTRY.get_data(region)) - len(current)
+
+
+def drop_derived(region):
+    """Frees the cached backtests of a region whose artifacts changed."""
+    with _BACKTEST_LOCKS[region]:
+        _BACKTEST_CACHE.pop(region, None)
+        for key in [k for k in _MULTISTEP_CACHE if k[0] == region]:
+            del _MULTISTEP_CACHE[key]
+
+
+WEATHER_FEATURES = features[:3]
+
+# --- Weather scenario defaults (see make_scenario_prediction) ---
+SCENARIO_TEMP_STD = 1.5        # deg C, noise added to each day's max/min temperature
+SCENARIO_RAIN_SIGMA = 0.5      # log-normal spread applied to forecast rainfall
+SCENARIO_RAIN_STD = 2.0        # mm, additive rainfall noise (lets dry days get some rain)
+DEFAULT_SCENARIOS = 1000
+MAX_SCENARIOS = 5000
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _weather_array(forecasts):
+    """List of forecast dicts -> (days, 3) array of Max_Temp, Min_Temp, Rainfall."""
+    return np.array([[day[f] for f in WEATHER_FEATURES] for day in forecasts], dtype=np.float64)
+
+
+def _scale_weather(scaler, weather):
+    """Scales the weather columns of a (..., 3) array in one scaler call."""
+    flat = weather.reshape(-1, len(WEATHER_FEATURES))
+    dummy = np.zeros((len(flat), len(features)))
+    dummy[:, :3] = flat
+    return scaler.transform(dummy)[:, :3].reshape(weather.shape)
+
+
+def _inverse_price(scaler, scaled_prices):
+    """
+    Inverse-transforms a 1-D array of scaled prices in one call
+    (the scaler expects all 4 features, so the others are zero).
+    """
+    scaled_prices = np.asarray(scaled_prices, dtype=np.float64).ravel()
+    dummy = np.zeros((len(scaled_prices), len(features)))
+    dummy[:, 3] = scaled_prices  # Index 3 is 'Price'
+    return scaler.inverse_transform(dummy)[:, 3]
+
+
+def _rollout(model, scaler, last_window_scaled, weather):
+    """
+    Runs the autoregressive forecast loop for a batch of weather trajectories.
+
+    last_window_scaled is the (WINDOW_SIZE, 4) scaled history shared by every
+    trajectory, or (n, WINDOW_SIZE, 4) with one history per trajectory, and
+    weather is (n, days, 3) unscaled. Each step runs the whole
+    (n, WINDOW_SIZE, 4) batch through the model once, then appends that day's
+    weather plus the predicted price to every window.
+    Returns the scaled predicted prices, shape (n, days).
+    """
+    n, days, _ = weather.shape
+    with stage("scaler_transform"):
+        scaled_weather = _scale_weather(scaler, weather)
+    current_input = np.asarray(last_window_scaled)
+    if current_input.ndim == 2:
+        current_input = np.repeat(current_input[np.newaxis], n, axis=0)
+    trajectory = np.empty((n, days))
+
+    for step in range(days):
+        with stage("model_predict"):
+            predicted = model.predict(current_input, verbose=0, batch_size=n)[:, 0]
+        trajectory[:, step] = predicted
+        new_rows = np.concatenate([scaled_weather[:, step], predicted[:, np.newaxis]], axis=1)
+        current_input = np.concatenate([current_input[:, 1:], new_rows[:, np.newaxis]], axis=1)
+
+    return trajectory
+
+
+_BATCHERS = {}
+_BATCHERS_LOCK = threading.Lock()
+
+
+def _inference_model(region, model):
+    """The model itself, or a view that batches its predict() calls with other requests'."""
+    if not INFERENCE_BATCHING:
+        return model
+    batcher = _BATCHERS.get(region)
+    if batcher is None:
+        with _BATCHERS_LOCK:
+            batcher = _BATCHERS.setdefault(
+                region, MicroBatcher(region, INFERENCE_MAX_BATCH, INFERENCE_MAX_WAIT_MS / 1000)
+            )
+    return BatchedModel(model, batcher)
+
+
+def batching_stats():
+    return {
+        "enabled": INFERENCE_BATCHING,
+        "regions": {region: batcher.stats() for region, batcher in _BATCHERS.items()},
+    }
+
+
+def _last_window_scaled(scaler, historical_df):
+    return scaler.transform(historical_df.tail(WINDOW_SIZE))
 
 
 def make_prediction(region, future_weather_forecasts):
-    # (This function is unchanged)
-    
-    if region not in MODELS:
+    try:
+        model, scaler, historical_df, _ = REGISTRY.artifacts(region)
+    except KeyError:
         return None, f"No model loaded for region: {region}"
-        
-    model = MODELS[region]
-    scaler = SCALERS[region]
-    historical_df = HISTORICAL_DATA[region]
     
     try:
-        last_window_df = historical_df.tail(WINDOW_SIZE)
-        last_window_scaled = scaler.transform(last_window_df)
+        with stage("scaler_transform"):
+            last_window_scaled = _last_window_scaled(scaler, historical_df)
     except Exception as e:
         return None, f"Error scaling historical data: {e}"
-        
-    current_input = np.array([last_window_scaled])
+
     predicted_price_scaled = 0.0
-    
-    for i, day_forecast in enumerate(future_weather_forecasts):
-        predicted_price_scaled = model.predict(current_input, verbose=0)[0][0]
-        new_row_weather = [day_forecast['Max_Temp'], day_forecast['Min_Temp'], day_forecast['Rainfall']]
-        dummy_row = new_row_weather + [0.0] 
-        scaled_dummy_row = scaler.transform([dummy_row])[0]
-        scaled_dummy_row[3] = predicted_price_scaled
-        new_input_window = current_input[0][1:] 
-        new_row_reshaped = np.expand_dims(scaled_dummy_row, axis=0)
-        current_input = np.vstack([new_input_window, new_row_reshaped])
-        current_input = np.expand_dims(current_input, axis=0)
-
-    final_dummy_row = [0, 0, 0, predicted_price_scaled]
-    unscaled_dummy_row = scaler.inverse_transform([final_dummy_row])
-    final_predicted_price = unscaled_dummy_row[0, 3]
+    try:
+        weather = _weather_array(future_weather_forecasts)[np.newaxis]
+        if weather.shape[1] > 0:
+            predicted_price_scaled = _rollout(_inference_model(region, model), scaler, last_window_scaled, weather)[0, -1]
+    except Exception as e:
+        return None, f"Error during prediction: {e}"
+
+    with stage("inverse_transform"):
+        final_predicted_price = _inverse_price(scaler, [predicted_price_scaled])[0]
     
     return float(final_predicted_price), None
 
+
+def _scaled_trajectory(region, future_weather_forecasts):
+    """Returns ((scaler, scaled day-by-day prices), None) or (None, error)."""
+    try:
+        model, scaler, historical_df, _ = REGISTRY.artifacts(region)
+    except KeyError:
+        return None, f"No model loaded for region: {region}"
+
+    if not future_weather_forecasts:
+        return None, "No weather forecasts provided."
+
+    try:
+        with stage("scaler_transform"):
+            last_window_scaled = _last_window_scaled(scaler, historical_df)
+    except Exception as e:
+        return None, f"Error scaling historical data: {e}"
+
+    weather = _weather_array(future_weather_forecasts)[np.newaxis]
+    try:
+        trajectory = _rollout(_inference_model(region, model), scaler, last_window_scaled, weather)[0]
+    except Exception as e:
+        # One region's failure must not take down the other regions in make_trajectories
+        return None, f"Prediction error: {e}"
+    return (scaler, trajectory), None
+
+
+def _trajectory_rows(future_weather_forecasts, prices):
+    return [
+        {"date": day["Date"], "predicted_price": float(price)}
+        for day, price in zip(future_weather_forecasts, prices)
+    ]
+
+
+def make_trajectory(region, future_weather_forecasts):
+    """
+    Like make_prediction, but keeps the predicted price for every forecast day
+    instead of only the last one. Returns ([{"date", "predicted_price"}, ...], None);
+    day k's price is what make_prediction gives for forecasts[:k + 1].
+    """
+    result, error = _scaled_trajectory(region, future_weather_forecasts)
+    if error:
+        return None, error
+    scaler, trajectory = result
+    return _trajectory_rows(future_weather_forecasts, _inverse_price(scaler, trajectory)), None
+
+
+def make_trajectories(region_forecasts):
+    """
+    make_trajectory for several regions: {region: forecasts} -> ({region: rows}, {region: error}).
+
+    The rollouts run concurrently, one thread per region. The scaled prices of
+    every region are then inverse-transformed in one vectorized step: for the
+    Price column MinMaxScaler.inverse_transform is (x - min_) / scale_.
+    """
+    if not region_forecasts:
+        return {}, {}
+    with ThreadPoolExecutor(max_workers=len(region_forecasts)) as pool:
+        futures = {region: pool.submit(_scaled_trajectory, region, forecasts)
+                   for region, forecasts in region_forecasts.items()}
+        results = {region: future.result() for region, future in futures.items()}
+
+    errors = {region: error for region, (_, error) in results.items() if error}
+    done = [(region, *result) for region, (result, error) in results.items() if not error]
+    if not done:
+        return {}, errors
+
+    scaled = np.concatenate([trajectory for _, _, trajectory in done])
+    mins = np.concatenate([np.full(len(t), scaler.min_[3]) for _, scaler, t in done])
+    scales = np.concatenate([np.full(len(t), scaler.scale_[3]) for _, scaler, t in done])
+    prices = np.split((scaled - mins) / scales, np.cumsum([len(t) for _, _, t in done])[:-1])
+
+    trajectories = {
+        region: _trajectory_rows(region_forecasts[region], region_prices)
+        for (region, _, _), region_prices in zip(done, prices)
+    }
+    return trajectories, errors
+
+
+def perturb_weather(future_weather_forecasts, n_scenarios, seed=None,
+                    temp_std=SCENARIO_TEMP_STD, rain_sigma=SCENARIO_RAIN_SIGMA,
+                    rain_std=SCENARIO_RAIN_STD):
+    """
+    Turns one forecast into n_scenarios plausible weather trajectories,
+    shape (n_scenarios, days, 3). Temperatures get Gaussian noise (with
+    Min_Temp kept <= Max_Temp) and rainfall log-normal plus additive noise,
+    clipped at zero.
+    """
+    rng = np.random.default_rng(seed)
+    base = _weather_array(future_weather_forecasts)
+    scenarios = np.repeat(base[np.newaxis], n_scenarios, axis=0)
+
+    scenarios[..., :2] += rng.normal(0.0, temp_std, size=scenarios[..., :2].shape)
+    max_temp = np.maximum(scenarios[..., 0], scenarios[..., 1])
+    min_temp = np.minimum(scenarios[..., 0], scenarios[..., 1])
+    scenarios[..., 0], scenarios[..., 1] = max_temp, min_temp
+
+    rain = scenarios[..., 2] * rng.lognormal(0.0, rain_sigma, size=scenarios[..., 2].shape)
+    rain += rng.normal(0.0, rain_std, size=rain.shape)
+    scenarios[..., 2] = np.clip(rain, 0.0, None)
+    return scenarios
+
+
+def make_scenario_prediction(region, future_weather_forecasts=None, n_scenarios=DEFAULT_SCENARIOS,
+                             scenarios=None, percentiles=DEFAULT_PERCENTILES, seed=None):
+    """
+    Forecasts a distribution of prices instead of a single point.
+
+    Either perturbs future_weather_forecasts into n_scenarios trajectories or
+    uses the caller's scenarios (a list of forecast lists, all the same length).
+    All trajectories go through the model together, one batched call per day.
+    """
+    try:
+        model, scaler, historical_df, _ = REGISTRY.artifacts(region)
+    except KeyError:
+        return None, f"No model loaded for region: {region}"
+
+    if len(scenarios or []) > MAX_SCENARIOS or (not scenarios and n_scenarios > MAX_SCENARIOS):
+        return None, f"Too many scenarios (max {MAX_SCENARIOS})."
+
+    try:
+        if scenarios:
+            lengths = {len(s) for s in scenarios}
+            if len(lengths) != 1 or 0 in lengths:
+                return None, "All scenarios must be non-empty and cover the same number of days."
+            weather = np.stack([_weather_array(s) for s in scenarios])
+        else:
+            if not future_weather_forecasts:
+                return None, "No weather forecasts provided."
+            weather = perturb_weather(future_weather_forecasts, n_scenarios, seed=seed)
+    except (KeyError, TypeError, ValueError) as e:
+        return None, f"Invalid weather scenario: {e}"
+
+    try:
+        last_window_scaled = _last_window_scaled(scaler, historical_df)
+    except Exception as e:
+        return None, f"Error scaling historical data: {e}"
+
+    try:
+        trajectory = _rollout(_inference_model(region, model), scaler, last_window_scaled, weather)
+        final_prices = _inverse_price(scaler, trajectory[:, -1])
+        quantiles = np.percentile(final_prices, percentiles)
+    except Exception as e:
+        return None, f"Error during prediction: {e}"
+
+    return {
+        "n_scenarios": int(len(final_prices)),
+        "mean": float(final_prices.mean()),
+        "std": float(final_prices.std()),
+        "percentiles": {f"p{p:g}": float(v) for p, v in zip(percentiles, quantiles)},
+    }, None
+
 def get_latest_prices():
-    # (This function is unchanged)
     latest_prices = {}
     for region, df in HISTORICAL_DATA.items():
         try:
             latest_record = df.iloc[-1]
             latest_prices[region] = {
-                "price": latest_record['Price'],
+                "price": float(latest_record['Price']),
                 "date": latest_record.name.strftime('%Y-%m-%d')
             }
         except Exception as e:
-            print(f"Error getting latest price for {region}: {e}")
+            log.warning("Error getting latest price", extra={"region": region, "error": str(e)})
             latest_prices[region] = None
     return latest_prices
 
 def get_historical_data(region, days):
-    # (This function is unchanged)
     if region not in HISTORICAL_DATA:
         return None, "Invalid region"
     try:
-        historical_df = HISTORICAL_DATA[region].tail(days)
-        price_data = historical_df[['Price']]
-        price_data = price_data.reset_index()
-        price_data['Date'] = price_data['Date'].dt.strftime('%Y-%m-%d')
-        return price_data.to_dict('records'), None
+        with stage("slice"):
+            historical_df = HISTORICAL_DATA[region].tail(days)
+            price_data = historical_df[['Price']]
+        with stage("format_rows"):
+            price_data = price_data.reset_index()
+            price_data['Date'] = price_data['Date'].dt.strftime('%Y-%m-%d')
+            return price_data.to_dict('records'), None
     except Exception as e:
-        print(f"Error getting historical data for {region}: {e}")
+        log.error("Error getting historical data", extra={"region": region, "error": str(e)})
+        count_error("historical_data")
         return None, str(e)
 
 
 # --- [NEW FUNCTION FOR DASHBOARD TAB 2] ---
+# Backtests are computed once per region over the full history and kept here
+# keyed by REGISTRY.fingerprint(region), so any 'days' value is just a slice.
+_BACKTEST_CACHE = {}   # region -> (fingerprint, results)
+_BACKTEST_LOCKS = {r: threading.Lock() for r in regions}
+_MULTISTEP_CACHE = {}  # (region, horizon) -> (fingerprint, dates, actual, predicted)
+MAX_BACKTEST_HORIZON = 14
+
+
+def make_windows(scaled_data):
+    """
+    All WINDOW_SIZE-long input windows that have a next-day target, as a
+    strided view: window i covers rows [i, i + WINDOW_SIZE) and predicts
+    row i + WINDOW_SIZE. Shape (n - WINDOW_SIZE, WINDOW_SIZE, n_features).
+    """
+    n_features = scaled_data.shape[1]
+    windows = sliding_window_view(scaled_data, (WINDOW_SIZE, n_features))[:, 0]
+    return windows[:-1]
+
+
+def _full_backtest(model, scaler, data_df):
+    """
+    One-step-ahead predictions for every date that has a full window behind it.
+    """
+    with stage("scaler_transform"):
+        scaled_data = scaler.transform(data_df)
+        X_hist = make_windows(scaled_data)
+
+    with stage("model_predict"):
+        y_pred_scaled = model.predict(X_hist, verbose=0)
+    with stage("inverse_transform"):
+        predicted_prices = _inverse_price(scaler, y_pred_scaled)
+    actual_prices = data_df['Price'].to_numpy(dtype=np.float64)[WINDOW_SIZE:]
+    dates = data_df.index[WINDOW_SIZE:].strftime('%Y-%m-%d')
+
+    # e.g., [{"date": "2025-09-30", "actual": 100, "predicted": 102}, ...]
+    with stage("format_rows"):
+        return [
+            {"date": date, "actual": actual, "predicted": predicted}
+            for date, actual, predicted in zip(dates, actual_prices.tolist(), predicted_prices.tolist())
+        ]
+
+
+def get_full_backtest(region):
+    """
+    The stored full-history backtest for a region, recomputed only when the
+    region's model, scaler or data change. Returns ((fingerprint, results), None)
+    or (None, error).
+    """
+    try:
+        model, scaler, data_df, fingerprint = REGISTRY.artifacts(region)
+    except KeyError:
+        return None, f"No model loaded for region: {region}"
+
+    try:
+        with _BACKTEST_LOCKS[region]:
+            cached = _BACKTEST_CACHE.get(region)
+            if cached is None or cached[0] != fingerprint:
+                log.info("Computing full-history backtest", extra={"region": region})
+                annotate(backtest_cache="miss")
+                cached = (fingerprint, _full_backtest(model, scaler, data_df))
+                _BACKTEST_CACHE[region] = cached
+        return cached, None
+
+    except Exception as e:
+        log.exception("Error during model backtest", extra={"region": region})
+        count_error("backtest")
+        return None, str(e)
+
+
 def backtest_model(region, days_to_backtest):
     """
     Runs the saved model over historical data to compare
     Actual vs. Predicted prices.
     """
-    if region not in MODELS:
+    if region not in REGION_CONFIG:
         return None, f"No model loaded for region: {region}"
-        
+    if days_to_backtest <= 0:
+        return [], None
+
+    # Any window is a slice of the stored full-history result
+    with stage("full_backtest"):
+        cached, error = get_full_backtest(region)
+    if error:
+        return None, error
+    return cached[1][-days_to_backtest:], None
+
+
+def _multistep_backtest(model, scaler, data_df, horizon):
+    """
+    Rolling-origin backtest of the autoregressive forecast over the whole
+    history. From every origin (a day with a full window behind it) the model
+    is rolled forward `horizon` days, feeding its own predicted prices back in
+    and using the observed weather as the forecast. All origins go through
+    _rollout together, so this is `horizon` predict calls in total.
+
+    Returns (dates, actual, predicted) for every target day that has all
+    horizons: predicted[i, k] is the (k + 1)-day-ahead forecast of dates[i].
+    """
+    n = len(data_df)
+    scaled_data = scaler.transform(data_df)
+    windows = make_windows(scaled_data)  # window i is the history of origin i + WINDOW_SIZE
+    weather = data_df[WEATHER_FEATURES].to_numpy(dtype=np.float64)
+    # Origin o uses the weather of days o .. o + horizon - 1; repeat the last
+    # day past the end, those predictions are dropped below
+    weather = np.concatenate([weather, np.repeat(weather[-1:], horizon, axis=0)])
+    origins = np.arange(WINDOW_SIZE, n)
+    origin_weather = weather[origins[:, np.newaxis] + np.arange(horizon)]
+
+    trajectory = _rollout(model, scaler, windows, origin_weather)   # (origins, horizon), scaled
+    prices = _inverse_price(scaler, trajectory).reshape(trajectory.shape)
+
+    # Target t at horizon k + 1 was forecast from origin t - k
+    targets = np.arange(WINDOW_SIZE + horizon - 1, n)
+    predicted = np.stack([prices[targets - k - WINDOW_SIZE, k] for k in range(horizon)], axis=1)
+    actual = data_df['Price'].to_numpy(dtype=np.float64)[targets]
+    dates = data_df.index[targets].strftime('%Y-%m-%d')
+    return dates, actual, predicted
+
+
+def multistep_backtest_model(region, days_to_backtest, horizon):
+    """
+    h-day-ahead backtest for the last days_to_backtest dates. Returns
+    ({"horizon", "metrics": [{"horizon", "mae", "mape", "count"}, ...],
+      "series": [{"date", "actual", "predicted": [1-day, ..., h-day ahead]}, ...]}, None)
+    or (None, error). The full-history result is cached per fingerprint and horizon.
+    """
+    if not 1 <= horizon <= MAX_BACKTEST_HORIZON:
+        return None, f"'horizon' must be between 1 and {MAX_BACKTEST_HORIZON}"
     try:
-        # 1. Get the required model, scaler, and data
-        model = MODELS[region]
-        scaler = SCALERS[region]
-        # We need all data, including the window, so we grab extra
-        data_df = HISTORICAL_DATA[region].tail(days_to_backtest + WINDOW_SIZE)
-        
-        # 2. Scale all data
-        scaled_data = scaler.transform(data_df)
-        
-        # 3. Create the historical X and y windows
-        X_hist = []
-        y_hist_scaled = [] # These are the actual scaled prices
-        
-        for i in range(WINDOW_SIZE, len(scaled_data)):
-            X_hist.append(scaled_data[i-WINDOW_SIZE:i])
-            y_hist_scaled.append(scaled_data[i, 3]) # Index 3 is 'Price'
-            
-        X_hist = np.array(X_hist)
-        y_hist_scaled = np.array(y_hist_scaled)
-        
-        # 4. Get the model's predictions
-        y_pred_scaled = model.predict(X_hist, verbose=0)
-        
-        # 5. We must "inverse transform" both the actual and predicted prices
-        # We create dummy arrays, as the scaler expects all 4 features
-        
-        # Create dummy array for actual prices
-        dummy_actual = np.zeros((len(y_hist_scaled), 4))
-        dummy_actual[:, 3] = y_hist_scaled.ravel()
-        actual_prices = scaler.inverse_transform(dummy_actual)[:, 3]
-        
-        # Create dummy array for predicted prices
-        dummy_pred = np.zeros((len(y_pred_scaled), 4))
-        dummy_pred[:, 3] = y_pred_scaled.ravel()
-        predicted_prices = scaler.inverse_transform(dummy_pred)[:, 3]
-        
-        # 6. Get the dates for the X-axis
-        dates = data_df.index[WINDOW_SIZE:].strftime('%Y-%m-%d')
-        
-        # 7. Format for frontend
-        # e.g., [{"date": "2025-09-30", "actual": 100, "predicted": 102}, ...]
-        results = []
-        for i in range(len(dates)):
-            results.append({
-                "date": dates[i],
-                "actual": actual_prices[i],
-                "predicted": predicted_prices[i]
-            })
-            
-        return results, None
+        model, scaler, data_df, fingerprint = REGISTRY.artifacts(region)
+    except KeyError:
+        return None, f"No model loaded for region: {region}"
 
+    try:
+        with _BACKTEST_LOCKS[region]:
+            cached = _MULTISTEP_CACHE.get((region, horizon))
+            if cached is None or cached[0] != fingerprint:
+                log.info("Computing rolling-origin backtest", extra={"region": region, "horizon": horizon})
+                annotate(backtest_cache="miss")
+                cached = (fingerprint, *_multistep_backtest(model, scaler, data_df, horizon))
+                _MULTISTEP_CACHE[(region, horizon)] = cached
     except Exception as e:
-        print(f"Error during model backtest for {region}: {e}")
-        import traceback
-        traceback.print_exc()
-        return None, str(e)
\ No newline at end of file
+        log.exception("Error during multi-step backtest", extra={"region": region, "horizon": horizon})
+        count_error("backtest")
+        return None, str(e)
+
+    _, dates, actual, predicted = cached
+    lo = max(len(dates) - days_to_backtest, 0) if days_to_backtest > 0 else len(dates)
+    dates, actual, predicted = dates[lo:], actual[lo:], predicted[lo:]
+
+    error = np.abs(predicted - actual[:, np.newaxis])
+    nonzero = actual != 0
+    pct = error[nonzero] / np.abs(actual[nonzero, np.newaxis]) * 100
+    metrics = [
+        {
+            "horizon": k + 1,
+            "mae": float(error[:, k].mean()) if len(dates) else None,
+            "mape": float(pct[:, k].mean()) if len(pct) else None,
+            "count": int(len(dates)),
+        }
+        for k in range(horizon)
+    ]
+    series = [
+        {"date": date, "actual": a, "predicted": p}
+        for date, a, p in zip(dates, actual.tolist(), predicted.tolist())
+    ]
+    return {"horizon": horizon, "metrics": metrics, "series": series}, None
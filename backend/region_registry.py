@@ -0,0 +1,383 @@
+# backend/region_registry.py
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping
+from contextlib import ExitStack
+from dotenv import load_dotenv
+from structured_logging import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
+
+# --- Configuration ---
+# Every market we support is listed once in regions.json. Artifact paths default
+# to models/<name>_lstm.h5, models/<name>_scaler.pkl and data/<name>_merged.csv
+# (plus models/<name>_lstm.tflite) but can be overridden per region with
+# "model", "scaler", "data" and "tflite" keys.
+REGIONS_CONFIG_PATH = os.getenv(
+    "REGIONS_CONFIG", os.path.join(os.path.dirname(__file__), 'regions.json')
+)
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+# Built from the CSVs by columnar_store.py
+COLUMNAR_DIR = os.getenv("COLUMNAR_DATA_DIR", os.path.join(DATA_DIR, 'columnar'))
+
+# Upper bound on the memory used by resident models. Scalers and price history
+# are small and stay loaded once touched; models are evicted least-recently-used.
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "512"))
+# A Keras model costs far more than its weights: layer objects, variables and
+# the traced predict function add ~3.5 MB per LSTM model here (RSS measured
+# over repeated load + first predict, TF 2.21), about 30x count_params() * 4.
+KERAS_MODEL_OVERHEAD_MB = float(os.getenv("KERAS_MODEL_OVERHEAD_MB", "4"))
+
+
+def load_region_config(path=REGIONS_CONFIG_PATH):
+    """
+    Reads regions.json and returns an ordered {name: config} dict with
+    artifact paths filled in.
+    """
+    with open(path) as f:
+        raw = json.load(f)
+
+    config = OrderedDict()
+    for entry in raw.get("regions", []):
+        name = entry["name"].lower()
+        config[name] = {
+            "name": name,
+            "location_key": str(entry.get("location_key", "")),
+            "aliases": [a.lower() for a in entry.get("aliases", [name])],
+            "model_path": entry.get("model", os.path.join(MODELS_DIR, f"{name}_lstm.h5")),
+            # Written by convert_tflite.py, served with INFERENCE_BACKEND=tflite
+            "tflite_path": entry.get("tflite", os.path.join(MODELS_DIR, f"{name}_lstm.tflite")),
+            "scaler_path": entry.get("scaler", os.path.join(MODELS_DIR, f"{name}_scaler.pkl")),
+            "data_path": entry.get("data", os.path.join(DATA_DIR, f"{name}_merged.csv")),
+            "columnar_prefix": entry.get("columnar", os.path.join(COLUMNAR_DIR, name)),
+        }
+    return config
+
+
+REGION_CONFIG = load_region_config()
+
+
+def region_names():
+    return list(REGION_CONFIG.keys())
+
+
+def location_keys():
+    return {name: cfg["location_key"] for name, cfg in REGION_CONFIG.items() if cfg["location_key"]}
+
+
+def match_region(text):
+    """
+    Returns the first configured region whose name or alias appears in text.
+    """
+    text = text.lower()
+    for name, cfg in REGION_CONFIG.items():
+        if any(alias in text for alias in cfg["aliases"]):
+            return name
+    return None
+
+
+def _estimate_nbytes(model, path):
+    """Rough resident size of a loaded model, used for the memory budget."""
+    nbytes = getattr(model, 'nbytes', None)
+    if nbytes is None and hasattr(model, 'count_params'):
+        nbytes = model.count_params() * 4 + KERAS_MODEL_OVERHEAD_MB * 1024 * 1024
+    if nbytes is None:
+        nbytes = os.path.getsize(path)
+    return int(nbytes)
+
+
+def _artifact_version(kind, value, path):
+    """
+    Short fingerprint of a loaded artifact. Data is hashed by content; models
+    and scalers by the stat of the file they were loaded from.
+    """
+    if kind == "data":
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(value.index.asi8.tobytes())
+        digest.update(value.to_numpy().tobytes())
+        return f"{len(value)}-{digest.hexdigest()}"
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+# A region's model, scaler and data as one consistent set, plus its fingerprint
+RegionArtifacts = namedtuple("RegionArtifacts", ["model", "scaler", "data", "fingerprint"])
+
+
+class RegionRegistry:
+    """
+    Loads per-region artifacts on first use.
+
+    Models live in an LRU bounded by memory_budget_bytes; the least recently
+    used ones are evicted when a new model pushes us over the budget. Each
+    loader is called as loader(region, config) and may raise on failure.
+    model_path_key names the config entry of the file the model loader reads.
+    """
+
+    KINDS = ("model", "scaler", "data")
+
+    def __init__(self, config, model_loader, scaler_loader, data_loader,
+                 memory_budget_bytes=MODEL_MEMORY_BUDGET_MB * 1024 * 1024, model_path_key="model_path"):
+        self.config = config
+        self._path_keys = {"model": model_path_key, "scaler": "scaler_path", "data": "data_path"}
+        self.memory_budget_bytes = memory_budget_bytes
+        self._loaders = {"model": model_loader, "scaler": scaler_loader, "data": data_loader}
+
+        self._models = OrderedDict()   # region -> (model, nbytes)
+        self._resident = {"scaler": {}, "data": {}}
+        self._lock = threading.RLock()
+        self._load_locks = {(kind, r): threading.Lock() for kind in self.KINDS for r in config}
+
+        self._stats = {kind: {"hits": 0, "misses": 0, "failures": 0, "reloads": 0, "load_seconds": 0.0}
+                       for kind in self.KINDS}
+        self._stats["model"]["evictions"] = 0
+        self._last_load_seconds = {}
+        self._versions = {}
+        self._generations = {}   # region -> number of reloads, see artifacts()
+
+    # --- Public accessors ---
+    def get_model(self, region):
+        return self._get("model", region)
+
+    def get_scaler(self, region):
+        return self._get("scaler", region)
+
+    def get_data(self, region):
+        return self._get("data", region)
+
+    def fingerprint(self, region):
+        """
+        Combined version of the region's model, scaler and data. Anything
+        derived from them (e.g. cached backtests) should be keyed on this.
+        """
+        return ":".join(self.version(kind, region) for kind in self.KINDS)
+
+    def artifacts(self, region):
+        """
+        The region's model, scaler and data and their fingerprint, all from
+        the same version: if a reload swaps any of them while we collect them,
+        we start over. Raises KeyError like the getters.
+        """
+        while True:
+            generation = self._generations.get(region, 0)
+            values = [self._get(kind, region) for kind in self.KINDS]
+            fingerprint = self.fingerprint(region)
+            if self._generations.get(region, 0) == generation:
+                return RegionArtifacts(*values, fingerprint)
+
+    def version(self, kind, region):
+        """Fingerprint of one artifact, loading it first if needed."""
+        if (kind, region) not in self._versions:
+            self._get(kind, region)
+        return self._versions[(kind, region)]
+
+    def path(self, kind, region):
+        """The file an artifact is loaded from."""
+        return self.config[region][self._path_keys[kind]]
+
+    def changed_on_disk(self, kind, region):
+        """
+        True if a loaded model or scaler no longer matches its file. Data is
+        content-hashed, callers track its CSV themselves (see csv_tail.py).
+        """
+        version = self._versions.get((kind, region))
+        if kind == "data" or version is None:
+            return False
+        try:
+            return _artifact_version(kind, None, self.path(kind, region)) != version
+        except OSError:
+            return False
+
+    def reload(self, region, kinds=KINDS, values=None):
+        """
+        Swaps in new versions of some of a region's artifacts: values[kind] if
+        given, else a fresh load from the file. Everything is loaded first and
+        then swapped in together under the lock, so artifacts() sees either all
+        old or all new ones, and callers already holding an old object finish
+        with it. Artifacts that aren't resident are not loaded, they will be
+        when next used. Returns the kinds whose version changed. If a load
+        fails nothing is swapped and the error is raised.
+        """
+        if region not in self.config:
+            raise KeyError(region)
+        values = dict(values or {})
+        kinds = [kind for kind in self.KINDS if kind in kinds]
+
+        with ExitStack() as stack:
+            for kind in kinds:
+                stack.enter_context(self._load_locks[(kind, region)])
+
+            loaded, timings = {}, {}
+            for kind in kinds:
+                path = self.path(kind, region)
+                if kind not in values and not self.is_resident(kind, region):
+                    # Data versions are content hashes, recomputed on the next load
+                    loaded[kind] = (None, None if kind == "data" else _artifact_version(kind, None, path))
+                    continue
+                # Stat before loading, so a file replaced mid-load still reads as changed
+                version = None if kind == "data" else _artifact_version(kind, None, path)
+                start = time.perf_counter()
+                if kind in values:
+                    value = values[kind]
+                else:
+                    try:
+                        value = self._loaders[kind](region, self.config[region])
+                    except Exception:
+                        with self._lock:
+                            self._stats[kind]["failures"] += 1
+                        raise
+                timings[kind] = time.perf_counter() - start
+                loaded[kind] = (value, version or _artifact_version(kind, value, path))
+
+            changed = []
+            with self._lock:
+                for kind, (value, version) in loaded.items():
+                    if self._versions.get((kind, region)) != version:
+                        changed.append(kind)
+                    if version is None:
+                        self._versions.pop((kind, region), None)
+                    else:
+                        self._versions[(kind, region)] = version
+                    if value is None:
+                        continue
+                    self._stats[kind]["reloads"] += 1
+                    self._last_load_seconds[f"{kind}:{region}"] = timings[kind]
+                    if kind == "model":
+                        self._models[region] = (value, _estimate_nbytes(value, self.path("model", region)))
+                        self._models.move_to_end(region)
+                        self._evict()
+                    else:
+                        self._resident[kind][region] = value
+                self._generations[region] = self._generations.get(region, 0) + 1
+
+        for kind, seconds in timings.items():
+            log.info("Reloaded artifact", extra={"kind": kind, "region": region, "ms": round(seconds * 1000)})
+        return changed
+
+    def is_resident(self, kind, region):
+        with self._lock:
+            return region in self._store(kind)
+
+    def stats(self):
+        with self._lock:
+            stats = {kind: dict(values) for kind, values in self._stats.items()}
+            for kind in self.KINDS:
+                lookups = stats[kind]["hits"] + stats[kind]["misses"]
+                stats[kind]["hit_rate"] = stats[kind]["hits"] / lookups if lookups else None
+            stats["model"]["resident"] = list(self._models.keys())
+            stats["model"]["resident_bytes"] = self._model_bytes()
+            stats["model"]["budget_bytes"] = int(self.memory_budget_bytes)
+            stats["last_load_seconds"] = dict(self._last_load_seconds)
+            return stats
+
+    # --- Internals ---
+    def _store(self, kind):
+        return self._models if kind == "model" else self._resident[kind]
+
+    def _model_bytes(self):
+        return sum(nbytes for _, nbytes in self._models.values())
+
+    def _lookup(self, kind, region):
+        with self._lock:
+            store = self._store(kind)
+            if region not in store:
+                return None
+            if kind == "model":
+                self._models.move_to_end(region)
+                return self._models[region][0]
+            return store[region]
+
+    def _get(self, kind, region):
+        if region not in self.config:
+            raise KeyError(region)
+
+        value = self._lookup(kind, region)
+        if value is not None:
+            with self._lock:
+                self._stats[kind]["hits"] += 1
+            return value
+
+        # Only one thread loads a given artifact; the others wait and then hit.
+        with self._load_locks[(kind, region)]:
+            value = self._lookup(kind, region)
+            if value is not None:
+                with self._lock:
+                    self._stats[kind]["hits"] += 1
+                return value
+
+            start = time.perf_counter()
+            try:
+                value = self._loaders[kind](region, self.config[region])
+            except Exception as e:
+                with self._lock:
+                    self._stats[kind]["failures"] += 1
+                log.error("Failed to load artifact", extra={"kind": kind, "region": region, "error": str(e)})
+                raise KeyError(region) from e
+            elapsed = time.perf_counter() - start
+            path = self.path(kind, region)
+            version = _artifact_version(kind, value, path)
+
+            with self._lock:
+                self._versions[(kind, region)] = version
+                self._stats[kind]["misses"] += 1
+                self._stats[kind]["load_seconds"] += elapsed
+                self._last_load_seconds[f"{kind}:{region}"] = elapsed
+                if kind == "model":
+                    nbytes = _estimate_nbytes(value, path)
+                    self._models[region] = (value, nbytes)
+                    self._evict()
+                else:
+                    self._resident[kind][region] = value
+            log.info("Loaded artifact", extra={"kind": kind, "region": region, "ms": round(elapsed * 1000)})
+            return value
+
+    def _evict(self):
+        # Always keep the most recently loaded model, even if it alone exceeds the budget
+        while len(self._models) > 1 and self._model_bytes() > self.memory_budget_bytes:
+            region, _ = self._models.popitem(last=False)
+            self._stats["model"]["evictions"] += 1
+            log.info("Evicted model", extra={"region": region, "budget_mb": round(self.memory_budget_bytes / 1e6)})
+
+
+class LazyArtifactMap(Mapping):
+    """
+    Read-only dict view over one kind of registry artifact, so existing code
+    can keep using MODELS[region] / `region in HISTORICAL_DATA`.
+    Membership loads the artifact if needed and is False if loading fails.
+    """
+
+    def __init__(self, registry, kind):
+        self._registry = registry
+        self._kind = kind
+
+    def __getitem__(self, region):
+        return self._registry._get(self._kind, region)
+
+    def __contains__(self, region):
+        try:
+            self[region]
+            return True
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        return iter(self._registry.config)
+
+    def __len__(self):
+        return len(self._registry.config)
+
+    def items(self):
+        # Skips regions whose artifacts fail to load, like the old eager dicts did
+        for region in self._registry.config:
+            try:
+                yield region, self[region]
+            except KeyError:
+                continue
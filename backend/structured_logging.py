@@ -0,0 +1,94 @@
+# backend/structured_logging.py
+
+import os
+import sys
+import json
+import random
+import logging
+from datetime import datetime, timezone
+
+# --- Structured logging ---
+# The services log through get_logger(__name__) instead of print(). Every
+# line is one JSON object (LOG_FORMAT=text gives "key=value" lines for a
+# terminal) carrying the fields passed as extra={...}.
+#
+# Each HTTP request produces one log line with its stage timings (app.py).
+# Those are sampled: only LOG_SAMPLE_RATE of ordinary requests are logged,
+# while errors and requests slower than LOG_SLOW_MS always are. Warnings and
+# errors logged by the services are never sampled.
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()   # "json" or "text"
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+LOG_SLOW_MS = float(os.getenv("LOG_SLOW_MS", "1000"))
+
+ROOT_LOGGER = "pepper"
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def _extra_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+def _timestamp(record):
+    return datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": _timestamp(record),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        fields = " ".join(
+            f"{key}={json.dumps(value, default=str, ensure_ascii=False)}"
+            for key, value in _extra_fields(record).items()
+        )
+        line = f"{_timestamp(record)} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        if fields:
+            line += " " + fields
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def _configure():
+    root = logging.getLogger(ROOT_LOGGER)
+    if root.handlers:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+
+
+_configure()
+
+
+def get_logger(name):
+    """Logger for a backend module, e.g. get_logger(__name__)."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def sample_request_log(status, duration_ms):
+    """
+    The rate a request's log line is kept at, or None to drop it. Errors and
+    slow requests are always kept (1.0); the rest at LOG_SAMPLE_RATE.
+    """
+    if status >= 500 or duration_ms >= LOG_SLOW_MS:
+        return 1.0
+    if LOG_SAMPLE_RATE >= 1 or random.random() < LOG_SAMPLE_RATE:
+        return LOG_SAMPLE_RATE
+    return None
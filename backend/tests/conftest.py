@@ -0,0 +1,62 @@
+# backend/tests/conftest.py
+#
+#   cd backend && python -m pytest -q
+#
+# The services read their configuration from the environment at import time,
+# so it is set here before any test module imports them: the fake Gemini
+# model, the NumPy inference backend, no background threads, and a copy of
+# regions.json whose models point at small untrained LSTMs built by the
+# lstm_models fixture (the shipped .h5 files are Git LFS pointers in a plain
+# checkout). Scalers and price data are the real ones.
+
+import os
+import sys
+import json
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+TEST_MODELS_DIR = tempfile.mkdtemp(prefix="pepper-tests-")
+
+with open(os.path.join(BACKEND_DIR, "regions.json")) as f:
+    _config = json.load(f)
+for _entry in _config["regions"]:
+    _entry["model"] = os.path.join(TEST_MODELS_DIR, f"{_entry['name']}_lstm.h5")
+with open(os.path.join(TEST_MODELS_DIR, "regions.json"), "w") as f:
+    json.dump(_config, f)
+
+for _key, _value in {
+    "REGIONS_CONFIG": os.path.join(TEST_MODELS_DIR, "regions.json"),
+    "INFERENCE_BACKEND": "numpy",
+    "GEMINI_BACKEND": "fake",
+    "GEMINI_FAKE_LATENCY_MS": "0",
+    "FORECAST_SCHEDULER": "0",
+    "HOT_RELOAD": "0",
+    "WARMUP": "0",
+    "LOG_LEVEL": "WARNING",
+    "TF_CPP_MIN_LOG_LEVEL": "3",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+
+def is_lfs_pointer(path):
+    with open(path, "rb") as f:
+        return f.read(64).startswith(b"version https://git-lfs")
+
+
+@pytest.fixture(scope="session")
+def lstm_models():
+    """Writes an untrained model per region into TEST_MODELS_DIR; returns {region: path}."""
+    from train_models import build_lstm_model
+    from prediction_service import regions, features, WINDOW_SIZE
+
+    paths = {}
+    for region in regions:
+        path = paths[region] = os.path.join(TEST_MODELS_DIR, f"{region}_lstm.h5")
+        if not os.path.exists(path):
+            build_lstm_model((WINDOW_SIZE, len(features))).save(path)
+    return paths
@@ -0,0 +1,83 @@
+# backend/tests/test_backtest.py
+
+import numpy as np
+import pytest
+
+import prediction_service
+from prediction_service import (
+    REGISTRY, WINDOW_SIZE, backtest_model, get_full_backtest, multistep_backtest_model, _multistep_backtest,
+)
+
+REGION = "sirsi"
+
+
+@pytest.fixture(autouse=True)
+def models(lstm_models):
+    return lstm_models
+
+
+@pytest.fixture
+def original_data():
+    data = REGISTRY.get_data(REGION)
+    yield data
+    REGISTRY.reload(REGION, ["data"], values={"data": data})
+
+
+def test_full_backtest_is_computed_once_per_fingerprint(monkeypatch, original_data):
+    computed = []
+    full_backtest = prediction_service._full_backtest
+
+    def counting(model, scaler, data_df):
+        computed.append(len(data_df))
+        return full_backtest(model, scaler, data_df)
+
+    monkeypatch.setattr(prediction_service, "_full_backtest", counting)
+    prediction_service.drop_derived(REGION)
+
+    (fingerprint, results), _ = get_full_backtest(REGION)
+    (again, cached), _ = get_full_backtest(REGION)
+    assert computed == [len(original_data)]
+    assert again == fingerprint and cached is results
+
+    # Any window is a slice of the stored result
+    assert backtest_model(REGION, 30)[0] == results[-30:]
+    assert computed == [len(original_data)]
+
+    # New data changes the fingerprint, so the next call recomputes
+    REGISTRY.reload(REGION, ["data"], values={"data": original_data.iloc[:-10]})
+    (changed, shorter), _ = get_full_backtest(REGION)
+    assert changed != fingerprint
+    assert computed == [len(original_data), len(original_data) - 10]
+    assert [row["date"] for row in shorter] == [row["date"] for row in results[:-10]]
+
+
+def test_one_day_horizon_matches_the_one_step_backtest():
+    one_step, _ = backtest_model(REGION, 200)
+    multistep, error = multistep_backtest_model(REGION, 200, horizon=1)
+
+    assert error is None
+    assert [row["date"] for row in multistep["series"]] == [row["date"] for row in one_step]
+    np.testing.assert_allclose([row["predicted"][0] for row in multistep["series"]],
+                               [row["predicted"] for row in one_step], rtol=1e-6)
+    assert [row["actual"] for row in multistep["series"]] == [row["actual"] for row in one_step]
+
+
+def test_forecasts_never_see_later_prices():
+    model, scaler, data, _ = REGISTRY.artifacts(REGION)
+    data = data.iloc[-200:]
+    horizon, cutoff = 5, 150
+    dates, _, predicted = _multistep_backtest(model, scaler, data, horizon)
+
+    # Prices from the cutoff row on change; the weather stays as observed
+    changed = data.copy()
+    changed.iloc[cutoff:, changed.columns.get_loc("Price")] *= 1.5
+    changed_dates, _, changed_predicted = _multistep_backtest(model, scaler, changed, horizon)
+    assert list(changed_dates) == list(dates)
+
+    # predicted[i, k] targets row WINDOW_SIZE + horizon - 1 + i and was made
+    # from the origin k days earlier, which only sees rows before it
+    targets = np.arange(WINDOW_SIZE + horizon - 1, len(data))
+    for k in range(horizon):
+        before = targets - k <= cutoff
+        np.testing.assert_allclose(changed_predicted[before, k], predicted[before, k], rtol=1e-9)
+        assert not np.allclose(changed_predicted[~before, k], predicted[~before, k])
@@ -0,0 +1,81 @@
+# backend/tests/test_chat_retrieval.py
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from chat_retrieval import PriceIndex, _fast_parse, _normalize, parse_range
+
+TODAY = date(2024, 6, 15)
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("price on 2024-03-03", date(2024, 3, 3)),
+    ("price on 2024/3/3?", date(2024, 3, 3)),
+    ("rate on 03/04/2024", date(2024, 4, 3)),          # day first
+    ("rate on 3.4.2024", date(2024, 4, 3)),
+    ("What was it on 3rd March 2024?", date(2024, 3, 3)),
+    ("on the 3rd of march, 2024", date(2024, 3, 3)),
+    ("on March 3rd, 2024", date(2024, 3, 3)),
+    ("price on March 3", date(2024, 3, 3)),
+    ("price on 3 mar", date(2024, 3, 3)),
+    ("price on December 25", date(2023, 12, 25)),       # year-less dates are in the past
+    ("price on may 3?", date(2024, 5, 3)),
+    ("may 3rd price in sirsi", date(2024, 5, 3)),
+    ("price yesterday", date(2024, 6, 14)),
+    ("price the day before yesterday", date(2024, 6, 13)),
+    ("price today", TODAY),
+    ("price 2 weeks ago", date(2024, 6, 1)),
+    ("price a week ago", date(2024, 6, 8)),
+    ("price 10 days ago", date(2024, 6, 5)),
+    ("rate on 31/02/2024", None),
+    ("what may 3 days of rain do to the price", None),
+    ("what is the price in sirsi", None),
+])
+def test_fast_parse(message, expected):
+    assert _fast_parse(_normalize(message), TODAY) == expected
+
+
+@pytest.fixture
+def index():
+    # Out of order, with a gap on Jan 2 and two records for Jan 10
+    dates = ["2024-01-03", "2024-01-01", "2024-01-10", "2024-01-10", "2024-01-20"]
+    df = pd.DataFrame({"Price": [103.0, 101.0, 110.0, 999.0, 120.0]}, index=pd.to_datetime(dates))
+    return PriceIndex("v1", df)
+
+
+@pytest.mark.parametrize("day, expected", [
+    (date(2024, 1, 1), (date(2024, 1, 1), 101.0, True)),
+    (date(2024, 1, 2), (date(2024, 1, 3), 103.0, False)),     # tie: the later record wins
+    (date(2024, 1, 6), (date(2024, 1, 3), 103.0, False)),
+    (date(2024, 1, 7), (date(2024, 1, 10), 110.0, False)),
+    (date(2024, 1, 10), (date(2024, 1, 10), 110.0, True)),     # first record of a duplicated date
+    (date(2024, 1, 27), (date(2024, 1, 20), 120.0, False)),
+    (date(2024, 1, 28), None),                                 # 8 days from the nearest
+    (date(2023, 12, 24), None),
+])
+def test_lookup_nearest_within_a_week(index, day, expected):
+    assert index.lookup(day) == expected
+
+
+def test_duplicate_dates_are_collapsed(index):
+    assert [str(d) for d in index.days] == ["2024-01-01", "2024-01-03", "2024-01-10", "2024-01-20"]
+    assert index.range_stats(date(2024, 1, 1), date(2024, 1, 31))["count"] == 4
+
+
+@pytest.mark.parametrize("message, today, expected", [
+    ("average price last month", date(2024, 3, 15), (date(2024, 2, 1), date(2024, 2, 29), "February 2024", "mean")),
+    ("average price last month", date(2024, 1, 10), (date(2023, 12, 1), date(2023, 12, 31), "December 2023", "mean")),
+    ("avg rate this month", date(2024, 3, 15), (date(2024, 3, 1), date(2024, 3, 15), "March 2024", "mean")),
+    ("highest price in feb 2023", TODAY, (date(2023, 2, 1), date(2023, 2, 28), "February 2023", "max")),
+    ("lowest price in December 2023", TODAY, (date(2023, 12, 1), date(2023, 12, 31), "December 2023", "min")),
+    ("lowest price last year", TODAY, (date(2023, 1, 1), date(2023, 12, 31), "2023", "min")),
+    ("max price this year", TODAY, (date(2024, 1, 1), TODAY, "2024", "max")),
+    ("mean price in 2022", TODAY, (date(2022, 1, 1), date(2022, 12, 31), "2022", "mean")),
+    ("average price over the last 30 days", TODAY, (date(2024, 5, 16), TODAY, "the last 30 days", "mean")),
+    ("price in march 2024", TODAY, None),
+    ("average price", TODAY, None),
+])
+def test_parse_range(message, today, expected):
+    assert parse_range(message, today) == expected
@@ -0,0 +1,74 @@
+# backend/tests/test_csv_tail.py
+
+import pytest
+
+from csv_tail import CsvTail, CsvRewritten
+
+HEADER = "Date,Region,Max_Temp,Min_Temp,Rainfall,Price\n"
+
+
+def _row(day, price):
+    return f"2024-01-{day:02d},Sirsi,28.0,19.0,0,{price}\n"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "sirsi_merged.csv"
+    path.write_text(HEADER + "".join(_row(day, 60000 + day) for day in range(1, 11)))
+    return path
+
+
+def _append(path, text):
+    with open(path, "a") as f:
+        f.write(text)
+
+
+def test_unchanged_file(csv_path):
+    assert CsvTail.mark(csv_path).status() == "unchanged"
+
+
+def test_appended_rows_are_read_alone(csv_path):
+    tail = CsvTail.mark(csv_path)
+    _append(csv_path, _row(11, 60011) + _row(12, 60012))
+
+    assert tail.status() == "appended"
+    rows, tail = tail.read_appended()
+    assert [str(d.date()) for d in rows.index] == ["2024-01-11", "2024-01-12"]
+    assert rows["Price"].tolist() == [60011, 60012]
+    assert tail.status() == "unchanged"
+
+
+def test_partial_last_line_waits_for_the_next_read(csv_path):
+    tail = CsvTail.mark(csv_path)
+    _append(csv_path, _row(11, 60011) + "2024-01-12,Sir")
+
+    rows, tail = tail.read_appended()
+    assert rows["Price"].tolist() == [60011]
+
+    _append(csv_path, "si,28.0,19.0,0,60012\n")
+    rows, tail = tail.read_appended()
+    assert rows["Price"].tolist() == [60012]
+
+
+def test_in_place_edit_is_a_rewrite(csv_path):
+    tail = CsvTail.mark(csv_path)
+    text = csv_path.read_text()
+    csv_path.write_text(text.replace("60010", "60099"))   # same size
+
+    assert tail.status() == "rewritten"
+
+
+def test_edit_before_the_offset_is_caught_on_read(csv_path):
+    tail = CsvTail.mark(csv_path)
+    text = csv_path.read_text()
+    csv_path.write_text(text.replace("60010", "60099") + _row(11, 60011))
+
+    assert tail.status() == "appended"    # stat alone can't tell
+    with pytest.raises(CsvRewritten):
+        tail.read_appended()
+
+
+def test_truncated_file_is_a_rewrite(csv_path):
+    tail = CsvTail.mark(csv_path)
+    csv_path.write_text(HEADER + _row(1, 60001))
+    assert tail.status() == "rewritten"
@@ -0,0 +1,40 @@
+# backend/tests/test_dashboard.py
+
+import pytest
+
+from hot_reload import reload_region
+
+
+@pytest.fixture(scope="module")
+def client(lstm_models):
+    from app import app
+    return app.test_client()
+
+
+def _etag(client, **headers):
+    response = client.get("/dashboard?performance_region=sirsi&table_region=sirsi", headers=headers)
+    assert response.status_code in (200, 304)
+    return response.status_code, response.headers["ETag"]
+
+
+def test_unchanged_dashboard_revalidates(client):
+    _, etag = _etag(client)
+    assert _etag(client, **{"If-None-Match": etag}) == (304, etag)
+    # Nothing changed on disk, so a reload must not invalidate it either
+    reload_region("sirsi", kinds=["model", "scaler"], force=True)
+    assert _etag(client, **{"If-None-Match": etag}) == (304, etag)
+
+
+def test_etag_changes_after_model_reload(client, lstm_models):
+    from train_models import build_lstm_model
+    from prediction_service import features, WINDOW_SIZE
+
+    _, before = _etag(client)
+    # A retrained model lands on disk, then the hot reloader picks it up
+    path = lstm_models["sirsi"]
+    build_lstm_model((WINDOW_SIZE, len(features))).save(path)
+    assert reload_region("sirsi") == {"model": {"status": "reloaded"}}
+
+    status, after = _etag(client, **{"If-None-Match": before})
+    assert status == 200
+    assert after != before
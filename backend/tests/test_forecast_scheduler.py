@@ -0,0 +1,153 @@
+# backend/tests/test_forecast_scheduler.py
+
+import time
+import threading
+
+import pytest
+
+import forecast_scheduler
+from forecast_scheduler import ForecastScheduler, get_trajectories
+from prediction_service import REGISTRY, regions
+from stubs import StubAccuWeatherServer
+from upstream import Upstream
+from weather_service import AccuWeatherClient, LOCATION_KEYS
+
+
+@pytest.fixture
+def stub(lstm_models):
+    with StubAccuWeatherServer() as server:
+        yield server
+
+
+@pytest.fixture
+def scheduler(stub):
+    client = AccuWeatherClient("test-key", forecast_url=stub.forecast_url,
+                               upstream=Upstream("test-weather", max_concurrency=4, deadline=5))
+    return ForecastScheduler(regions, interval=3600, max_age=60, weather_client=client)
+
+
+def _first_day(scheduler, region):
+    return scheduler.current(region).trajectory[0]["date"]
+
+
+def test_refresh_materializes_every_region(stub, scheduler):
+    assert scheduler.refresh() == {}
+
+    for region in regions:
+        target = _first_day(scheduler, region)
+        price, computed_at = scheduler.lookup(region, target)
+        assert isinstance(price, float) and computed_at
+    assert scheduler.lookup("sirsi", "1999-01-01") is None
+    assert all(stub.hits[key] == 1 for key in LOCATION_KEYS.values())
+    assert scheduler.stats()["refreshes"] == len(regions)
+
+
+def test_trajectories_come_from_the_materialized_forecast(scheduler):
+    results, errors, _ = get_trajectories(["sirsi"], scheduler=scheduler)
+    assert errors == {} and results["sirsi"]["source"] == "on_demand"
+
+    scheduler.refresh(["sirsi"])
+    results, _, _ = get_trajectories(["sirsi"], scheduler=scheduler)
+    assert results["sirsi"]["source"] == "materialized"
+    assert results["sirsi"]["trajectory"] == scheduler.current("sirsi").trajectory
+
+
+def test_stale_forecasts_fall_back_to_on_demand(scheduler):
+    scheduler.max_age = 0.05
+    scheduler.refresh(["sirsi"])
+    target = _first_day(scheduler, "sirsi")
+
+    time.sleep(0.1)
+    assert scheduler.lookup("sirsi", target) is None
+    results, _, _ = get_trajectories(["sirsi"], scheduler=scheduler)
+    assert results["sirsi"]["source"] == "on_demand"
+
+
+def test_changed_artifacts_fall_back_to_on_demand(scheduler):
+    scheduler.refresh(["sirsi"])
+    data = REGISTRY.get_data("sirsi")
+    try:
+        REGISTRY.reload("sirsi", ["data"], values={"data": data.iloc[:-1]})
+        assert scheduler.current("sirsi") is None
+        results, _, _ = get_trajectories(["sirsi"], scheduler=scheduler)
+        assert results["sirsi"]["source"] == "on_demand"
+    finally:
+        REGISTRY.reload("sirsi", ["data"], values={"data": data})
+
+
+def test_failed_refresh_keeps_the_previous_forecast(monkeypatch, scheduler):
+    scheduler.refresh(["sirsi"])
+    previous = scheduler.current("sirsi")
+
+    monkeypatch.setattr(forecast_scheduler, "make_trajectories", lambda forecasts: ({}, {"sirsi": "boom"}))
+    assert scheduler.refresh(["sirsi"]) == {"sirsi": "boom"}
+    assert scheduler.current("sirsi") is previous
+    assert scheduler.stats()["errors"] == {"sirsi": "boom"}
+
+
+def test_loop_survives_a_failing_refresh(monkeypatch, scheduler):
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        scheduler.stop()
+        return {}
+
+    monkeypatch.setattr(scheduler, "refresh", refresh)
+    scheduler.interval = 0.01
+    thread = threading.Thread(target=scheduler._run, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive() and len(calls) == 2
+
+
+@pytest.fixture
+def app_scheduler(monkeypatch, stub):
+    from app import SCHEDULER
+    monkeypatch.setattr(SCHEDULER, "_forecasts", {})
+    return SCHEDULER
+
+
+def _post_trajectory(regions_requested):
+    from app import app
+    return app.test_client().post("/predict-trajectory", json={"regions": regions_requested})
+
+
+def test_trajectory_endpoint_asks_to_retry_when_accuweather_is_down(monkeypatch, stub, app_scheduler):
+    stub.delay = 1.0
+    client = AccuWeatherClient("test-key", forecast_url=stub.forecast_url,
+                               upstream=Upstream("test-weather", max_concurrency=4, deadline=0.1))
+    monkeypatch.setattr(app_scheduler, "weather_client", client)
+
+    response = _post_trajectory(["sirsi", "madikeri"])
+    assert response.status_code == 503
+    assert response.get_json()["retryable"] is True
+    assert set(response.get_json()["errors"]) == {"sirsi", "madikeri"}
+
+
+def test_trajectory_endpoint_rejects_what_retrying_cannot_fix(monkeypatch, stub, app_scheduler):
+    monkeypatch.setattr(app_scheduler, "weather_client", AccuWeatherClient(None, forecast_url=stub.forecast_url))
+
+    response = _post_trajectory(["sirsi"])
+    assert response.status_code == 400
+    assert "retryable" not in response.get_json()
+
+
+def test_one_failing_region_does_not_fail_the_others(monkeypatch, scheduler):
+    import prediction_service
+
+    inference_model = prediction_service._inference_model
+
+    def broken_for_sirsi(region, model):
+        if region == "sirsi":
+            raise RuntimeError("boom")
+        return inference_model(region, model)
+
+    monkeypatch.setattr(prediction_service, "_inference_model", broken_for_sirsi)
+    results, errors, retryable = get_trajectories(["sirsi", "madikeri"], scheduler=scheduler)
+
+    assert list(results) == ["madikeri"]
+    assert errors == {"sirsi": "Prediction error: boom"} and retryable == set()
@@ -0,0 +1,98 @@
+# backend/tests/test_gemini_service.py
+
+import time
+import uuid
+
+import pytest
+
+import gemini_service
+from gemini_service import ConversationSession, SessionStore, ResponseCache, RESPONSE_CACHE, _estimate_tokens
+
+
+def test_history_is_trimmed_to_the_token_budget():
+    session = ConversationSession("c1")
+    turn_tokens = 2 * _estimate_tokens("x" * 40)
+    for turn in range(5):
+        session.record(f"q{turn}".ljust(40), f"a{turn}".ljust(40), max_turns=100, max_tokens=2 * turn_tokens + 1)
+
+    assert [m["parts"][0].strip() for m in session.history] == ["q3", "a3", "q4", "a4"]
+    assert session.tokens == sum(_estimate_tokens(m["parts"][0]) for m in session.history)
+
+
+def test_history_is_trimmed_to_the_turn_cap():
+    session = ConversationSession("c1")
+    for turn in range(5):
+        session.record(f"q{turn}", f"a{turn}", max_turns=2, max_tokens=10_000)
+
+    assert [m["role"] for m in session.history] == ["user", "model", "user", "model"]
+    assert session.contents_for("next")[0]["parts"] == ["q3"]
+    assert session.contents_for("next")[-1] == {"role": "user", "parts": ["next"]}
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStore(max_sessions=2, ttl=60)
+    a, b = store.get("a"), store.get("b")
+    store.get("a")    # a is now more recent than b
+    store.get("c")
+
+    assert store.get("a") is a
+    assert store.get("b") is not b
+    assert store.stats()["evictions"] >= 1
+
+
+def test_idle_session_expires():
+    store = SessionStore(max_sessions=10, ttl=0.05)
+    session = store.get("a")
+    session.record("hello", "hi")
+    assert store.get("a") is session
+
+    time.sleep(0.1)
+    fresh = store.get("a")
+    assert fresh is not session and fresh.history == []
+
+
+@pytest.fixture
+def response_cache():
+    RESPONSE_CACHE.clear()
+    yield RESPONSE_CACHE
+    RESPONSE_CACHE.clear()
+
+
+def _conversation():
+    return uuid.uuid4().hex
+
+
+def test_prompts_normalize_to_one_key():
+    assert ResponseCache.normalize("  What is the PRICE\tin Sirsi?? ") == ResponseCache.normalize("what is the price in sirsi")
+
+
+def test_first_turns_share_a_cached_reply(response_cache):
+    model = gemini_service.model
+    first = gemini_service.get_ai_response("What is the price in Sirsi?", _conversation())
+    calls = model.calls
+    second = gemini_service.get_ai_response("what is the price in sirsi", _conversation())
+
+    assert second == first
+    assert model.calls == calls
+
+
+def test_later_turns_bypass_the_cache(response_cache):
+    model = gemini_service.model
+    conversation = _conversation()
+    gemini_service.get_ai_response("What is the price in Sirsi?", conversation)
+    calls = model.calls
+    followup = gemini_service.get_ai_response("What is the price in Sirsi?", conversation)
+
+    # Answered by the model, with the first turn as context
+    assert model.calls == calls + 1
+    assert followup.startswith("PepperBot (offline) received 3 message(s)")
+
+
+def test_use_cache_false_skips_the_cache(response_cache):
+    model = gemini_service.model
+    gemini_service.get_ai_response("Hello", _conversation())
+    calls, bypassed = model.calls, response_cache.bypassed
+    gemini_service.get_ai_response("Hello", _conversation(), use_cache=False)
+
+    assert model.calls == calls + 1
+    assert response_cache.bypassed == bypassed + 1
@@ -0,0 +1,47 @@
+# backend/tests/test_history_service.py
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from history_service import HistorySnapshot, MIN_PYRAMID_POINTS, get_history_window
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    dates = pd.date_range("2015-01-01", periods=3000, freq="D")
+    prices = 60000 + 5000 * np.sin(np.arange(3000) / 50) + np.random.default_rng(0).normal(0, 300, 3000)
+    return HistorySnapshot("v1", pd.DataFrame({"Price": prices}, index=dates))
+
+
+@pytest.mark.parametrize("max_points", [3, 10, MIN_PYRAMID_POINTS - 1, 100, 500, 2999])
+@pytest.mark.parametrize("days", [200, 1000, 3000])
+def test_max_points_is_a_hard_limit(snapshot, days, max_points):
+    lo, hi = snapshot.window(days=days)
+    _, rows = snapshot.select(lo, hi, max_points=max_points)
+
+    assert 0 < len(rows) <= max_points
+    dates = [json.loads(row)["Date"] for row in rows]
+    assert dates == sorted(dates)
+
+
+def test_window_below_every_pyramid_level_keeps_its_ends(snapshot):
+    lo, hi = snapshot.window(days=3000)
+    key, rows = snapshot.select(lo, hi, max_points=10)
+
+    assert key == ("lttb", "adhoc", lo, hi, 10)
+    assert rows[0] == snapshot.daily.rows[lo] and rows[-1] == snapshot.daily.rows[hi - 1]
+
+
+def test_keys_differ_per_max_points(snapshot):
+    lo, hi = snapshot.window(days=3000)
+    keys = {snapshot.select(lo, hi, max_points=n)[0] for n in (5, 10, 20)}
+    assert len(keys) == 3
+
+
+def test_long_window_on_region_data():
+    (etag, rows), error = get_history_window("sirsi", days=3000, max_points=10)
+    assert error is None
+    assert len(rows) <= 10
@@ -0,0 +1,74 @@
+# backend/tests/test_hot_reload.py
+
+import shutil
+from datetime import timedelta
+
+import pytest
+
+from chat_retrieval import get_price_index
+from dashboard_service import build_dashboard
+from forecast_scheduler import ForecastScheduler
+from history_service import get_snapshot, get_history_window
+from hot_reload import RELOADER
+from prediction_service import REGISTRY
+from stubs import StubAccuWeatherServer
+from upstream import Upstream
+from weather_service import AccuWeatherClient
+
+REGION = "sirsi"
+
+
+@pytest.fixture
+def region_csv(tmp_path, monkeypatch, lstm_models):
+    """The region's data, loaded from a copy of its CSV the test can append to."""
+    config = REGISTRY.config[REGION]
+    path = tmp_path / "sirsi_merged.csv"
+    shutil.copy(config["data_path"], path)
+    monkeypatch.setitem(config, "data_path", str(path))
+    monkeypatch.setitem(config, "columnar_prefix", str(tmp_path / "columnar" / REGION))
+    REGISTRY.reload(REGION, ["data"])
+    yield path
+    monkeypatch.undo()
+    REGISTRY.reload(REGION, ["data"])
+
+
+@pytest.fixture
+def scheduler():
+    with StubAccuWeatherServer() as stub:
+        client = AccuWeatherClient("test-key", forecast_url=stub.forecast_url,
+                                   upstream=Upstream("test-weather", max_concurrency=4, deadline=5))
+        yield ForecastScheduler([REGION], weather_client=client)
+
+
+def test_appended_rows_invalidate_everything_derived(region_csv, scheduler):
+    scheduler.refresh()
+    data = REGISTRY.get_data(REGION)
+    fingerprint = REGISTRY.fingerprint(REGION)
+    snapshot, index = get_snapshot(REGION), get_price_index(REGION)
+    (etag, _), _ = get_history_window(REGION, days=30)
+    (dashboard_etag, _, _), _ = build_dashboard(REGION, REGION)
+    assert RELOADER.check([REGION], settle=0) == {}
+
+    new_day = data.index[-1] + timedelta(days=1)
+    with open(region_csv, "a") as f:
+        f.write(f"{new_day:%Y-%m-%d},Sirsi,28.0,19.0,0,99999\n")
+    assert RELOADER.check([REGION], settle=0) == {REGION: {"data": {"status": "appended", "rows": 1}}}
+
+    assert len(REGISTRY.get_data(REGION)) == len(data) + 1
+    assert REGISTRY.fingerprint(REGION) != fingerprint
+    assert scheduler.current(REGION) is None
+    assert get_snapshot(REGION) is not snapshot
+    assert get_price_index(REGION).latest() == (new_day.date(), 99999.0)
+    assert index.latest() != get_price_index(REGION).latest()
+    (new_etag, rows), _ = get_history_window(REGION, days=30)
+    assert new_etag != etag and rows[-1].endswith(b'"Price":99999.0}')
+    assert build_dashboard(REGION, REGION)[0][0] != dashboard_etag
+
+
+def test_rewritten_csv_is_reloaded_in_full(region_csv):
+    data = REGISTRY.get_data(REGION)
+    lines = region_csv.read_text().splitlines(keepends=True)
+    region_csv.write_text("".join(lines[:-5]))
+
+    assert RELOADER.check([REGION], settle=0) == {REGION: {"data": {"status": "reloaded", "rows": -5}}}
+    assert len(REGISTRY.get_data(REGION)) == len(data) - 5
@@ -0,0 +1,63 @@
+# backend/tests/test_inference_batching.py
+
+import threading
+
+import numpy as np
+import pytest
+
+from inference_batching import MicroBatcher, BatchedModel
+from numpy_lstm import load_numpy_model
+from prediction_service import features, WINDOW_SIZE
+
+
+@pytest.fixture(scope="module")
+def model(lstm_models):
+    return load_numpy_model(lstm_models["sirsi"])
+
+
+def _windows(n, seed):
+    return np.random.default_rng(seed).random((n, WINDOW_SIZE, len(features)), dtype=np.float32)
+
+
+def test_batched_results_match_unbatched(model):
+    batcher = MicroBatcher("test", max_batch_size=64, max_wait=0.05)
+    inputs = [_windows(1 + i % 3, seed=i) for i in range(8)]
+    results = [None] * len(inputs)
+    barrier = threading.Barrier(len(inputs))
+
+    def call(i):
+        barrier.wait()
+        results[i] = BatchedModel(model, batcher).predict(inputs[i], verbose=0)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(inputs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for x, result in zip(inputs, results):
+        np.testing.assert_allclose(result, model.predict(x, verbose=0), atol=1e-5)
+    stats = batcher.stats()
+    assert stats["requests"] == len(inputs)
+    assert stats["batches"] < len(inputs)
+    assert stats["windows"] == sum(len(x) for x in inputs)
+
+
+def test_large_inputs_bypass_the_queue(model):
+    batcher = MicroBatcher("test", max_batch_size=4, max_wait=0.05)
+    x = _windows(4, seed=0)
+
+    np.testing.assert_allclose(batcher.predict(model, x), model.predict(x, verbose=0), atol=1e-5)
+    assert batcher.stats()["bypassed"] == 1
+    assert batcher.stats()["batches"] == 0
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    class Broken:
+        def predict(self, x, verbose=0, batch_size=None):
+            raise RuntimeError("boom")
+
+    batcher = MicroBatcher("test", max_batch_size=64, max_wait=0.001)
+    with pytest.raises(RuntimeError, match="boom"):
+        batcher.predict(Broken(), _windows(1, seed=0))
+    assert batcher.stats()["requests"] == 1
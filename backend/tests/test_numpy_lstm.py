@@ -0,0 +1,27 @@
+# backend/tests/test_numpy_lstm.py
+
+import os
+import glob
+
+import pytest
+
+from conftest import BACKEND_DIR, is_lfs_pointer
+from numpy_lstm import check_parity
+
+# Same bound as python backend/numpy_lstm.py
+TOLERANCE = 1e-4
+
+SHIPPED_MODELS = sorted(glob.glob(os.path.join(BACKEND_DIR, "..", "models", "*_lstm.h5")))
+
+
+@pytest.mark.parametrize("model_path", SHIPPED_MODELS, ids=os.path.basename)
+def test_shipped_model_parity(model_path):
+    if is_lfs_pointer(model_path):
+        pytest.skip("Git LFS pointer; run git lfs pull to test the shipped models")
+    assert check_parity(model_path) < TOLERANCE
+
+
+def test_parity_on_training_architecture(lstm_models):
+    # Runs everywhere, LFS or not: the architecture train_models.py produces
+    for path in lstm_models.values():
+        assert check_parity(path) < TOLERANCE
@@ -0,0 +1,63 @@
+# backend/tests/test_prediction_service.py
+
+import numpy as np
+import pytest
+
+import prediction_service
+from prediction_service import make_prediction, make_scenario_prediction, perturb_weather
+
+FORECASTS = [
+    {"Date": f"2030-01-0{day}", "Max_Temp": 28.0 + day, "Min_Temp": 19.0, "Rainfall": 2.5 * (day % 3)}
+    for day in range(1, 6)
+]
+
+
+@pytest.fixture(autouse=True)
+def models(lstm_models):
+    return lstm_models
+
+
+def test_fixed_seed_is_reproducible():
+    first, error = make_scenario_prediction("sirsi", FORECASTS, n_scenarios=50, seed=7)
+    assert error is None
+    second, _ = make_scenario_prediction("sirsi", FORECASTS, n_scenarios=50, seed=7)
+    other, _ = make_scenario_prediction("sirsi", FORECASTS, n_scenarios=50, seed=8)
+
+    assert first == second
+    assert first["n_scenarios"] == 50
+    assert other != first
+
+
+def test_single_noiseless_scenario_matches_make_prediction():
+    noiseless = perturb_weather(FORECASTS, 1, temp_std=0.0, rain_sigma=0.0, rain_std=0.0)
+    scenario = [dict(zip(("Max_Temp", "Min_Temp", "Rainfall"), day)) for day in noiseless[0]]
+
+    result, error = make_scenario_prediction("sirsi", scenarios=[scenario], percentiles=[50])
+    expected, _ = make_prediction("sirsi", FORECASTS)
+
+    assert error is None and result["n_scenarios"] == 1
+    assert result["mean"] == pytest.approx(expected, rel=1e-6)
+    assert result["percentiles"]["p50"] == pytest.approx(expected, rel=1e-6)
+
+
+def test_inference_failure_is_returned_as_an_error(monkeypatch):
+    class Broken:
+        def predict(self, x, verbose=0, batch_size=None):
+            raise ValueError("shape mismatch")
+
+    monkeypatch.setattr(prediction_service, "_inference_model", lambda region, model: Broken())
+
+    result, error = make_scenario_prediction("sirsi", FORECASTS, n_scenarios=10, seed=1)
+    assert result is None and error == "Error during prediction: shape mismatch"
+    assert make_prediction("sirsi", FORECASTS) == (None, "Error during prediction: shape mismatch")
+
+
+@pytest.mark.parametrize("seed", ["abc", 1.5, -1, True])
+def test_invalid_seed_is_rejected(seed):
+    from app import app
+
+    response = app.test_client().post("/predict-scenarios", json={
+        "region": "sirsi", "scenarios": [FORECASTS], "seed": seed,
+    })
+    assert response.status_code == 400
+    assert "'seed'" in response.get_json()["error"]
@@ -0,0 +1,106 @@
+# backend/tests/test_region_registry.py
+
+import os
+
+import pandas as pd
+import pytest
+
+from region_registry import RegionRegistry, LazyArtifactMap, KERAS_MODEL_OVERHEAD_MB, _estimate_nbytes
+
+REGIONS = ("a", "b", "c")
+MODEL_BYTES = 100
+
+
+class FakeModel:
+    def __init__(self, region, nbytes=MODEL_BYTES):
+        self.region = region
+        self.nbytes = nbytes
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = {}
+    for region in REGIONS:
+        paths = {}
+        for kind in ("model", "scaler", "data"):
+            path = paths[f"{kind}_path"] = str(tmp_path / f"{region}.{kind}")
+            with open(path, "w") as f:
+                f.write("v1")
+        config[region] = paths
+    return config
+
+
+def _registry(config, budget=250, loads=None):
+    loads = [] if loads is None else loads
+
+    def load_model(region, cfg):
+        loads.append(region)
+        return FakeModel(region)
+
+    def load_data(region, cfg):
+        return pd.DataFrame({"Price": [1.0, 2.0]}, index=pd.to_datetime(["2024-01-01", "2024-01-02"]))
+
+    return RegionRegistry(config, model_loader=load_model, scaler_loader=lambda region, cfg: object(),
+                          data_loader=load_data, memory_budget_bytes=budget)
+
+
+def test_least_recently_used_model_is_evicted(config):
+    loads = []
+    registry = _registry(config, budget=250, loads=loads)
+    registry.get_model("a")
+    registry.get_model("b")
+    registry.get_model("a")      # b is now the least recently used
+    registry.get_model("c")      # 300 bytes > 250: b goes
+
+    stats = registry.stats()["model"]
+    assert stats["resident"] == ["a", "c"]
+    assert stats["resident_bytes"] == 2 * MODEL_BYTES
+    assert stats["evictions"] == 1
+
+    registry.get_model("b")      # loaded again, and now a is the oldest
+    assert loads == ["a", "b", "c", "b"]
+    assert registry.stats()["model"]["resident"] == ["c", "b"]
+
+
+def test_model_over_budget_on_its_own_stays_resident(config):
+    registry = _registry(config, budget=50)
+    registry.get_model("a")
+    registry.get_model("b")
+    assert registry.stats()["model"]["resident"] == ["b"]
+
+
+def test_keras_models_are_charged_more_than_their_weights(lstm_models):
+    from tensorflow.keras.models import load_model
+
+    path = lstm_models["sirsi"]
+    model = load_model(path)
+    assert _estimate_nbytes(model, path) >= model.count_params() * 4 + KERAS_MODEL_OVERHEAD_MB * 1024 * 1024
+
+
+def test_lazy_map_loads_on_access_and_after_reload(config):
+    loads = []
+    registry = _registry(config, loads=loads)
+    models = LazyArtifactMap(registry, "model")
+    assert loads == []
+
+    first = models["a"]
+    assert models["a"] is first and loads == ["a"]
+
+    # A new file on disk: the map hands out the reloaded model from then on
+    with open(config["a"]["model_path"], "w") as f:
+        f.write("v2, a different size")
+    assert registry.changed_on_disk("model", "a")
+    assert registry.reload("a", ["model"]) == ["model"]
+    assert models["a"] is not first and loads == ["a", "a"]
+
+
+def test_lazy_map_membership_is_false_when_loading_fails(config):
+    def broken(region, cfg):
+        raise OSError("missing file")
+
+    registry = RegionRegistry(config, model_loader=broken, scaler_loader=broken, data_loader=broken)
+    models = LazyArtifactMap(registry, "model")
+
+    assert "a" not in models and "nowhere" not in models
+    assert list(models.items()) == []
+    assert registry.stats()["model"]["failures"] == 1 + len(REGIONS)
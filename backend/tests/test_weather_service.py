@@ -0,0 +1,81 @@
+# backend/tests/test_weather_service.py
+
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from stubs import StubAccuWeatherServer
+from upstream import Upstream
+from weather_service import AccuWeatherClient, WeatherUnavailableError, LOCATION_KEYS, get_future_weather
+
+REGION = "sirsi"
+DEADLINE = 0.2
+
+
+@pytest.fixture
+def stub():
+    with StubAccuWeatherServer() as server:
+        yield server
+
+
+@pytest.fixture
+def client(stub):
+    # Its own upstream pool, so a slow stub can't hold slots of the shared one
+    upstream = Upstream("test-weather", max_concurrency=4, deadline=DEADLINE)
+    return AccuWeatherClient("test-key", forecast_url=stub.forecast_url, upstream=upstream)
+
+
+def _target(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+def test_target_dates_share_one_fetch(stub, client):
+    first = get_future_weather(REGION, _target(1), client=client)
+    second = get_future_weather(REGION, _target(3), client=client)
+
+    assert "error" not in first and "error" not in second
+    assert first[-1]["Date"] == _target(1) and second[-1]["Date"] == _target(3)
+    assert stub.hits[LOCATION_KEYS[REGION]] == 1
+
+
+def test_concurrent_misses_make_one_upstream_call(stub, client):
+    stub.delay = 0.1
+    barrier = threading.Barrier(8)
+    results = []
+
+    def fetch():
+        barrier.wait()
+        results.append(client.get_daily_forecasts(LOCATION_KEYS[REGION]))
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert stub.hits[LOCATION_KEYS[REGION]] == 1
+
+
+def test_serves_last_good_forecast_when_upstream_times_out(stub, client):
+    location_key = LOCATION_KEYS[REGION]
+    fresh = client.get_daily_forecasts(location_key)
+
+    client._cache.clear()   # as if the TTL had passed
+    stub.delay = DEADLINE * 5
+
+    assert client.get_daily_forecasts(location_key) is fresh
+    assert client.stale_served == 1
+    assert stub.hits[location_key] == 2
+
+
+def test_timeout_without_last_good_is_retryable(stub, client):
+    stub.delay = DEADLINE * 5
+
+    with pytest.raises(WeatherUnavailableError):
+        client.get_daily_forecasts(LOCATION_KEYS[REGION])
+
+    result = get_future_weather(REGION, _target(1), client=client)
+    assert result["retryable"] is True
+    assert "error" in result
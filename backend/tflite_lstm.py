@@ -0,0 +1,140 @@
+# backend/tflite_lstm.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+from structured_logging import get_logger
+
+log = get_logger(__name__)
+
+# --- TFLite inference for our Keras LSTM models ---
+# convert_tflite.py exports each models/<region>_lstm.h5 to a .tflite file,
+# optionally quantized, and INFERENCE_BACKEND=tflite serves from those. The
+# interpreter comes from ai_edge_litert or tflite_runtime when installed, so
+# a worker never has to import TensorFlow; full TensorFlow is only the fallback
+# (and costs most of the memory the backend is meant to save). Install the
+# lightweight one with: pip install -r backend/requirements-tflite.txt
+#
+# The LSTMs are exported unrolled over the 60 timesteps. TFLite can't lower
+# Keras' while-loop LSTM with a dynamic batch size without the Flex (full TF)
+# ops, while the unrolled graph is plain FullyConnected/Add/Logistic/Tanh ops
+# that accept any batch size.
+
+QUANTIZATIONS = ("float16", "int8", "none")
+# Interpreters kept per model, one per recently used batch size; resizing
+# a single interpreter costs more than the forward pass for small batches
+MAX_INTERPRETERS = 4
+# Larger inputs (backtests) run in chunks of this many windows. The unrolled
+# graph keeps every timestep's activations, so the tensor arena grows with
+# the batch: a few MB at 256 windows, most of a GB for a full backtest.
+MAX_BATCH = 256
+
+
+_INTERPRETER = None   # (name, Interpreter class), picked on first use
+
+
+def _interpreter_class():
+    global _INTERPRETER
+    if _INTERPRETER is None:
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+            name = "ai_edge_litert"
+        except ImportError:
+            try:
+                from tflite_runtime.interpreter import Interpreter
+                name = "tflite_runtime"
+            except ImportError:
+                import tensorflow as tf
+                Interpreter, name = tf.lite.Interpreter, "tensorflow"
+        if name == "tensorflow":
+            log.warning("No lightweight TFLite interpreter installed, using full TensorFlow. "
+                        "pip install -r backend/requirements-tflite.txt")
+        else:
+            log.info("TFLite interpreter selected", extra={"interpreter": name})
+        _INTERPRETER = (name, Interpreter)
+    return _INTERPRETER[1]
+
+
+def interpreter_name():
+    """Which package the TFLite interpreter came from, or None if none was loaded yet."""
+    return _INTERPRETER[0] if _INTERPRETER else None
+
+
+class TFLiteModel:
+    """
+    Drop-in replacement for a loaded Keras model at inference time, like
+    NumpyLSTMModel. Only predict() is implemented. Thread-safe.
+    """
+
+    def __init__(self, model_content):
+        self.model_content = model_content
+        self._interpreter_cls = _interpreter_class()
+        self._interpreters = OrderedDict()   # batch size -> (interpreter, input index, output index)
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return len(self.model_content)
+
+    def _interpreter(self, batch_size):
+        entry = self._interpreters.get(batch_size)
+        if entry is not None:
+            self._interpreters.move_to_end(batch_size)
+            return entry
+        interpreter = self._interpreter_cls(model_content=self.model_content)
+        input_index = interpreter.get_input_details()[0]["index"]
+        interpreter.resize_tensor_input(input_index, [batch_size, *interpreter.get_input_details()[0]["shape"][1:]])
+        interpreter.allocate_tensors()
+        entry = (interpreter, input_index, interpreter.get_output_details()[0]["index"])
+        self._interpreters[batch_size] = entry
+        while len(self._interpreters) > MAX_INTERPRETERS:
+            self._interpreters.popitem(last=False)
+        return entry
+
+    def _run(self, x):
+        interpreter, input_index, output_index = self._interpreter(len(x))
+        interpreter.set_tensor(input_index, x)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index).copy()
+
+    def predict(self, x, verbose=0, batch_size=None):
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        with self._lock:
+            if len(x) <= MAX_BATCH:
+                return self._run(x)
+            return np.concatenate([self._run(x[i:i + MAX_BATCH]) for i in range(0, len(x), MAX_BATCH)])
+
+    __call__ = predict
+
+
+def load_tflite_model(path):
+    with open(path, 'rb') as f:
+        return TFLiteModel(f.read())
+
+
+def convert_model(model_path, quantization="float16"):
+    """
+    Converts a Keras .h5 LSTM model to TFLite bytes.
+      "float16" - weights stored as float16, computed in float32
+      "int8"    - dynamic-range quantization: int8 weights, float activations
+      "none"    - plain float32
+    """
+    import tensorflow as tf
+
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization}")
+
+    source = tf.keras.models.load_model(model_path, compile=False)
+    config = source.get_config()
+    for layer in config["layers"]:
+        if layer["class_name"] == "LSTM":
+            layer["config"]["unroll"] = True
+    model = tf.keras.Sequential.from_config(config)
+    model.set_weights(source.get_weights())
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization != "none":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
@@ -0,0 +1,257 @@
+# backend/train_models.py
+#
+# Trains the per-region LSTM models and writes models/<region>_lstm.h5,
+# models/<region>_scaler.pkl and models/manifest.json.
+#
+#   python backend/train_models.py                       # every region in regions.json
+#   python backend/train_models.py --regions sirsi --epochs 20 --jobs 1
+#
+# Same data, features, window and architecture as the old train_models.ipynb,
+# but windows are strided views over the scaled data (see make_windows), batches
+# are streamed to Keras through tf.data, and regions train in parallel processes.
+
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from prediction_service import features, WINDOW_SIZE, MODELS_DIR, make_windows
+from region_registry import REGION_CONFIG
+
+PRICE_INDEX = features.index('Price')
+
+DEFAULT_EPOCHS = 50
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_PATIENCE = 10
+DEFAULT_VAL_FRACTION = 0.1
+
+
+def prepare_region_data(data_path):
+    """
+    Loads and scales a region's CSV. Returns (scaler, windows, targets) where
+    windows is a strided (n - WINDOW_SIZE, WINDOW_SIZE, 4) view into the
+    scaled data (nothing is copied) and targets the next-day scaled price.
+    """
+    df = pd.read_csv(data_path, parse_dates=['Date'], index_col='Date')
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled_data = scaler.fit_transform(df[features]).astype(np.float32)
+    return scaler, make_windows(scaled_data), scaled_data[WINDOW_SIZE:, PRICE_INDEX]
+
+
+def split_indices(n_windows, val_fraction):
+    """Last val_fraction of the windows for validation, like Keras' validation_split."""
+    n_val = int(n_windows * val_fraction)
+    return np.arange(n_windows - n_val), np.arange(n_windows - n_val, n_windows)
+
+
+def make_dataset(windows, targets, indices, batch_size, shuffle, seed=None):
+    """
+    tf.data pipeline over a strided view: each batch is gathered from the
+    view on demand, so the full (n, WINDOW_SIZE, 4) array never exists.
+    Training batches are reshuffled every epoch.
+    """
+    import tensorflow as tf
+
+    rng = np.random.default_rng(seed)
+
+    def batches():
+        order = rng.permutation(indices) if shuffle else indices
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            yield windows[batch], targets[batch]
+
+    signature = (
+        tf.TensorSpec(shape=(None, WINDOW_SIZE, len(features)), dtype=tf.float32),
+        tf.TensorSpec(shape=(None,), dtype=tf.float32),
+    )
+    return tf.data.Dataset.from_generator(batches, output_signature=signature).prefetch(tf.data.AUTOTUNE)
+
+
+def build_lstm_model(input_shape):
+    """
+    Defines and compiles the LSTM model architecture.
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Input, LSTM, Dense, Dropout
+
+    model = Sequential([
+        Input(shape=input_shape),
+        LSTM(units=50, return_sequences=True),
+        Dropout(0.2),
+        LSTM(units=50, return_sequences=False),
+        Dropout(0.2),
+        Dense(units=25),
+        Dense(units=1),
+    ])
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+
+def _replace(path, write):
+    """Writes to a temporary file next to path, then swaps it in atomically."""
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.partial{ext}"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def train_region(region, config, epochs=DEFAULT_EPOCHS, batch_size=DEFAULT_BATCH_SIZE,
+                 patience=DEFAULT_PATIENCE, val_fraction=DEFAULT_VAL_FRACTION,
+                 output_dir=None, seed=None, threads=None):
+    """
+    Trains and saves one region's model and scaler. Runs in a worker process.
+    Returns the region's manifest entry.
+    """
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    if threads:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    if seed is not None:
+        tf.keras.utils.set_random_seed(seed)
+
+    started = time.perf_counter()
+    scaler, windows, targets = prepare_region_data(config["data_path"])
+    train_idx, val_idx = split_indices(len(windows), val_fraction)
+    prepared = time.perf_counter()
+    print(f"[{region}] {len(train_idx)} training / {len(val_idx)} validation windows")
+
+    model = build_lstm_model(input_shape=(WINDOW_SIZE, len(features)))
+    early_stop = EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)
+    history = model.fit(
+        make_dataset(windows, targets, train_idx, batch_size, shuffle=True, seed=seed),
+        validation_data=make_dataset(windows, targets, val_idx, batch_size, shuffle=False),
+        epochs=epochs,
+        callbacks=[early_stop],
+        verbose=2,
+    )
+    trained = time.perf_counter()
+
+    # Validation error in rupees, on the restored best weights
+    predicted_scaled = model.predict(make_dataset(windows, targets, val_idx, 256, shuffle=False), verbose=0)[:, 0]
+    price_min, price_scale = scaler.min_[PRICE_INDEX], scaler.scale_[PRICE_INDEX]
+    predicted = (predicted_scaled - price_min) / price_scale
+    actual = (targets[val_idx] - price_min) / price_scale
+    error = np.abs(predicted - actual)
+
+    model_path = os.path.join(output_dir, f"{region}_lstm.h5") if output_dir else config["model_path"]
+    scaler_path = os.path.join(output_dir, f"{region}_scaler.pkl") if output_dir else config["scaler_path"]
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+    _replace(model_path, model.save)
+
+    def dump_scaler(path):
+        with open(path, 'wb') as f:
+            pickle.dump(scaler, f)
+    _replace(scaler_path, dump_scaler)
+
+    val_loss = history.history['val_loss']
+    best_epoch = int(np.argmin(val_loss))
+    return {
+        "status": "ok",
+        "model_path": os.path.abspath(model_path),
+        "scaler_path": os.path.abspath(scaler_path),
+        "rows": int(len(windows) + WINDOW_SIZE),
+        "train_windows": int(len(train_idx)),
+        "val_windows": int(len(val_idx)),
+        "epochs_run": len(val_loss),
+        "best_epoch": best_epoch + 1,
+        "train_loss": float(history.history['loss'][best_epoch]),
+        "val_loss": float(val_loss[best_epoch]),
+        "val_mae": float(error.mean()) if len(error) else None,
+        "val_mape": float((error / np.abs(actual)).mean() * 100) if len(error) else None,
+        "prepare_seconds": round(prepared - started, 3),
+        "train_seconds": round(trained - prepared, 3),
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _train_worker(args):
+    region, config, options = args
+    try:
+        return region, train_region(region, config, **options)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return region, {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+
+
+def train_all(region_list, jobs=None, output_dir=None, **options):
+    """
+    Trains the given regions, `jobs` at a time in separate processes, and
+    writes manifest.json next to the models. Returns the manifest.
+    """
+    jobs = max(1, min(jobs or len(region_list), len(region_list)))
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    options = dict(options, output_dir=output_dir, threads=threads)
+    started = time.perf_counter()
+
+    work = [(region, REGION_CONFIG[region], options) for region in region_list]
+    if jobs == 1:
+        results = [_train_worker(w) for w in work]
+    else:
+        # spawn: TensorFlow does not survive fork()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            results = list(pool.map(_train_worker, work))
+
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "features": features,
+        "window_size": WINDOW_SIZE,
+        "settings": {k: v for k, v in options.items() if k != "output_dir"},
+        "jobs": jobs,
+        "total_seconds": round(time.perf_counter() - started, 3),
+        "regions": dict(results),
+    }
+    manifest_dir = output_dir or MODELS_DIR
+    os.makedirs(manifest_dir, exist_ok=True)
+
+    def dump_manifest(path):
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    _replace(os.path.join(manifest_dir, "manifest.json"), dump_manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the per-region LSTM price models.")
+    parser.add_argument("--regions", nargs="+", default=list(REGION_CONFIG), help="default: all regions")
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--patience", type=int, default=DEFAULT_PATIENCE, help="early-stopping patience")
+    parser.add_argument("--val-fraction", type=float, default=DEFAULT_VAL_FRACTION)
+    parser.add_argument("--jobs", type=int, default=None, help="parallel worker processes (default: one per region)")
+    parser.add_argument("--output-dir", default=None, help="default: the paths in regions.json")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    unknown = [r for r in args.regions if r not in REGION_CONFIG]
+    if unknown:
+        parser.error(f"unknown region(s): {', '.join(unknown)}")
+
+    manifest = train_all(
+        args.regions, jobs=args.jobs, output_dir=args.output_dir, epochs=args.epochs,
+        batch_size=args.batch_size, patience=args.patience, val_fraction=args.val_fraction, seed=args.seed,
+    )
+    print(f"\nTrained {len(args.regions)} region(s) in {manifest['total_seconds']:.1f}s")
+    for region, entry in manifest["regions"].items():
+        if entry["status"] == "ok":
+            print(f"  {region:<16} {entry['epochs_run']:>3} epochs  val MAE ₹{entry['val_mae']:,.0f}  "
+                  f"MAPE {entry['val_mape']:.2f}%  ({entry['train_seconds']:.1f}s)")
+        else:
+            print(f"  {region:<16} FAILED: {entry['error']}")
+    return 0 if all(e["status"] == "ok" for e in manifest["regions"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
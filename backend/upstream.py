@@ -0,0 +1,128 @@
+# backend/upstream.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+# --- Outbound calls to AccuWeather and Gemini ---
+# Each upstream gets its own small thread pool. A request thread hands the
+# call to the pool and waits at most `deadline` seconds for it. If every slot
+# is already busy we fail fast instead of queueing, so a slow upstream can tie
+# up at most `max_concurrency` threads and never the whole server.
+
+
+_DONE = object()
+
+
+class UpstreamUnavailable(Exception):
+    pass
+
+
+class UpstreamSaturated(UpstreamUnavailable):
+    pass
+
+
+class UpstreamTimeout(UpstreamUnavailable):
+    pass
+
+
+class Upstream:
+    def __init__(self, name, max_concurrency, deadline):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"upstream-{name}")
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "rejected": 0, "timeouts": 0, "errors": 0, "in_flight": 0}
+
+    def _count(self, key, delta=1):
+        with self._lock:
+            self._stats[key] += delta
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise UpstreamSaturated(f"{self.name} is saturated ({self.max_concurrency} calls in flight)")
+        self._count("calls")
+        self._count("in_flight")
+
+    def _release(self, *_):
+        self._count("in_flight", -1)
+        self._slots.release()
+
+    def _wait(self, future, deadline):
+        try:
+            return future.result(timeout=deadline)
+        except FuturesTimeout:
+            self._count("timeouts")
+            raise UpstreamTimeout(f"{self.name} did not answer within {deadline:g}s")
+        except Exception:
+            self._count("errors")
+            raise
+
+    def call(self, fn, *args, deadline=None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) on the upstream's pool and returns its result.
+        Raises UpstreamSaturated if no slot is free and UpstreamTimeout if the
+        deadline passes. A timed-out call keeps its slot until it really ends.
+        """
+        self._acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return self._wait(future, self.deadline if deadline is None else deadline)
+
+    def stream(self, fn, *args, deadline=None, on_cancel=None, **kwargs):
+        """
+        Generator version of call() for an fn that returns an iterable: yields
+        its items, allowing `deadline` seconds for the call and for each item.
+        One slot is held for the whole stream. If the consumer stops early,
+        on_cancel(iterable) is called so the source can be shut down.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        self._acquire()
+        future, source = None, None
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+            source = self._wait(future, deadline)
+            iterator = iter(source)
+            while True:
+                future = self._executor.submit(next, iterator, _DONE)
+                item = self._wait(future, deadline)
+                if item is _DONE:
+                    return
+                yield item
+        except GeneratorExit:
+            if on_cancel and source is not None:
+                on_cancel(source)
+            raise
+        finally:
+            # Keep the slot until the pool thread is really finished with it
+            if future is None:
+                self._release()
+            else:
+                future.add_done_callback(self._release)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, max_concurrency=self.max_concurrency, deadline_seconds=self.deadline)
+
+
+WEATHER_UPSTREAM = Upstream(
+    "accuweather",
+    max_concurrency=int(os.getenv("ACCUWEATHER_MAX_CONCURRENCY", "4")),
+    deadline=float(os.getenv("ACCUWEATHER_DEADLINE_SECONDS", "8")),
+)
+GEMINI_UPSTREAM = Upstream(
+    "gemini",
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+    deadline=float(os.getenv("GEMINI_DEADLINE_SECONDS", "30")),
+)
+
+
+def upstream_stats():
+    return {u.name: u.stats() for u in (WEATHER_UPSTREAM, GEMINI_UPSTREAM)}
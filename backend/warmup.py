@@ -0,0 +1,144 @@
+# backend/warmup.py
+
+import os
+import time
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from prediction_service import REGISTRY, regions, features, INFERENCE_BACKEND, WINDOW_SIZE
+from history_service import get_snapshot
+from chat_retrieval import get_price_index, warm_up_dateparser
+from structured_logging import get_logger
+
+log = get_logger(__name__)
+
+# --- Warm-up before serving traffic ---
+# Loads every region's scaler, price history and model, runs one dummy
+# window through each model (the first predict() pays for graph tracing /
+# interpreter allocation), builds the /historical-data snapshots and chat
+# price indexes, and loads dateparser's language data. GET /ready reports 503
+# until this process has done all of it.
+#
+# Under gunicorn (gunicorn.conf.py) this runs in the master before workers are
+# forked, so the loaded artifacts are shared copy-on-write. Keras models are
+# the exception: TensorFlow's runtime doesn't survive a fork (the first
+# predict() in the child hangs), so with INFERENCE_BACKEND=keras the master
+# only imports TensorFlow and each worker loads and warms its own models.
+
+WARMUP_ENABLED = os.getenv("WARMUP", "1") == "1"
+FORK_SAFE_BACKENDS = ("numpy", "tflite")
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class WarmUp:
+    def __init__(self, region_list, enabled=WARMUP_ENABLED):
+        self.regions = list(region_list)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._shared_done = False
+        self._models_done = False
+        self._started_at = None
+        self._finished_at = None
+        self._seconds = 0.0
+        self._regions = {region: {"data": "pending", "model": "pending"} for region in self.regions}
+
+    def _set(self, region, part, status, error=None):
+        with self._lock:
+            self._regions[region][part] = status
+            if error:
+                self._regions[region][f"{part}_error"] = error
+
+    def _warm_shared(self):
+        for region in self.regions:
+            try:
+                REGISTRY.get_scaler(region)
+                REGISTRY.get_data(region)
+                get_snapshot(region)
+                get_price_index(region)
+                self._set(region, "data", "warm")
+            except Exception as e:
+                log.error("Warm-up of data failed", extra={"region": region, "error": str(e)})
+                self._set(region, "data", "failed", str(e))
+        try:
+            warm_up_dateparser()
+        except Exception as e:
+            log.warning("Warm-up of dateparser failed", extra={"error": str(e)})
+
+    def _warm_models(self):
+        dummy = np.zeros((1, WINDOW_SIZE, len(features)), dtype=np.float32)
+        for region in self.regions:
+            try:
+                REGISTRY.get_model(region).predict(dummy, verbose=0)
+                self._set(region, "model", "warm")
+            except Exception as e:
+                log.error("Warm-up of model failed", extra={"region": region, "error": str(e)})
+                self._set(region, "model", "failed", str(e))
+
+    def run(self, models=True):
+        """
+        Warms whatever hasn't been warmed yet in this process. models=False
+        leaves the models for later (see preload()). Safe to call repeatedly.
+        """
+        if not self.enabled:
+            return
+        with self._run_lock:
+            started = time.perf_counter()
+            with self._lock:
+                self._started_at = self._started_at or _now_iso()
+            if not self._shared_done:
+                self._warm_shared()
+                self._shared_done = True
+            if models and not self._models_done:
+                self._warm_models()
+                self._models_done = True
+            self._seconds += time.perf_counter() - started
+            if self._models_done:
+                with self._lock:
+                    self._finished_at = _now_iso()
+                log.info("Warm-up finished", extra={"seconds": round(self._seconds, 2), "pid": os.getpid()})
+
+    def preload(self):
+        """
+        For a process that will fork workers: warms everything that can be
+        shared across a fork. Keras models are left to each worker's run().
+        """
+        if INFERENCE_BACKEND not in FORK_SAFE_BACKENDS:
+            # Importing TensorFlow is fork-safe and is most of a worker's start-up time
+            import tensorflow.keras.models  # noqa: F401
+        self.run(models=INFERENCE_BACKEND in FORK_SAFE_BACKENDS)
+
+    def start(self):
+        """Runs the warm-up on a background thread (single-process servers)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="warm-up", daemon=True)
+            self._thread.start()
+
+    def ready(self):
+        return not self.enabled or self._models_done
+
+    def status(self):
+        with self._lock:
+            return {
+                "ready": self.ready(),
+                "enabled": self.enabled,
+                "inference_backend": INFERENCE_BACKEND,
+                "pid": os.getpid(),
+                "started_at": self._started_at,
+                "finished_at": self._finished_at,
+                "seconds": round(self._seconds, 3),
+                "regions": {region: dict(parts) for region, parts in self._regions.items()},
+            }
+
+
+WARMUP = WarmUp(regions)
+
+
+def start_warm_up():
+    WARMUP.start()
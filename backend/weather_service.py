@@ -3,84 +3,163 @@
 import os
 import requests
 import json
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from region_registry import location_keys
+from caching import TTLCache, SingleFlight
+from upstream import WEATHER_UPSTREAM, UpstreamUnavailable
+from metrics import stage
+from structured_logging import get_logger
+
+log = get_logger(__name__)
 
 # Load the API key from our .env file
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 ACCUWEATHER_API_KEY = os.getenv("ACCUWEATHER_API_KEY")
 
-# The location keys you provided
-LOCATION_KEYS = {
-    "madikeri": "43287",
-    "sirsi": "43225",
-    "chikkamagaluru": "43260"
-}
+# AccuWeather location keys, one per region in regions.json
+LOCATION_KEYS = location_keys()
 
 # --- [FIX #1] ---
 # We are changing from "15day" to "5day", as this is the
 # standard endpoint included in the Limited Trial.
-FORECAST_URL = "http://dataservice.accuweather.com/forecasts/v1/daily/5day/"
+FORECAST_URL = os.getenv(
+    "ACCUWEATHER_BASE_URL", "http://dataservice.accuweather.com"
+).rstrip('/') + "/forecasts/v1/daily/5day/"
 # --- [END OF FIX #1] ---
 
-def get_future_weather(region, target_date_str):
+# --- Client settings ---
+CONNECT_TIMEOUT = float(os.getenv("ACCUWEATHER_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("ACCUWEATHER_READ_TIMEOUT", "10"))
+POOL_SIZE = int(os.getenv("ACCUWEATHER_POOL_SIZE", "10"))
+# The 5-day forecast for a location only changes a few times a day
+CACHE_TTL_SECONDS = float(os.getenv("WEATHER_CACHE_TTL_SECONDS", "3600"))
+
+
+class WeatherServiceError(Exception):
+    pass
+
+
+class WeatherUnavailableError(WeatherServiceError):
+    # AccuWeather is saturated or too slow and we have nothing cached; worth retrying
+    pass
+
+
+class AccuWeatherClient:
     """
-    Fetches the 5-day weather forecast for a region.
+    AccuWeather 5-day forecast client.
+
+    - one pooled requests.Session with explicit (connect, read) timeouts
+    - the raw DailyForecasts payload is cached per location for cache_ttl seconds,
+      so requests for different target dates share one fetch
+    - concurrent misses for the same location are coalesced into one upstream call
+    - the call itself runs on the bounded AccuWeather upstream pool with a deadline;
+      if that pool is saturated or the deadline passes we serve the last good
+      payload for the location (even if expired) instead of waiting
     """
-    
-    if region not in LOCATION_KEYS:
-        return {"error": "Invalid region"}
-        
-    if not ACCUWEATHER_API_KEY:
-        return {"error": "AccuWeather API key not found. Check .env file."}
 
-    location_key = LOCATION_KEYS[region]
-    
-    # Calculate how many days away the target date is
-    try:
-        target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date()
-    except ValueError:
-        return {"error": "Invalid date format. Use YYYY-MM-DD."}
-        
-    today = datetime.now().date()
-    
-    # --- [FIX #2] ---
-    # We are reverting to the original authentication method,
-    # putting the 'apikey' directly in the 'params' dictionary.
-    params = {
-        "apikey": ACCUWEATHER_API_KEY,
-        "metric": "true"
-    }
-    
-    api_url = f"{FORECAST_URL}{location_key}"
-    
-    try:
-        # We no longer pass 'headers'
-        response = requests.get(api_url, params=params)
-        
-    # --- [END OF FIX #2] ---
-    
-        response.raise_for_status() # Raise an error for bad responses
-        forecast_data = response.json()
-    
-    except requests.exceptions.RequestException as e:
-        print(f"AccuWeather API Error: {e}")
+    def __init__(self, api_key, forecast_url=FORECAST_URL, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 cache_ttl=CACHE_TTL_SECONDS, pool_size=POOL_SIZE, upstream=WEATHER_UPSTREAM):
+        self.api_key = api_key
+        self.forecast_url = forecast_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._cache = TTLCache(ttl=cache_ttl)
+        self._flight = SingleFlight()
+        self.upstream = upstream
+        # location_key -> last payload we got; only used when the upstream is unavailable
+        self._last_good = {}
+        self.upstream_calls = 0
+        self.stale_served = 0
+
+    def get_daily_forecasts(self, location_key):
+        """
+        Returns the DailyForecasts list for a location, from cache if fresh.
+        Raises WeatherServiceError on any upstream problem.
+        """
+        cached = self._cache.get(location_key)
+        if cached is not None:
+            return cached
+        return self._flight.do(location_key, lambda: self._fetch(location_key))
+
+    def _fetch(self, location_key):
+        # Another caller may have filled the cache while we waited for the flight
+        cached = self._cache.get(location_key)
+        if cached is not None:
+            return cached
+
         try:
-            error_details = response.json()
-            return {"error": f"AccuWeather API failed: {error_details.get('Message', 'Unknown error')}"}
-        except:
-             return {"error": f"AccuWeather API failed: {str(e)}"}
-    except json.JSONDecodeError:
-        return {"error": "Failed to decode AccuWeather response."}
+            with stage("accuweather_call"):
+                daily_forecasts = self.upstream.call(self._request, location_key)
+        except UpstreamUnavailable as e:
+            stale = self._last_good.get(location_key)
+            if stale is None:
+                raise WeatherUnavailableError(f"AccuWeather is not responding right now ({e}). Please try again shortly.")
+            log.warning("AccuWeather unavailable, serving stale forecast",
+                        extra={"location_key": location_key, "error": str(e)})
+            self.stale_served += 1
+            return stale
 
-    # --- Parse the Forecast ---
+        self._cache.set(location_key, daily_forecasts)
+        self._last_good[location_key] = daily_forecasts
+        return daily_forecasts
+
+    def _request(self, location_key):
+        # Runs on the upstream pool
+        # --- [FIX #2] ---
+        # We are reverting to the original authentication method,
+        # putting the 'apikey' directly in the 'params' dictionary.
+        params = {
+            "apikey": self.api_key,
+            "metric": "true"
+        }
+        # --- [END OF FIX #2] ---
+
+        api_url = f"{self.forecast_url}{location_key}"
+        self.upstream_calls += 1
+        response = None
+
+        try:
+            response = self.session.get(api_url, params=params, timeout=self.timeout)
+            response.raise_for_status() # Raise an error for bad responses
+            forecast_data = response.json()
+        except requests.exceptions.RequestException as e:
+            log.error("AccuWeather API error", extra={"error": str(e)})
+            try:
+                error_details = response.json()
+                raise WeatherServiceError(f"AccuWeather API failed: {error_details.get('Message', 'Unknown error')}")
+            except (AttributeError, ValueError):
+                raise WeatherServiceError(f"AccuWeather API failed: {str(e)}")
+        except json.JSONDecodeError:
+            raise WeatherServiceError("Failed to decode AccuWeather response.")
+
+        if "DailyForecasts" not in forecast_data:
+            raise WeatherServiceError("No 'DailyForecasts' in API response.")
+
+        return forecast_data["DailyForecasts"]
+
+    def stats(self):
+        return {
+            "upstream_calls": self.upstream_calls,
+            "coalesced_calls": self._flight.coalesced,
+            "stale_served": self.stale_served,
+            "upstream": self.upstream.stats(),
+            "cache": self._cache.stats(),
+        }
+
+
+WEATHER_CLIENT = AccuWeatherClient(ACCUWEATHER_API_KEY)
+
+
+def _parse_forecasts(daily_forecasts, today, target_date):
     forecasts_list = []
-    
-    if "DailyForecasts" not in forecast_data:
-        return {"error": "No 'DailyForecasts' in API response."}
 
-    for day_forecast in forecast_data["DailyForecasts"]:
+    for day_forecast in daily_forecasts:
         forecast_date = datetime.fromisoformat(day_forecast["Date"]).date()
         
         # Only add days that are in the future AND on or before the target date
@@ -103,9 +182,44 @@ def get_future_weather(region, target_date_str):
                     "Rainfall": rainfall
                 })
             except KeyError as e:
-                print(f"KeyError while parsing forecast: {e} on {forecast_date}")
+                log.warning("Missing key while parsing forecast", extra={"key": str(e), "date": str(forecast_date)})
                 pass
 
+    return forecasts_list
+
+
+def get_future_weather(region, target_date_str, client=None):
+    """
+    Fetches the 5-day weather forecast for a region.
+    """
+    client = client or WEATHER_CLIENT
+    
+    if region not in LOCATION_KEYS:
+        return {"error": "Invalid region"}
+        
+    if not client.api_key:
+        return {"error": "AccuWeather API key not found. Check .env file."}
+
+    location_key = LOCATION_KEYS[region]
+    
+    # Calculate how many days away the target date is
+    try:
+        target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return {"error": "Invalid date format. Use YYYY-MM-DD."}
+        
+    today = datetime.now().date()
+
+    try:
+        daily_forecasts = client.get_daily_forecasts(location_key)
+    except WeatherUnavailableError as e:
+        return {"error": str(e), "retryable": True}
+    except WeatherServiceError as e:
+        return {"error": str(e)}
+
+    # --- Parse the Forecast ---
+    forecasts_list = _parse_forecasts(daily_forecasts, today, target_date)
+
     if not forecasts_list:
         return {"error": "Could not retrieve any valid future forecasts. (Note: Trial API is limited to 5 days)."}
         
@@ -14,6 +14,12 @@ const ChatAssistant = () => {
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  // One backend conversation per mounted chat, so follow-up questions keep their context
+  const conversationId = useRef<string>(crypto.randomUUID());
+  // Lets us cancel an in-flight stream when the chat unmounts
+  const abortRef = useRef<AbortController | null>(null);
+
+  useEffect(() => () => abortRef.current?.abort(), []);
 
   const suggestedPrompts = [
     "What's the latest price in Sirsi?",
@@ -43,27 +49,54 @@ const ChatAssistant = () => {
     setLoading(true);
 
     try {
-      const response = await fetch("http://127.0.0.1:5000/chat", {
+      const controller = new AbortController();
+      abortRef.current = controller;
+      const response = await fetch("http://127.0.0.1:5000/chat-stream", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
         },
-        body: JSON.stringify({ message: textToSend }),
+        body: JSON.stringify({ message: textToSend, conversation_id: conversationId.current }),
+        signal: controller.signal,
       });
 
-      const data = await response.json();
-
-      if (response.ok) {
-        const botMessage: Message = {
-          role: "bot",
-          content: data.response,
-        };
-        setMessages((prev) => [...prev, botMessage]);
-      } else {
+      if (!response.ok || !response.body) {
+        const data = await response.json().catch(() => ({}));
         toast.error(data.error || "Failed to get response");
+        return;
+      }
+
+      // Add an empty bot message and grow it as server-sent chunks arrive
+      setMessages((prev) => [...prev, { role: "bot", content: "" }]);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop() ?? "";
+
+        for (const event of events) {
+          const lines = event.split("\n");
+          const name = lines.find((line) => line.startsWith("event: "))?.slice(7);
+          const data = lines.find((line) => line.startsWith("data: "))?.slice(6);
+          if (name !== "chunk" || !data) continue;
+          const { text } = JSON.parse(data);
+          setMessages((prev) => {
+            const updated = [...prev];
+            const last = updated[updated.length - 1];
+            updated[updated.length - 1] = { ...last, content: last.content + text };
+            return updated;
+          });
+        }
       }
     } catch (err) {
-      toast.error("Failed to connect to the server");
+      if ((err as Error).name !== "AbortError") {
+        toast.error("Failed to connect to the server");
+      }
     } finally {
       setLoading(false);
     }
@@ -137,7 +170,7 @@ const ChatAssistant = () => {
           </div>
         ))}
         
-        {loading && (
+        {loading && messages[messages.length - 1]?.role !== "bot" && (
           <div className="flex gap-3 justify-start">
             <div className="h-10 w-10 rounded-full bg-primary/20 flex items-center justify-center flex-shrink-0">
               <Bot className="h-6 w-6 text-primary animate-pulse" />
@@ -32,6 +32,12 @@ interface ApiHistoricalData { Date: string; Price: number; }
 interface ChartData { date: string; price: number; } // For PriceChart
 interface PerformanceData { date: string; actual: number; predicted: number; } // For PerformanceChart
 interface KpiData { price: number; date: string; }
+interface DashboardResponse {
+  kpis: { [key: string]: KpiData };
+  history: { [region: string]: ApiHistoricalData[] };
+  backtest: { region: string; rows: PerformanceData[] };
+  table: { region: string; rows: ApiHistoricalData[] };
+}
 
 const API_URL = "https://pepper-price-project.onrender.com";
 
@@ -52,6 +58,12 @@ const transformApiData = (data: ApiHistoricalData[]): ChartData[] => {
   return data.map(d => ({ date: d.Date, price: d.Price }));
 };
 
+// Helper to label table rows with the (capitalized) region, newest first
+const withRegion = (data: ApiHistoricalData[], region: string) => {
+  const regionName = region.charAt(0).toUpperCase() + region.slice(1);
+  return data.map(d => ({ ...d, Region: regionName })).reverse();
+};
+
 // Helper Component for KPI Cards
 const KpiCard = ({ title, value, date }: { title: string; value?: number; date?: string }) => (
   <Card>
@@ -87,40 +99,32 @@ const DashboardPage = () => {
 
   // --- Data Fetching Functions ---
 
-  // Fetches data for Tab 1 (Overview)
+  // Fetches data for Tab 1 (Overview), and the default Tab 2 / Tab 3 data,
+  // from the single /dashboard endpoint
   const fetchOverviewData = async () => {
     setLoadingKpis(true);
     setLoadingOverview(true);
     try {
-      // 1. Fetch KPIs
-      const kpiResponse = await fetch(`${API_URL}/latest-prices`);
-      if (!kpiResponse.ok) throw new Error("Failed to fetch latest prices");
-      const kpis = await kpiResponse.json();
-      setKpiData(kpis);
-      setLoadingKpis(false);
-
-      // 2. Fetch Historical Data (30 days for this chart)
-      const days = 30;
-      const [madikeriRes, sirsiRes, chikkamRes] = await Promise.all([
-        fetch(`${API_URL}/historical-data?region=madikeri&days=${days}`),
-        fetch(`${API_URL}/historical-data?region=sirsi&days=${days}`),
-        fetch(`${API_URL}/historical-data?region=chikkamagaluru&days=${days}`),
-      ]);
-
-      if (!madikeriRes.ok || !sirsiRes.ok || !chikkamRes.ok) {
-        throw new Error("Failed to fetch historical chart data");
-      }
-
-      const madikeri = await madikeriRes.json();
-      const sirsi = await sirsiRes.json();
-      const chikkam = await chikkamRes.json();
+      const response = await fetch(
+        `${API_URL}/dashboard?performance_region=${performanceRegion}&table_region=${tableRegion}` +
+        `&overview_days=30&backtest_days=90&table_days=180`
+      );
+      if (!response.ok) throw new Error("Failed to fetch dashboard data");
+      const dashboard: DashboardResponse = await response.json();
 
-      setOverviewData({ madikeri, sirsi, chikkam });
-      
+      setKpiData(dashboard.kpis);
+      setOverviewData({
+        madikeri: dashboard.history.madikeri,
+        sirsi: dashboard.history.sirsi,
+        chikkam: dashboard.history.chikkamagaluru,
+      });
+      setPerformanceData(dashboard.backtest.rows);
+      setTableData(withRegion(dashboard.table.rows, dashboard.table.region));
     } catch (err) {
       console.error("Error loading overview:", err);
       toast.error("Failed to load overview data.");
     }
+    setLoadingKpis(false);
     setLoadingOverview(false);
   };
 
@@ -150,9 +154,7 @@ const DashboardPage = () => {
       const response = await fetch(`${API_URL}/historical-data?region=${region}&days=180`);
       if (!response.ok) throw new Error("Failed to fetch table data");
       const data: ApiHistoricalData[] = await response.json();
-      // [FIX] Capitalize the region string
-      const regionName = region.charAt(0).toUpperCase() + region.slice(1);
-      setTableData(data.map(d => ({...d, Region: regionName})).reverse());
+      setTableData(withRegion(data, region));
     } catch (err) {
       console.error("Error fetching table data:", err);
       toast.error("Failed to load raw data table.");